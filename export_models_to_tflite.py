@@ -1,124 +1,216 @@
 """
-YOLO to TFLite Exporter
+YOLO to TFLite / ONNX Exporter
 ⚠️  IMPORTANT: Export should be done on a PC, not Raspberry Pi!
 TensorFlow is too heavy for Raspberry Pi.
+
+Exports every model at each input size (--imgsz, default 256 320 416 640)
+in each format (--formats: TFLite fp32 / fp16 / int8 and ONNX) in one pass:
+    tensorlite/models/<model>_<imgsz>_<fp32|fp16|int8>.tflite
+    models/<model>_<imgsz>.onnx
+Every file is recorded in models/export_manifest.json with its input and
+output shape, dtype and quantization (see scripts/model_manifest.py);
+scripts/select_model.py benchmarks the variants and picks one.
+
+The 320 px INT8 TFLite and ONNX exports are also copied to the default
+names the runners use (tensorlite/models/<model>_int8.tflite,
+models/<model>.onnx), so those match their IMG_SIZE = 320.
 """
 
-from ultralytics import YOLO
+import argparse
+import glob
 import os
+import shutil
 import sys
+from ultralytics import YOLO
 
-print("="*60)
-print("🚀 YOLO to TFLite INT8 Exporter")
-print("="*60)
-print()
+base_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(base_path, "scripts"))
+from model_manifest import (DEFAULT_SIZES, FORMATS, MANIFEST_PATH, TFLITE_PRECISIONS, add_variant, inspect_model,
+                            load_manifest, save_manifest, variant_path)
 
-# Detect where we are running
-if os.path.exists("/home/pi"):
-    print("⚠️  WARNING: You are running this on Raspberry Pi!")
-    print("   TensorFlow export is very slow and may fail on Pi.")
-    print()
-    print("💡 RECOMMENDED: Export on your PC instead:")
-    print("   1. Clone this repo on your PC")
-    print("   2. Run: python export_models_to_tflite.py")
-    print("   3. Copy the .tflite files to Pi")
-    print()
-    response = input("Continue anyway? (y/N): ")
-    if response.lower() != 'y':
-        print("Exiting...")
-        sys.exit(0)
-    base_path = "/home/pi/yolo_test"
-    print("📍 Running on Raspberry Pi")
-else:
-    # Running on PC
-    base_path = os.path.dirname(os.path.abspath(__file__))
-    print("📍 Detected: Running on PC (recommended)")
-
-print(f"📁 Working directory: {base_path}")
-print()
-
-# Models to export
-models_to_export = [
-    (os.path.join(base_path, "models/yolov8n.pt"), "YOLOv8n"),
-    (os.path.join(base_path, "models/yolo11n.pt"), "YOLO11n")
+# Models to export: (name used by run_benchmark.py, weights)
+MODELS = [
+    ("yolo8n", "models/yolov8n.pt"),
+    ("yolo11n", "models/yolo11n.pt"),
 ]
+RUNNER_IMGSZ = 320  # IMG_SIZE of the runners; these exports also get the default file names
+
+
+def load_model(model_path):
+    """Load weights from disk, or download them by file name"""
+    if os.path.exists(model_path):
+        print(f"   ✅ Loaded from disk")
+        return YOLO(model_path)
+    print(f"   ⚠️  File not found! Downloading from Ultralytics...")
+    model_file = os.path.basename(model_path)
+    model = YOLO(model_file)
+    print(f"   ✅ Downloaded: {model_file}")
+    return model
 
-exported_files = []
 
-for model_path, model_name in models_to_export:
-    print(f"📦 Exporting {model_name}...")
-    print(f"   Source: {model_path}")
-    
-    if not os.path.exists(model_path):
-        print(f"   ⚠️  File not found! Downloading from Ultralytics...")
+def export_tflite(model, imgsz, precisions):
+    """
+    Export TFLite files at one input size; returns {precision: exported path}.
+    One INT8 export also writes the float32 and float16 files into the same
+    saved_model folder; precisions it didn't produce are exported on their own.
+    """
+    suffixes = [TFLITE_PRECISIONS[p] for p in precisions]
+    exported = model.export(format="tflite", imgsz=imgsz, int8="int8" in precisions)
+    folder = os.path.dirname(exported)
+    stem = os.path.basename(exported).rsplit("_", 1)[0]
+    paths = {}
+    for precision, suffix in zip(precisions, suffixes):
+        path = os.path.join(folder, f"{stem}_{suffix}.tflite")
+        if not os.path.exists(path) and precision == "fp16":
+            path = model.export(format="tflite", imgsz=imgsz, half=True)
+        if os.path.exists(path):
+            paths[precision] = path
+        else:
+            print(f"   ⚠️  No {precision} file in {folder}: {', '.join(sorted(glob.glob(os.path.join(folder, '*.tflite'))))}")
+    return paths
+
+
+def record(manifest, name, stem, fmt, imgsz, source, exported):
+    """Copy an export to its variant path and add it to the manifest"""
+    dest = variant_path(stem, fmt, imgsz)
+    os.makedirs(os.path.join(base_path, os.path.dirname(dest)), exist_ok=True)
+    shutil.copy2(exported, os.path.join(base_path, dest))
+    entry = {
+        "model": name,
+        "source": source,
+        "format": fmt,
+        "backend": "onnx" if fmt == "onnx" else "tflite",
+        "imgsz": imgsz,
+        "path": dest,
+        "size_mb": os.path.getsize(exported) / 1e6,
+    }
+    tensors = inspect_model(os.path.join(base_path, dest))
+    if tensors:
+        entry.update(tensors)
+    add_variant(manifest, entry)
+    print(f"   ✅ {dest} ({entry['size_mb']:.1f} MB)")
+    if imgsz == RUNNER_IMGSZ and fmt in ("int8", "onnx"):
+        # The default names in run_benchmark.MODELS
+        default = (os.path.join("models", f"{stem}.onnx") if fmt == "onnx"
+                   else os.path.join("tensorlite", "models", f"{stem}_int8.tflite"))
+        shutil.copy2(exported, os.path.join(base_path, default))
+        print(f"   ✅ {default} (runner default)")
+    return dest
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Export YOLO models at several input sizes and precisions")
+    parser.add_argument("--models", nargs="+", default=[name for name, _ in MODELS],
+                        help="Models to export (" + ", ".join(name for name, _ in MODELS) + ")")
+    parser.add_argument("--imgsz", type=int, nargs="+", default=DEFAULT_SIZES, help="Input sizes")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=FORMATS,
+                        help="TFLite precisions and/or onnx")
+    parser.add_argument("--onnx-dynamic", action="store_true",
+                        help="Export ONNX with a dynamic batch (batch_benchmark.py, several ROIs)")
+    parser.add_argument("--manifest", default=MANIFEST_PATH)
+    parser.add_argument("--yes", action="store_true", help="Don't ask before exporting on a Raspberry Pi")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    print("=" * 60)
+    print("🚀 YOLO to TFLite / ONNX Exporter")
+    print("=" * 60)
+    print()
+
+    # Detect where we are running
+    if os.path.exists("/home/pi"):
+        print("⚠️  WARNING: You are running this on Raspberry Pi!")
+        print("   TensorFlow export is very slow and may fail on Pi.")
+        print()
+        print("💡 RECOMMENDED: Export on your PC instead:")
+        print("   1. Clone this repo on your PC")
+        print("   2. Run: python export_models_to_tflite.py")
+        print("   3. Copy tensorlite/models/, models/*.onnx and models/export_manifest.json to Pi")
+        print()
+        if not args.yes and input("Continue anyway? (y/N): ").lower() != 'y':
+            print("Exiting...")
+            return 0
+        print("📍 Running on Raspberry Pi")
+    else:
+        print("📍 Detected: Running on PC (recommended)")
+    print(f"📁 Working directory: {base_path}")
+    print(f"🧮 Sizes: {', '.join(map(str, args.imgsz))} | formats: {', '.join(args.formats)}")
+    print()
+
+    manifest = load_manifest(args.manifest)
+    precisions = [f for f in args.formats if f in TFLITE_PRECISIONS]
+    exported_files = []
+    failed = []
+    for name, weights in MODELS:
+        if name not in args.models:
+            continue
+        model_path = os.path.join(base_path, weights)
+        stem = os.path.splitext(os.path.basename(weights))[0]
+        print(f"📦 Exporting {name}...")
+        print(f"   Source: {model_path}")
         try:
-            # Extract just the filename for download
-            model_file = os.path.basename(model_path)
-            model = YOLO(model_file)
-            print(f"   ✅ Downloaded: {model_file}")
+            model = load_model(model_path)
         except Exception as e:
-            print(f"   ❌ Failed to download: {e}")
+            print(f"   ❌ Failed to load: {e}")
+            failed.append(name)
             continue
-    else:
-        model = YOLO(model_path)
-        print(f"   ✅ Loaded from disk")
-    
-    try:
-        # Export to TFLite INT8
-        print(f"   🔄 Exporting to TFLite INT8 format...")
-        export_path = model.export(format="tflite", int8=True)
-        print(f"   ✅ Export successful!")
-        print(f"   📁 Output: {export_path}")
-        exported_files.append((export_path, model_name))
+
+        for imgsz in args.imgsz:
+            if precisions:
+                print(f"   🔄 TFLite {'/'.join(precisions)} at {imgsz}px...")
+                try:
+                    for precision, path in export_tflite(model, imgsz, precisions).items():
+                        exported_files.append(record(manifest, name, stem, precision, imgsz, weights, path))
+                except Exception as e:
+                    print(f"   ❌ Export failed: {e}")
+                    failed.append(f"{name} tflite {imgsz}")
+            if "onnx" in args.formats:
+                print(f"   🔄 ONNX at {imgsz}px...")
+                try:
+                    path = model.export(format="onnx", imgsz=imgsz, dynamic=args.onnx_dynamic)
+                    exported_files.append(record(manifest, name, stem, "onnx", imgsz, weights, path))
+                except Exception as e:
+                    print(f"   ❌ Export failed: {e}")
+                    failed.append(f"{name} onnx {imgsz}")
+            # The manifest is saved as we go, so a failed size doesn't lose the others
+            save_manifest(manifest, args.manifest)
         print()
-    except Exception as e:
-        print(f"   ❌ Export failed: {e}")
+
+    # Summary
+    print("=" * 60)
+    print("📊 Export Summary")
+    print("=" * 60)
+    if not exported_files:
+        print("❌ No models were exported successfully.")
         print()
+        print("💡 Make sure you have:")
+        print("   - Installed ultralytics: pip install ultralytics")
+        print("   - Model files in models/ directory, or")
+        print("   - Internet connection to download models")
+        return 1
+
+    print(f"✅ Successfully exported {len(exported_files)} variant(s), manifest: {args.manifest}\n")
+    for path in exported_files:
+        print(f"   • {path}")
+    if failed:
+        print(f"\n⚠️  Failed: {', '.join(failed)}")
 
-# Summary
-print("="*60)
-print("📊 Export Summary")
-print("="*60)
-
-if exported_files:
-    print(f"✅ Successfully exported {len(exported_files)} model(s):\n")
-    for export_path, model_name in exported_files:
-        print(f"   • {model_name}: {export_path}")
-    
-    print("\n" + "="*60)
+    print("\n" + "=" * 60)
     print("📝 NEXT STEPS:")
-    print("="*60)
-    
-    # Create tensorlite/models directory if it doesn't exist
-    tflite_models_dir = os.path.join(base_path, "tensorlite/models")
-    os.makedirs(tflite_models_dir, exist_ok=True)
-    
-    # Copy files to tensorlite/models/
-    print("📦 Copying files to tensorlite/models/...")
-    for export_path, model_name in exported_files:
-        filename = os.path.basename(export_path)
-        dest_path = os.path.join(tflite_models_dir, filename)
-        try:
-            import shutil
-            shutil.copy2(export_path, dest_path)
-            print(f"   ✅ Copied: {filename}")
-        except Exception as e:
-            print(f"   ⚠️  Manual copy needed: {export_path} → {dest_path}")
-    
-    print()
+    print("=" * 60)
     if os.path.exists("/home/pi"):
-        print("🎯 You're on Raspberry Pi! Run the benchmark:")
-        print("   cd tensorlite")
-        print("   ./setup_tflite.sh")
-        print("   ./run_yolo8n_tflite.sh")
+        print("🎯 You're on Raspberry Pi! Pick the largest size that keeps up:")
+        print("   python3 scripts/select_model.py --model yolo8n --target-fps 10 --source synthetic")
     else:
         print("🎯 Transfer to Raspberry Pi:")
-        print("   scp -r tensorlite pi@raspberrypi:~/yolo_test/")
-    print("="*60)
-else:
-    print("❌ No models were exported successfully.")
-    print()
-    print("💡 Make sure you have:")
-    print("   - Installed ultralytics: pip install ultralytics")
-    print("   - Model files in models/ directory, or")
-    print("   - Internet connection to download models")
+        print("   scp -r tensorlite/models pi@raspberrypi:~/yolo_test/tensorlite/")
+        print("   scp models/*.onnx models/export_manifest.json pi@raspberrypi:~/yolo_test/models/")
+        print("   Then on the Pi: python3 scripts/select_model.py --model yolo8n --target-fps 10")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""
+Batched throughput benchmark for offline/replay sources.
+
+For recorded footage total throughput matters, not per-frame latency: frames
+are read from a replay source and preprocessed straight into the slots of a
+batch-sized model input (NHWC for TFLite, NCHW for ONNX), then inferred in
+one call. Ultralytics models get the frames as one list.
+
+Every batch size given is run on the same frames and ranked by frames per
+CPU-second ("FPS per core": frames / process CPU time), the number that
+tells how much footage a host can get through with all its cores busy.
+
+Examples:
+    python3 scripts/batch_benchmark.py --model yolo8n --backend tflite --source video:clip.mp4
+    python3 scripts/batch_benchmark.py --model models/yolov8n.onnx --batch 1 4 8 16 --frames 512 --source synthetic
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from detector import create_detector
+from frame_sources import open_source
+from run_benchmark import MODELS, resolve_model
+
+DEFAULT_BATCH_SIZES = [1, 2, 4, 8]
+
+
+def run_batch(detector, source, batch_size, num_frames, warmup_batches=2):
+    """
+    Detect num_frames replay frames in batches of batch_size; returns a dict
+    with wall-clock FPS, FPS per CPU core and per-batch latency.
+    """
+    detector.set_batch_size(batch_size)
+    cap = open_source(source, paced=False)
+    frames = []
+
+    def next_batch():
+        frames.clear()
+        while len(frames) < batch_size:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        return frames
+
+    try:
+        for _ in range(warmup_batches):
+            if next_batch():
+                detector.detect_batch(frames)
+
+        done = 0
+        detections = 0
+        batches = 0
+        inference_ns = 0
+        wall_start = time.perf_counter_ns()
+        cpu_start = time.process_time()  # every thread of this process (inference workers too)
+        while done < num_frames and next_batch():
+            results = detector.detect_batch(frames)
+            done += len(results)
+            detections += sum(len(d) for d in results)
+            inference_ns += detector.timings_ns.get("inference", 0)
+            batches += 1
+        cpu_s = time.process_time() - cpu_start
+        wall_s = (time.perf_counter_ns() - wall_start) / 1e9
+    finally:
+        cap.release()
+
+    return {
+        "batch_size": batch_size,
+        "frames": done,
+        "wall_s": wall_s,
+        "cpu_s": cpu_s,
+        "fps": done / wall_s if wall_s else 0.0,
+        "fps_per_core": done / cpu_s if cpu_s else 0.0,
+        "cores_busy": cpu_s / wall_s if wall_s else 0.0,
+        "batch_ms": wall_s * 1000 / batches if batches else 0.0,
+        "inference_ms_per_frame": inference_ns / 1e6 / done if done else 0.0,
+        "detections": detections,
+    }
+
+
+def sweep(detector, source, batch_sizes, num_frames, warmup_batches=2):
+    """run_batch() for every batch size; batch sizes the model can't take are reported and skipped"""
+    results = []
+    for batch_size in batch_sizes:
+        print(f"📦 Batch {batch_size}...")
+        try:
+            result = run_batch(detector, source, batch_size, num_frames, warmup_batches)
+        except Exception as e:
+            print(f"⚠️  Batch size {batch_size} failed: {e}")
+            continue
+        print(f"   {result['fps']:.2f} FPS | {result['fps_per_core']:.2f} FPS/core | {result['batch_ms']:.1f} ms/batch")
+        results.append(result)
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Find the batch size with the best throughput per core")
+    parser.add_argument("--model", default="yolo8n", help=f"Model name ({', '.join(MODELS)}) or model file")
+    parser.add_argument("--backend", choices=["pytorch", "tflite", "onnx"], default="pytorch",
+                        help="Format for model names (files use their extension)")
+    parser.add_argument("--source", default="synthetic", help='Replay source, e.g. "video:clip.mp4" or "images:dir"')
+    parser.add_argument("--batch", type=int, nargs="+", default=DEFAULT_BATCH_SIZES, help="Batch sizes to try")
+    parser.add_argument("--frames", type=int, default=256, help="Measured frames per batch size")
+    parser.add_argument("--warmup-batches", type=int, default=2)
+    parser.add_argument("--imgsz", type=int, default=320)
+    parser.add_argument("--threads", type=int, default=None, help="Inference CPU threads")
+    parser.add_argument("--conf", type=float, default=0.25)
+    parser.add_argument("--iou", type=float, default=0.7)
+    parser.add_argument("--output", default=None, help="Write the results as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        name, model_path, backend = resolve_model(args.model, args.backend)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    if not os.path.exists(model_path) and backend != "pytorch":
+        print(f"❌ Model not found: {model_path}")
+        return 1
+
+    print(f"📦 Loading model: {model_path}")
+    detector = create_detector(model_path, imgsz=args.imgsz, conf=args.conf, iou=args.iou, num_threads=args.threads)
+    print(f"✅ Backend: {detector.describe()} | source: {args.source} | {args.frames} frames per batch size")
+    try:
+        results = sweep(detector, args.source, args.batch, args.frames, args.warmup_batches)
+    finally:
+        detector.close()
+    if not results:
+        print("❌ No batch size could be run")
+        return 1
+
+    ranked = sorted(results, key=lambda r: r["fps_per_core"], reverse=True)
+    print(f"\n| Batch | Frames | FPS | FPS/core | Cores busy | ms/batch | Inference ms/frame |")
+    print(f"|-------|--------|-----|----------|------------|----------|--------------------|")
+    for r in ranked:
+        print(f"| {r['batch_size']} | {r['frames']} | {r['fps']:.2f} | {r['fps_per_core']:.2f} | {r['cores_busy']:.2f}"
+              f" | {r['batch_ms']:.1f} | {r['inference_ms_per_frame']:.1f} |")
+    best = ranked[0]
+    print(f"\n🏆 Best batch size on this host: {best['batch_size']} ({best['fps_per_core']:.2f} FPS per core,"
+          f" {best['fps']:.2f} FPS)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"created": datetime.now().isoformat(timespec="seconds"), "model": name, "backend": backend,
+                       "detector": detector.describe(), "source": args.source, "cpu_cores": os.cpu_count(),
+                       "best_batch_size": best["batch_size"], "results": results}, f, indent=2)
+        print(f"📊 Results saved to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
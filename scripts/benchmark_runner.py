@@ -0,0 +1,511 @@
+"""
+Shared benchmark loop for every model format.
+
+Capture and detection run in their own pipeline threads; rendering and
+logging run on the main thread. The per-model scripts
+(run_yolo8n.py, tensorlite/scripts/run_yolo8n_tflite.py, ...) only choose
+the model and camera and call run_test().
+"""
+
+import json
+import math
+import os
+import signal
+import time
+from collections import deque
+import cv2
+from detector import create_detector
+from frame_log import FrameLogWriter, export_csv, log_base, make_dtype
+from generate_report import aggregate_log, generate_markdown_report
+from motion_gate import MAX_STALE, MotionGate
+from overlay import DISPLAY_FPS, OverlayRenderer
+from pipeline import Pipeline
+from roi import RoiDetector
+from scheduler import create_scheduler
+from system_monitor import TelemetrySampler, describe_throttled
+from tracker import Tracker
+from warmup import WarmupTracker
+
+LOG_COLUMNS = ["frame", "warmup", "model_fps", "pipeline_fps", "latency_ms", "cpu", "ram", "temp",
+               "cpu_freq_mhz", "throttled", "detections", "tracks", "inferred", "imgsz", "motion_score",
+               "capture_ms", "detect_ms", "preprocess_ms", "inference_ms", "postprocess_ms",
+               "decode_ms", "nms_ms", "track_ms", "render_ms", "log_ms", "detect_queue", "render_queue"]
+INT_COLUMNS = ("frame", "warmup", "throttled", "detections", "inferred", "imgsz", "detect_queue", "render_queue")
+PIPELINE_FPS_WINDOW = 30  # frames over which the pipeline FPS column is measured
+TELEMETRY_INTERVAL = 0.5  # seconds between system telemetry samples
+CONSOLE_INTERVAL = 1.0  # seconds between console summary lines (0 = a line per frame)
+
+# Global flag for graceful shutdown
+interrupted = False
+
+
+def signal_handler(sig, frame):
+    global interrupted
+    print("\n\n⏹️  Test interrupted by user (Ctrl+C)")
+    interrupted = True
+
+
+def _ms(timings_ns, phase):
+    """Phase time in ms, NaN if the backend doesn't report that phase"""
+    return timings_ns[phase] / 1e6 if phase in timings_ns else math.nan
+
+
+def meta_path_for(log_path):
+    """logs/<run>.csv (or its binary log) → logs/<run>_meta.json"""
+    return f"{log_base(log_path)}_meta.json"
+
+
+class ConsoleSummary:
+    """
+    Rate-limited console output: frames are added as they finish and one
+    summary line covering the last `interval` seconds is printed when due,
+    instead of formatting a line (and object labels) for every frame.
+    """
+    __slots__ = ("interval_ns", "start_ns", "frames", "inferred", "detect_ns", "latency_ms", "max_latency_ms",
+                 "detections")
+
+    def __init__(self, interval):
+        self.interval_ns = int(interval * 1e9)
+        self.start_ns = time.perf_counter_ns()
+        self._reset()
+
+    def _reset(self):
+        self.frames = 0
+        self.inferred = 0
+        self.detect_ns = 0
+        self.latency_ms = 0.0
+        self.max_latency_ms = 0.0
+        self.detections = 0
+
+    def add(self, detect_ns, latency_ms, detections, inferred=True):
+        self.frames += 1
+        if inferred:
+            self.inferred += 1
+            self.detect_ns += detect_ns
+        self.latency_ms += latency_ms
+        self.max_latency_ms = max(self.max_latency_ms, latency_ms)
+        self.detections += detections
+
+    def due(self, now_ns):
+        return self.frames > 0 and now_ns - self.start_ns >= self.interval_ns
+
+    def line(self, now_ns):
+        """Summary of the frames since the last line; starts the next interval"""
+        model_fps = self.inferred * 1e9 / self.detect_ns if self.detect_ns else math.nan
+        text = (f"FPS model/pipeline: {model_fps:.2f}/"
+                f"{self.frames * 1e9 / (now_ns - self.start_ns):.2f}"
+                f" | Latency avg/max: {self.latency_ms / self.frames:.1f}/{self.max_latency_ms:.1f} ms"
+                f" | Detections/frame: {self.detections / self.frames:.1f}")
+        self.start_ns = now_ns
+        self._reset()
+        return text
+
+
+def _summarize(log):
+    """Mean of every logged column plus FPS and latency spread, from a LogAggregate of the measured frames"""
+    summary = {}
+    for column in LOG_COLUMNS[2:]:
+        if column == "throttled":
+            # Bitmask: report every flag seen during the run (None = not available)
+            summary["throttled"] = log.throttled
+            continue
+        if not math.isnan(log.value(column)):
+            summary[f"{column}_mean"] = log.value(column)
+    summary.update(model_fps_min=log.value("model_fps", "min"), model_fps_max=log.value("model_fps", "max"),
+                   model_fps_std=log.value("model_fps", "std"), model_fps_p50=log.quantile("model_fps", 0.50),
+                   latency_ms_p50=log.quantile("latency_ms", 0.50), latency_ms_p95=log.quantile("latency_ms", 0.95),
+                   latency_ms_p99=log.quantile("latency_ms", 0.99), temp_max=log.value("temp", "max"),
+                   cpu_freq_mhz_min=log.value("cpu_freq_mhz", "min"))
+    return summary
+
+
+def run_test(model_name, model_path, get_camera, log_path=None, test_duration=30, img_size=320,
+             show_display=True, camera_size=(320, 240), threaded=True, source="camera", paced=True,
+             queue_size=2, detector_options=None, max_frames=None, warmup_frames=0, warmup_seconds=0.0,
+             warmup_until_steady=False, log_format="auto", csv_export=True, console_interval=CONSOLE_INTERVAL,
+             display_fps=DISPLAY_FPS, schedule=None, motion_gate=None, max_stale=MAX_STALE,
+             track=False, rois=None):
+    """
+    Benchmark one model and write the frame log and markdown report. The
+    backend is picked from the model file extension. get_camera is the
+    camera module's get_camera_stream function. The log defaults to
+    logs/<model>.csv for .pt models, logs/<model>_<backend>.csv otherwise.
+
+    Frames are logged by a FrameLogWriter (log_format "npy", "parquet" or
+    "auto", see frame_log.py) next to log_path; with csv_export=True the
+    binary log is exported to log_path as CSV once the run is over.
+
+    The run stops after test_duration seconds or max_frames measured frames,
+    whichever comes first (None = no limit). Warmup (at least warmup_frames
+    frames and warmup_seconds seconds, optionally until latency is steady,
+    see WarmupTracker) is logged with warmup=1 but excluded from stats and
+    from the duration. Cold-start costs (model load, first inference) and
+    warmup details go to a <log>_meta.json sidecar read by the report.
+
+    Timings use time.perf_counter_ns(). model_fps counts only the detector
+    (preprocess + inference + postprocess); pipeline_fps is the rate at which
+    results actually come out of the whole capture → detect → render/log
+    chain, over wall time. latency_ms is glass-to-result: from the frame's
+    capture timestamp to the end of its render.
+
+    The live view is drawn by an OverlayRenderer at most display_fps times
+    a second (None = every frame); without a display nothing is drawn. The console gets one summary line
+    every console_interval seconds; 0 prints a line with the detected
+    objects for every frame.
+
+    schedule picks the frames that are inferred ("every", "stride:N",
+    "fps:F" or "thermal:F", see scheduler.py); the others reuse the last
+    detections and are logged with inferred=0 and no model timings. Warmup
+    frames are always inferred.
+
+    With motion_gate (a fraction of changed blocks, see motion_gate.py)
+    frames of a static scene are skipped too, until the scene changes or
+    the last inference is max_stale seconds old. motion_score logs each
+    frame's change score; the skip ratio and the estimated CPU time saved
+    go to the summary and the meta sidecar.
+
+    With track=True a Tracker (see tracker.py) follows the detections on
+    every frame, inferred or not: the display shows tracked boxes with
+    their IDs, `tracks` logs the number of tracked objects per frame
+    (`detections` stays the raw count of the last inference) and
+    `track_ms` the tracker's time.
+
+    rois limits detection to zones of the frame ((x, y, w, h) tuples or
+    "x,y,w,h" strings, pixels or fractions, see roi.py): every zone is
+    letterboxed to the model input on its own, all zones run as one batch
+    and their boxes are merged back into frame coordinates.
+
+    Returns a summary dict of the run (None if nothing was measured).
+    """
+    run_start = time.perf_counter_ns()
+    global interrupted
+    interrupted = False
+
+    # Register signal handler for Ctrl+C
+    signal.signal(signal.SIGINT, signal_handler)
+
+    print(f"\n=== Running test for {model_name} ===\n")
+    print(f"💡 Press Ctrl+C or 'q' to stop and generate report\n")
+
+    # Check if model exists
+    if not os.path.exists(model_path):
+        print(f"❌ Model not found: {model_path}")
+        if not model_path.endswith(".pt"):
+            print(f"💡 Export it on your PC first (see export_models_to_tflite.py)")
+            return None
+        print(f"Downloading {model_name}...")
+
+    print(f"📦 Loading model: {model_path}")
+    t0 = time.perf_counter_ns()
+    detector = create_detector(model_path, imgsz=img_size, **(detector_options or {}))
+    cold_start = {"model_load_ms": (time.perf_counter_ns() - t0) / 1e6}
+    if rois:
+        detector = RoiDetector(detector, rois)
+    print(f"✅ Backend: {detector.describe()} (loaded in {cold_start['model_load_ms']:.0f} ms)")
+    try:
+        scheduler = create_scheduler(schedule, detector)
+    except ValueError as e:
+        print(f"❌ {e}")
+        detector.close()
+        return None
+    if scheduler.mode != "every":
+        print(f"⏭️  Schedule: {scheduler.describe()} (other frames reuse the last detections)")
+    gate = MotionGate(motion_gate, max_stale) if motion_gate else None
+    if gate is not None:
+        print(f"🎯 Motion gate: inferring when {gate.describe()}")
+    tracker = Tracker() if track else None
+    if log_path is None:
+        suffix = "" if detector.backend == "pytorch" else f"_{detector.backend}"
+        log_path = f"logs/{model_name}{suffix}.csv"
+
+    width, height = camera_size
+    # Frames can sit in both queues and both stages while the camera captures the next one;
+    # the pool grows if more are in flight (each frame's buffer is handed back once it is logged or dropped)
+    cap = get_camera(width=width, height=height, threaded=threaded, source=source, paced=paced,
+                     frames_in_flight=2 * queue_size + 2)
+
+    # Check if camera opened successfully
+    if cap is None or not cap.isOpened():
+        print("❌ Error: Could not open camera!")
+        print("💡 Try enabling camera: sudo raspi-config → Interface Options → Camera")
+        print("💡 Or install required packages: sudo apt-get install libcamera-apps python3-libcamera")
+        detector.close()
+        return None
+
+    # Released however the run ends, so a sweep goes on with a free camera
+    pipeline = telemetry = None
+    try:
+        frame_count = 0  # measured frames
+        logged = 0  # measured and warmup frames
+        warmup = WarmupTracker(warmup_frames, warmup_seconds, until_steady=warmup_until_steady)
+        result_times = deque(maxlen=PIPELINE_FPS_WINDOW)  # perf_counter_ns() at which recent results were done
+        log_ns = 0
+        console = ConsoleSummary(console_interval)
+        overlay = OverlayRenderer(detector.names, display_fps) if show_display else None
+
+        # Capture and detection run in their own threads; rendering and logging
+        # stay on the main thread (cv2.imshow needs it)
+        def release_frame(packet):
+            if threaded:
+                cap.release_buffer(packet["seq"])
+
+        # An unpaced replay is read as fast as the pipeline consumes it: every frame is inferred once
+        lossless = not paced and source not in (None, "camera")
+        pipeline = Pipeline(queue_size=queue_size, sink="render", on_drop=release_frame, lossless=lossless)
+
+        def capture():
+            if threaded:
+                ret, frame, seq, captured_ns = cap.read_packet()
+            else:
+                ret, frame = cap.read()
+                seq, captured_ns = None, time.perf_counter_ns()
+            if not ret:
+                print("❌ Failed to grab frame from camera")
+                return None
+            return {"frame": frame, "seq": seq, "captured_ns": captured_ns}
+
+        last_detections = None
+
+        def detect(packet):
+            nonlocal last_detections
+            if gate is not None:
+                packet["motion_score"] = gate.update(packet["frame"])
+            if warmup.active:
+                packet["inferred"] = True
+            elif scheduler.should_infer(packet["captured_ns"], telemetry.latest):
+                # The schedule sees every measured frame (its first one is always allowed, and so
+                # is it by the gate, which has no reference yet); the gate only sees the frames it allows
+                packet["inferred"] = gate is None or gate.should_infer(packet["captured_ns"])
+                scheduler.record(packet["inferred"])
+            else:
+                packet["inferred"] = False
+            if packet["inferred"]:
+                last_detections = detector.detect(packet["frame"])
+                packet["model_timings_ns"] = detector.timings_ns
+                if gate is not None:
+                    gate.inferred(packet["captured_ns"])
+            else:
+                packet["model_timings_ns"] = {}
+            packet["detections"] = last_detections
+            if tracker is not None:
+                t0 = time.perf_counter_ns()
+                if packet["inferred"]:
+                    packet["tracks"] = tracker.update(last_detections, packet["captured_ns"])
+                else:
+                    packet["tracks"] = tracker.predict(packet["captured_ns"])
+                packet["track_ns"] = time.perf_counter_ns() - t0
+            packet["imgsz"] = detector.imgsz
+            return packet
+
+        pipeline.add_source("capture", capture)
+        pipeline.add_stage("detect", detect)
+
+        # System stats come from a background sampler; each frame takes the latest sample
+        telemetry = TelemetrySampler(TELEMETRY_INTERVAL).start()
+        core_columns = [f"cpu{i}" for i in range(len(telemetry.latest.cpu_per_core))]
+
+        log_dtype = make_dtype(LOG_COLUMNS + core_columns, INT_COLUMNS)
+
+        # Closed (last chunk flushed) however the loop ends
+        with FrameLogWriter(log_path, log_dtype, format=log_format) as frame_log:
+            pipeline.start()
+            if warmup.active:
+                print(f"🔥 Warming up ({warmup_frames} frames, {warmup_seconds:g} s"
+                      f"{', until latency is steady' if warmup_until_steady else ''})...")
+            start_ns = time.perf_counter_ns()
+            while not interrupted:
+                if not warmup.active and ((test_duration is not None and time.perf_counter_ns() - start_ns >= test_duration * 1e9)
+                                          or (max_frames is not None and frame_count >= max_frames)):
+                    break
+                packet = pipeline.get(timeout=0.5)
+                if packet is None:
+                    if pipeline.finished:
+                        break
+                    continue
+
+                t0 = time.perf_counter_ns()
+                logged += 1
+                detections = packet["detections"]
+                timings_ns = packet["timings_ns"]
+                model_timings_ns = packet["model_timings_ns"]
+                inferred = packet["inferred"]
+                # Model FPS covers preprocessing, inference and post-processing for every backend
+                model_fps = 1e9 / timings_ns["detect"] if inferred else math.nan
+                detect_ms = timings_ns["detect"] / 1e6 if inferred else math.nan
+
+                # Display live view if display is available
+                if show_display:
+                    try:
+                        # Drawn at the display rate only; None between refreshes
+                        annotated_frame = overlay.render(packet["frame"], packet.get("tracks", detections))
+                        if annotated_frame is not None:
+                            cv2.imshow(f'{model_name} - YOLO Live Detection ({detector.backend})', annotated_frame)
+                            # Press 'q' to quit early
+                            if cv2.waitKey(1) & 0xFF == ord('q'):
+                                print("\n⏹️  Stopped by user (pressed 'q')")
+                                interrupted = True
+                    except:
+                        # If display fails, disable it
+                        show_display = False
+                        print("⚠️  Display not available, running in headless mode")
+
+                # The result is out once it has been rendered
+                t_result = time.perf_counter_ns()
+                pipeline.record("render", t_result - t0, packet)
+                latency_ms = (t_result - packet["captured_ns"]) / 1e6
+                result_times.append(t_result)
+                if len(result_times) > 1:
+                    pipeline_fps = (len(result_times) - 1) * 1e9 / (result_times[-1] - result_times[0])
+                else:
+                    pipeline_fps = math.nan
+
+                if logged == 1:
+                    cold_start.update(first_detect_ms=timings_ns["detect"] / 1e6,
+                                      first_inference_ms=_ms(model_timings_ns, "inference"),
+                                      time_to_first_result_ms=(t_result - run_start) / 1e6)
+                was_warming_up = warmup.active
+                in_warmup = warmup.update(timings_ns["detect"] / 1e9) if inferred else False
+                if was_warming_up and not in_warmup:
+                    # The duration and pipeline FPS count measured frames only
+                    start_ns = t_result
+                    result_times.clear()
+                    result_times.append(t_result)
+                    print(f"✅ Warmup done: {warmup.describe()}")
+                if not in_warmup:
+                    frame_count += 1
+
+                # Logging: system stats, console line and the log record. Its own time is
+                # only known once the record is built, so log_ms is the previous frame's.
+                stats = telemetry.latest
+                cpu, ram, temp = stats.cpu, stats.ram, stats.temp
+                depths = pipeline.queue_depths()
+                frame_log.append((logged, in_warmup, model_fps, pipeline_fps, latency_ms, cpu, ram, temp,
+                                  stats.freq_mhz[0], -1 if stats.throttled is None else stats.throttled,
+                                  len(detections), len(packet["tracks"]) if tracker is not None else math.nan,
+                                  inferred, packet["imgsz"], packet.get("motion_score", math.nan),
+                                  timings_ns["capture"] / 1e6, detect_ms,
+                                  _ms(model_timings_ns, "preprocess"), _ms(model_timings_ns, "inference"),
+                                  _ms(model_timings_ns, "postprocess"), _ms(model_timings_ns, "decode"),
+                                  _ms(model_timings_ns, "nms"), packet.get("track_ns", math.nan) / 1e6,
+                                  timings_ns["render"] / 1e6, log_ns / 1e6,
+                                  depths["detect"], depths["render"], *stats.cpu_per_core))
+
+                if console_interval <= 0:
+                    detected_objects = packet.get("tracks", detections).labels(detector.names)
+                    detection_str = ", ".join(detected_objects) if detected_objects else "None"
+                    print(f"{model_name} {detector.backend} | Frame: {logged}{' (warmup)' if in_warmup else ''} | FPS model/pipeline: {model_fps:.2f}/{pipeline_fps:.2f} | Latency: {latency_ms:.1f} ms | CPU: {cpu:.1f}% | RAM: {ram:.1f}% | Temp: {temp:.1f}°C | Detections: {len(detections)} | Objects: [{detection_str}]"
+                          f" | ms pre/inf/post: {_ms(model_timings_ns, 'preprocess'):.1f}/{_ms(model_timings_ns, 'inference'):.1f}/{_ms(model_timings_ns, 'postprocess'):.1f}"
+                          f" | Queue det/render: {depths['detect']}/{depths['render']}")
+                else:
+                    console.add(timings_ns["detect"], latency_ms, len(detections), inferred)
+                    if console.due(t_result):
+                        print(f"{model_name} {detector.backend} | Frame: {logged}{' (warmup)' if in_warmup else ''}"
+                              f" | {console.line(t_result)} | CPU: {cpu:.1f}% | Temp: {temp:.1f}°C"
+                              f" | Queue det/render: {depths['detect']}/{depths['render']}")
+                release_frame(packet)
+                log_ns = time.perf_counter_ns() - t_result
+                pipeline.record("log", log_ns)
+
+        # Pipeline throughput over wall time, from the end of warmup to the last result
+        elapsed = (result_times[-1] - start_ns) / 1e9 if frame_count else 0.0
+    finally:
+        if pipeline is not None:
+            pipeline.stop()
+        if telemetry is not None:
+            telemetry.stop()
+        cap.release()
+        detector.close()
+        if show_display:
+            cv2.destroyAllWindows()
+    if threaded:
+        grown = f", {cap.grown} buffer(s) added to the pool" if getattr(cap, "grown", 0) else ""
+        print(f"\n📷 Camera: {cap.seq} frames captured, {cap.dropped} replaced before being read{grown}")
+
+    if pipeline.error is not None:
+        print(f"⚠️  Pipeline stage failed: {pipeline.error}")
+    print("\n⏱️  Pipeline stages:")
+    print(pipeline.summary())
+
+    # Always generate report, even if interrupted
+    if frame_count == 0:
+        print(f"\n⚠️  No frames collected after warmup, skipping report generation")
+        return None
+
+    throughput_fps = frame_count / elapsed if elapsed > 0 else math.nan
+    print(f"\n✅ Test complete for {model_name} ({detector.backend})! Collected {frame_count} frames")
+    print(f"⏱️  Pipeline throughput: {throughput_fps:.2f} FPS over {elapsed:.1f} s wall time")
+    stats_summary = _summarize(aggregate_log(frame_log.path))
+    print(f"🌡️  Max temp {stats_summary['temp_max']:.1f}°C | min CPU clock {stats_summary['cpu_freq_mhz_min']:.0f} MHz"
+          f" | throttling: {describe_throttled(stats_summary['throttled'])}")
+    print(f"🔥 {warmup.describe()}")
+    if scheduler.mode != "every" or gate is not None:
+        print(f"⏭️  Inferred {scheduler.inferred} measured frames | skipped {scheduler.skipped} by the schedule,"
+              f" {scheduler.gated} by the motion gate")
+    gate_stats = gate.to_dict(stats_summary.get("detect_ms_mean", math.nan)) if gate is not None else {}
+    if gate is not None:
+        print(f"🎯 Motion gate: skipped {gate_stats['motion_skipped']} of the {gate_stats['motion_checked']} frames"
+              f" the schedule allowed"
+              f" ({gate_stats['motion_skip_ratio']:.0%}, {gate_stats['motion_stale']} inferred as stale)"
+              f" | gate {gate_stats['motion_gate_ms_mean']:.3f} ms/frame | ~{gate_stats['motion_cpu_saved_s']:.1f} s CPU saved")
+    print(f"🧊 Cold start: model load {cold_start['model_load_ms']:.0f} ms | first frame {cold_start['first_detect_ms']:.0f} ms"
+          f" | first result after {cold_start['time_to_first_result_ms']:.0f} ms")
+    print(f"📊 Frame log saved to {frame_log.path} ({frame_log.format}, {frame_log.chunks} chunks)")
+    csv_path = None
+    if csv_export:
+        csv_path = export_csv(frame_log.path, log_path)
+        print(f"📊 Exported to {csv_path}")
+
+    # Run details the CSV can't hold, read by the report
+    meta = {
+        "model": model_name,
+        "backend": detector.backend,
+        "detector": detector.describe(),
+        "imgsz": detector.imgsz,
+        "num_threads": detector.num_threads,
+        "cold_start": cold_start,
+        "warmup": warmup.to_dict(),
+        "schedule": scheduler.to_dict(),
+        "motion_gate": gate_stats or None,
+        "tracker": tracker.to_dict() if tracker is not None else None,
+        "rois": detector.describe_rois() if rois else None,
+        "throughput": {"frames": frame_count, "duration_s": elapsed, "pipeline_fps": throughput_fps},
+    }
+    with open(meta_path_for(log_path), "w") as f:
+        json.dump(meta, f, indent=2)
+
+    # Generate markdown report with graphs
+    print(f"📈 Generating markdown report...")
+    report_path = None
+    try:
+        report_path = generate_markdown_report(model_name, csv_path or frame_log.path, backend=detector.backend)
+    except Exception as e:
+        print(f"⚠️  Failed to generate report: {e}")
+
+    summary = {
+        "model": model_name,
+        "backend": detector.backend,
+        "model_path": model_path,
+        "detector": detector.describe(),
+        "imgsz": detector.imgsz,
+        "num_threads": detector.num_threads,
+        "source": source,
+        "paced": paced,
+        "rois": detector.describe_rois() if rois else None,
+        "frames": frame_count,
+        "duration_s": elapsed,
+        "throughput_fps": throughput_fps,
+        "interrupted": interrupted,
+        "camera_dropped": cap.dropped if threaded else 0,
+        "pipeline_dropped": sum(pipeline.dropped().values()),
+        "log_path": frame_log.path,
+        "csv_path": csv_path,
+        "report_path": report_path,
+    }
+    summary.update(stats_summary)
+    summary.update(cold_start)
+    summary.update(warmup.to_dict())
+    summary.update(scheduler.to_dict())
+    summary.update(gate_stats)
+    if tracker is not None:
+        summary.update(tracker.to_dict())
+    return summary
@@ -2,15 +2,22 @@ import cv2
 import subprocess
 import os
 import numpy as np
-from picamera2 import Picamera2
 from threading import Thread
 import time
+from frame_grabber import LatestFrameGrabber
+from frame_sources import open_source
+try:
+    from picamera2 import Picamera2
+except ImportError:
+    Picamera2 = None  # Replay/synthetic sources still work without picamera2
 
 class RpiCameraStream:
     """Camera stream using picamera2 for Raspberry Pi"""
     def __init__(self, width=320, height=240):
         self.width = width
         self.height = height
+        if Picamera2 is None:
+            raise ImportError("picamera2 is not installed")
         self.camera = Picamera2()
         
         # Configure camera
@@ -46,16 +53,47 @@ class RpiCameraStream:
         """Dummy set method for compatibility"""
         pass
 
-def get_camera_stream(width=320, height=240):
+def get_camera_stream(width=320, height=240, threaded=False, source="camera", paced=True, frames_in_flight=1):
     """
     Get camera stream for Raspberry Pi using picamera2 (libcamera).
+    With threaded=True frames are captured on a background thread and read()
+    returns only the newest one (see LatestFrameGrabber).
+
+    Any other `source` ("synthetic", "video:clip.mp4", "images:dir",
+    "npy:frames.npy", see frame_sources.py) replays frames instead of using the
+    camera; paced=False replays them as fast as the pipeline consumes them.
+
+    frames_in_flight is accepted for parity with the V4L2 camera module:
+    picamera2 returns a new array per frame, so frames always stay valid.
     """
+    if source and source != "camera":
+        return get_replay_stream(source, width, height, threaded, paced)
     try:
         print("🎥 Initializing camera with picamera2 (libcamera)...")
         cam = RpiCameraStream(width, height)
-        print(f"✅ Camera initialized: {width}x{height} (picamera2)")
+        if threaded:
+            # capture_array() returns a fresh array per frame, so no buffer ring is needed
+            cam = LatestFrameGrabber(cam)
+        print(f"✅ Camera initialized: {width}x{height} (picamera2{', threaded' if threaded else ''})")
         return cam
     except Exception as e:
         print(f"❌ picamera2 failed: {e}")
         print("💡 Install picamera2: sudo apt install -y python3-picamera2")
         return None
+
+
+def get_replay_stream(source, width=320, height=240, threaded=False, paced=True):
+    """
+    Open a replay/synthetic frame source. Only paced sources are put behind the
+    background grabber. An unpaced replay is read directly, and the runner's
+    lossless pipeline (see pipeline.py) infers each of its frames exactly once.
+    """
+    try:
+        print(f"🎞️  Opening frame source: {source} ({'paced' if paced else 'as fast as possible'})")
+        stream = open_source(source, width, height, paced=paced)
+        if threaded and paced:
+            stream = LatestFrameGrabber(stream)
+        return stream
+    except Exception as e:
+        print(f"❌ Frame source failed: {e}")
+        return None
@@ -0,0 +1,308 @@
+"""
+Side-by-side comparison of benchmark runs.
+
+Takes any mix of results.json files (every run in them), frame logs
+(logs/<run>.csv, logs/<run>_frames, logs/<run>.parquet) and meta sidecars
+(logs/<run>_meta.json), summarizes each run from its frame log and writes a
+markdown report with throughput, latency percentiles, CPU cost per frame and
+thermal tables. Each value shows its change against a stored baseline (or
+against the first run) and regressions beyond a threshold are flagged.
+
+Examples:
+    python3 scripts/compare_runs.py logs/results.json
+    python3 scripts/compare_runs.py logs/yolo8n.csv tensorlite/logs/yolo8n_tflite.csv --save-baseline baseline.json
+    python3 scripts/compare_runs.py logs/results.json --baseline baseline.json --threshold 3
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+from datetime import datetime
+from frame_log import NPY_SUFFIX, log_base
+from generate_report import BACKEND_LABELS, aggregate_log
+from system_monitor import describe_throttled
+
+# (key, column label, better direction or None, format); grouped into report sections
+SECTIONS = [
+    ("🚀 Throughput", [
+        ("throughput_fps", "Pipeline FPS", "higher", ".2f"),
+        ("model_fps_mean", "Model FPS", "higher", ".2f"),
+        ("model_fps_std", "Model FPS std", "lower", ".2f"),
+    ]),
+    ("⌛ Latency", [
+        ("latency_ms_p50", "p50 ms", "lower", ".1f"),
+        ("latency_ms_p95", "p95 ms", "lower", ".1f"),
+        ("latency_ms_p99", "p99 ms", "lower", ".1f"),
+        ("inference_ms_mean", "Inference ms", "lower", ".1f"),
+        ("detect_ms_p95", "Detect p95 ms", "lower", ".1f"),
+    ]),
+    ("🔥 CPU", [
+        ("cpu_mean", "CPU %", None, ".1f"),
+        ("cpu_ms_per_frame", "CPU ms/frame", "lower", ".1f"),
+        ("ram_mean", "RAM %", None, ".1f"),
+    ]),
+    ("🌡️ Thermal", [
+        ("temp_mean", "Avg temp °C", "lower", ".1f"),
+        ("temp_max", "Max temp °C", "lower", ".1f"),
+        ("temp_rise", "Temp rise °C", "lower", ".1f"),
+        ("cpu_freq_mhz_min", "Min clock MHz", "higher", ".0f"),
+    ]),
+]
+METRICS = [metric for _, metrics in SECTIONS for metric in metrics]
+DEFAULT_THRESHOLD = 5.0  # % change in the worse direction that counts as a regression
+BASELINE_FORMAT = "compare_runs-baseline"  # "format" of baseline files (perf_gate.py gate files have their own)
+
+
+def find_log(path):
+    """Frame log for a log, meta sidecar or log base path: binary log first, then CSV"""
+    base = log_base(path[:-len("_meta.json")] if path.endswith("_meta.json") else path)
+    for candidate in (base + NPY_SUFFIX, base + ".parquet", base + ".csv"):
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def run_key(run):
+    """Identity of a configuration, used to match runs against the baseline"""
+    return f"{run['model']}|{run['backend']}|{run.get('imgsz')}|{run.get('num_threads')}"
+
+
+def run_label(run):
+    label = f"{run['model']} {BACKEND_LABELS.get(run['backend'], run['backend'])}"
+    if run.get("imgsz"):
+        label += f" {run['imgsz']}px"
+    if run.get("num_threads"):
+        label += f" {run['num_threads']}t"
+    return label
+
+
+def summarize_run(log_path, info=None):
+    """
+    Comparison metrics of one run from its frame log and meta sidecar. info
+    (a results.json run) fills in the configuration and any metric the log
+    can't provide.
+    """
+    info = dict(info or {})
+    meta = {}
+    meta_path = f"{log_base(log_path)}_meta.json"
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+    log = aggregate_log(log_path)
+
+    name = os.path.basename(log_base(log_path))
+    run = {
+        "model": info.get("model", meta.get("model", name)),
+        "backend": info.get("backend", meta.get("backend", "pytorch")),
+        "imgsz": info.get("imgsz", meta.get("imgsz")),
+        "num_threads": info.get("num_threads", meta.get("num_threads")),
+        "log_path": log_path,
+        "frames": log.frames,
+    }
+    throughput = meta.get("throughput", {}).get("pipeline_fps", info.get("throughput_fps"))
+    run["throughput_fps"] = throughput if throughput is not None else log.value("pipeline_fps")
+    run.update(model_fps_mean=log.value("model_fps"), model_fps_std=log.value("model_fps", "std"),
+               latency_ms_p50=log.quantile("latency_ms", 0.50), latency_ms_p95=log.quantile("latency_ms", 0.95),
+               latency_ms_p99=log.quantile("latency_ms", 0.99), inference_ms_mean=log.value("inference_ms"),
+               detect_ms_p95=log.quantile("detect_ms", 0.95), cpu_mean=log.value("cpu"), ram_mean=log.value("ram"),
+               temp_mean=log.value("temp"), temp_max=log.value("temp", "max"),
+               cpu_freq_mhz_min=log.value("cpu_freq_mhz", "min"), throttled=log.throttled)
+
+    # cpu is the load over all cores; per-core columns tell how many there were
+    cores = len([column for column in log.stats if re.fullmatch(r"cpu\d+", column)]) or os.cpu_count() or 1
+    run["cpu_cores"] = cores
+    run["cpu_ms_per_frame"] = (run["cpu_mean"] / 100 * cores * 1000 / run["throughput_fps"]
+                               if run["throughput_fps"] and not math.isnan(run["throughput_fps"]) else math.nan)
+
+    # Heating over the run: first vs last graph bucket of the temperature column
+    temps = log.series["temp"].values() if "temp" in log.series else []
+    temps = [t for t in temps if not math.isnan(t)]
+    run["temp_rise"] = temps[-1] - temps[0] if len(temps) > 1 else math.nan
+    return run
+
+
+def load_runs(paths):
+    """Runs from results.json files, frame logs and meta sidecars, in the order given"""
+    runs = []
+    for path in paths:
+        if path.endswith(".json") and not path.endswith("_meta.json"):
+            with open(path) as f:
+                results = json.load(f)
+            for info in results["runs"]:
+                if "error" in info:
+                    print(f"⚠️  Skipping {run_label(info)}: {info['error']}")
+                    continue
+                log_path = info.get("log_path")
+                if log_path and os.path.exists(log_path):
+                    runs.append(summarize_run(log_path, info))
+                else:
+                    # Log is gone: keep what results.json recorded
+                    print(f"⚠️  Frame log of {run_label(info)} not found, using results.json summary")
+                    runs.append({**info, **{key: info.get(key, math.nan) for key, *_ in METRICS}})
+            continue
+        log_path = find_log(path)
+        if log_path is None:
+            raise FileNotFoundError(f"No frame log for {path}")
+        runs.append(summarize_run(log_path))
+    return runs
+
+
+def load_baseline(path):
+    """{run key: run} from a baseline file written by save_baseline(); ValueError for any other file"""
+    with open(path) as f:
+        baseline = json.load(f)
+    # Files saved before the format field was added have only a run list
+    if baseline.get("format", BASELINE_FORMAT) != BASELINE_FORMAT or not isinstance(baseline.get("runs"), list):
+        kind = "a perf_gate.py gate file" if "fingerprint" in baseline else f"not a {BASELINE_FORMAT} file"
+        raise ValueError(f"{path} is {kind}; --baseline takes a file from compare_runs.py --save-baseline"
+                         f" (check gate files with perf_gate.py check --gate-file)")
+    return {run_key(run): run for run in baseline["runs"]}
+
+
+def save_baseline(runs, path):
+    baseline = {
+        "format": BASELINE_FORMAT,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "runs": [{key: value for key, value in run.items() if key != "log_path"} for run in runs],
+    }
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2)
+    print(f"💾 Baseline saved: {path} ({len(runs)} runs)")
+
+
+def change(value, reference, better, threshold):
+    """(% change, regressed) of a value against its reference; (None, False) if not comparable"""
+    if value is None or reference is None or math.isnan(value) or math.isnan(reference) or reference == 0:
+        return None, False
+    pct = (value - reference) / abs(reference) * 100
+    worse = -pct if better == "higher" else pct
+    return pct, better is not None and worse > threshold
+
+
+def compare(runs, baseline=None, threshold=DEFAULT_THRESHOLD):
+    """
+    Reference run and regressions of every run. Runs are compared to the
+    baseline run with the same configuration if there is a baseline, otherwise
+    to the first run. Returns [(run, reference or None, [regressed metric keys])].
+    """
+    rows = []
+    for i, run in enumerate(runs):
+        if baseline is not None:
+            reference = baseline.get(run_key(run))
+        else:
+            reference = runs[0] if i else None
+        regressions = []
+        if reference is not None:
+            for key, _, better, _ in METRICS:
+                if change(run.get(key), reference.get(key), better, threshold)[1]:
+                    regressions.append(key)
+        rows.append((run, reference, regressions))
+    return rows
+
+
+def _cell(run, reference, key, better, fmt, threshold):
+    value = run.get(key)
+    if value is None or math.isnan(value):
+        return "n/a"
+    text = f"{value:{fmt}}"
+    if reference is not None:
+        pct, regressed = change(value, reference.get(key), better, threshold)
+        if pct is not None:
+            text += f" ({pct:+.1f}%{' ⚠️' if regressed else ''})"
+    return text
+
+
+def generate_comparison_report(runs, report_path, baseline=None, threshold=DEFAULT_THRESHOLD):
+    """Write the markdown comparison report; returns the number of runs with regressions"""
+    rows = compare(runs, baseline, threshold)
+    regressed_runs = sum(1 for _, _, regressions in rows if regressions)
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    with open(report_path, "w") as f:
+        f.write(f"# ⚖️ YOLO Benchmark Comparison\n\n")
+        f.write(f"**Date:** {timestamp}\n\n")
+        f.write(f"**Runs:** {len(runs)}\n\n")
+        if baseline is not None:
+            f.write(f"Changes are against the stored baseline run with the same model, backend, input size "
+                    f"and threads")
+        else:
+            f.write(f"Changes are against the first run ({run_label(runs[0])})")
+        f.write(f"; ⚠️ marks a change of more than {threshold:g}% in the worse direction.\n\n")
+        f.write(f"---\n\n")
+
+        f.write(f"## 📋 Runs\n\n")
+        f.write(f"| Run | Frames | Log | Reference | Regressions |\n")
+        f.write(f"|-----|--------|-----|-----------|-------------|\n")
+        for run, reference, regressions in rows:
+            if reference is None:
+                source, status = "-", "-"
+            else:
+                source = "baseline" if baseline is not None else run_label(reference)
+                status = ", ".join(label for key, label, *_ in METRICS if key in regressions) or "none"
+            f.write(f"| {run_label(run)} | {run.get('frames', 'n/a')} | {run.get('log_path') or 'n/a'}"
+                    f" | {source} | {status} |\n")
+        f.write(f"\n---\n\n")
+
+        for title, metrics in SECTIONS:
+            f.write(f"## {title}\n\n")
+            f.write("| Run | " + " | ".join(label for _, label, *_ in metrics) + " |\n")
+            f.write("|-----|" + "|".join("-" * (len(label) + 2) for _, label, *_ in metrics) + "|\n")
+            for run, reference, _ in rows:
+                cells = [_cell(run, reference, key, better, fmt, threshold) for key, _, better, fmt in metrics]
+                f.write(f"| {run_label(run)} | " + " | ".join(cells) + " |\n")
+            if title.endswith("CPU"):
+                f.write(f"\nCPU ms/frame is CPU time over all cores per delivered result "
+                        f"(CPU % × cores / pipeline FPS), comparable across thread settings.\n")
+            if title.endswith("Thermal"):
+                f.write(f"\n| Run | Throttling |\n|-----|------------|\n")
+                for run, _, _ in rows:
+                    f.write(f"| {run_label(run)} | {describe_throttled(run.get('throttled'))} |\n")
+            f.write(f"\n")
+
+        f.write(f"---\n\n")
+        f.write(f"*Generated automatically by YOLO Benchmark Tool*\n")
+
+    print(f"✅ Comparison report generated: {report_path}")
+    if regressed_runs:
+        print(f"⚠️  {regressed_runs} run(s) regressed by more than {threshold:g}%")
+    return regressed_runs
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare YOLO benchmark runs side by side")
+    parser.add_argument("runs", nargs="+", help="results.json files, frame logs or _meta.json sidecars")
+    parser.add_argument("--output", default=None,
+                        help="Report path (default: comparison_report.md next to the first input)")
+    parser.add_argument("--baseline", default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", default=None, help="Store these runs as a baseline JSON")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Regression threshold in percent")
+    args = parser.parse_args(argv)
+    if args.output is None:
+        first = args.runs[0].rstrip("/")
+        args.output = os.path.join(os.path.dirname(first), "comparison_report.md")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    runs = load_runs(args.runs)
+    if not runs:
+        print("❌ No runs to compare")
+        return 1
+    try:
+        baseline = load_baseline(args.baseline) if args.baseline else None
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    regressed_runs = generate_comparison_report(runs, args.output, baseline, args.threshold)
+    if args.save_baseline:
+        save_baseline(runs, args.save_baseline)
+    return 1 if regressed_runs else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
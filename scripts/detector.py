@@ -0,0 +1,255 @@
+"""
+Backend-agnostic YOLO detector.
+
+create_detector() picks the backend from the model file extension:
+    .pt      Ultralytics (PyTorch)
+    .tflite  TFLite interpreter (tflite_runtime or TensorFlow)
+    .onnx    ONNX Runtime (CPU)
+
+Every backend returns the same compact Detections arrays in frame pixels and
+records the time of its preprocess / inference / postprocess phases in
+`timings_ns` (time.perf_counter_ns() nanoseconds, last frame). Exported formats share the same letterbox
+preprocessing and NumPy post-processing, so formats are compared fairly.
+
+detect_batch() runs several frames through one inference call (throughput
+mode for offline/replay jobs, see batch_benchmark.py); set_batch_size()
+resizes the model input first. timings_ns then covers the whole batch.
+Backends with can_resize take set_imgsz() between frames (used by the
+thermal scheduler, see scheduler.py).
+"""
+
+import os
+import time
+import numpy as np
+from preprocess import InputPreprocessor
+from yolo_postprocess import (COCO_CLASSES, Detections, decode_predictions, non_max_suppression,
+                              tensor_quantization)
+
+
+class Detector:
+    """Common interface of all backends"""
+    backend = None
+    can_resize = False  # True if set_imgsz() works on the loaded model
+
+    def __init__(self, model_path, imgsz=320, conf=0.25, iou=0.7, num_threads=None):
+        self.model_path = model_path
+        self.imgsz = imgsz
+        self.conf = conf
+        self.iou = iou
+        self.num_threads = num_threads
+        self.names = COCO_CLASSES
+        self.batch_size = 1
+        self.timings_ns = {"preprocess": 0, "inference": 0, "postprocess": 0}
+
+    def detect(self, frame):
+        """Run detection on a BGR frame, returns Detections"""
+        raise NotImplementedError
+
+    def set_batch_size(self, batch_size):
+        """Prepare the model for detect_batch() calls of up to batch_size frames"""
+        self.batch_size = batch_size
+
+    def detect_batch(self, frames):
+        """Run detection on up to batch_size BGR frames at once, returns a list of Detections"""
+        if len(frames) > self.batch_size:
+            raise ValueError(f"{len(frames)} frames for a batch size of {self.batch_size}")
+        results = []
+        timings_ns = {}
+        for frame in frames:
+            results.append(self.detect(frame))
+            for phase, ns in self.timings_ns.items():
+                timings_ns[phase] = timings_ns.get(phase, 0) + ns
+        self.timings_ns = timings_ns
+        return results
+
+    def set_imgsz(self, imgsz):
+        """Change the input size of the following frames"""
+        if not self.can_resize:
+            raise ValueError(f"{os.path.basename(self.model_path)} has a fixed input size of {self.imgsz}")
+        self.imgsz = imgsz
+
+    def describe(self):
+        return f"{self.backend} ({os.path.basename(self.model_path)}, imgsz={self.imgsz})"
+
+    def close(self):
+        pass
+
+
+class UltralyticsDetector(Detector):
+    """Ultralytics YOLO .pt model; Ultralytics does its own letterbox and NMS"""
+    backend = "pytorch"
+    can_resize = True  # imgsz is passed with every call
+
+    def __init__(self, model_path, imgsz=320, conf=0.25, iou=0.7, num_threads=None):
+        super().__init__(model_path, imgsz, conf, iou, num_threads)
+        from ultralytics import YOLO
+        if num_threads:
+            import torch
+            torch.set_num_threads(num_threads)
+        self.model = YOLO(model_path)
+        names = self.model.names
+        self.names = [names[i] for i in range(len(names))] if isinstance(names, dict) else list(names)
+
+    def detect(self, frame):
+        return self.detect_batch([frame])[0]
+
+    def detect_batch(self, frames):
+        if len(frames) > self.batch_size:
+            raise ValueError(f"{len(frames)} frames for a batch size of {self.batch_size}")
+        # A list is inferred as one batch; speed is the per-image average of each phase
+        results = self.model(list(frames), imgsz=self.imgsz, conf=self.conf, iou=self.iou, verbose=False)
+        self.timings_ns = {phase: int(ms * 1e6 * len(results)) for phase, ms in results[0].speed.items()}
+        return [self._detections(result) for result in results]
+
+    @staticmethod
+    def _detections(result):
+        if len(result.boxes) == 0:
+            return Detections.empty()
+        # One transfer for all boxes: (N, 6) = x1, y1, x2, y2, conf, class
+        data = result.boxes.data.cpu().numpy()
+        return Detections(data[:, :4], data[:, 4], data[:, 5].astype(np.int64))
+
+
+class ExportedDetector(Detector):
+    """Shared letterbox preprocessing and NumPy post-processing of exported models"""
+    normalized_boxes = False  # True if the model outputs boxes in 0..1
+
+    def _setup_io(self, input_shape, input_dtype, input_quant=None, output_quant=None):
+        self.preprocessor = InputPreprocessor(input_shape, input_dtype, input_quant)
+        self.output_quant = output_quant
+        self.imgsz = self.preprocessor.width
+        self.batch_size = int(input_shape[0])
+
+    def _preprocess(self, frame, index=0):
+        """Preprocess a frame into slot `index` of the model input batch"""
+        raise NotImplementedError
+
+    def _infer(self):
+        """Run the model on the preprocessed input, returns the raw output array"""
+        raise NotImplementedError
+
+    def detect(self, frame):
+        return self.detect_batch((frame,))[0]
+
+    def detect_batch(self, frames):
+        if len(frames) > self.batch_size:
+            raise ValueError(f"{len(frames)} frames for a batch size of {self.batch_size}")
+        t0 = time.perf_counter_ns()
+        geometries = []
+        for i, frame in enumerate(frames):
+            self._preprocess(frame, i)
+            geometries.append(self.preprocessor.geometry)
+        t1 = time.perf_counter_ns()
+        output = self._infer()
+        t2 = time.perf_counter_ns()
+        decode_ns = 0
+        results = []
+        for i, geometry in enumerate(geometries):
+            t = time.perf_counter_ns()
+            boxes, scores, class_ids = decode_predictions(
+                output[i:i + 1], self.conf, self.output_quant, self.normalized_boxes, self.preprocessor.input_size)
+            decode_ns += time.perf_counter_ns() - t
+            keep = non_max_suppression(boxes, scores, class_ids, self.iou)
+            results.append(Detections(geometry.to_source(boxes[keep]), scores[keep], class_ids[keep]))
+        t3 = time.perf_counter_ns()
+        self.timings_ns = {"preprocess": t1 - t0, "inference": t2 - t1, "postprocess": t3 - t2,
+                           "decode": decode_ns, "nms": t3 - t2 - decode_ns}
+        return results
+
+
+class TFLiteDetector(ExportedDetector):
+    """TFLite model; frames are written straight into the interpreter's input buffer"""
+    backend = "tflite"
+    normalized_boxes = True  # Ultralytics TFLite exports output normalized xywh
+
+    def __init__(self, model_path, imgsz=320, conf=0.25, iou=0.7, num_threads=None,
+                 use_xnnpack=True, delegates=()):
+        super().__init__(model_path, imgsz, conf, iou, num_threads)
+        from tflite_backend import describe_backend, load_interpreter
+        self.interpreter = load_interpreter(model_path, num_threads, use_xnnpack, delegates)
+        self.backend_options = describe_backend(num_threads, use_xnnpack, delegates)
+        self._bind_io()
+
+    def _bind_io(self):
+        input_detail = self.interpreter.get_input_details()[0]
+        self.output_detail = self.interpreter.get_output_details()[0]
+        self._input_tensor = self.interpreter.tensor(input_detail["index"])
+        self._setup_io(input_detail["shape"], input_detail["dtype"],
+                       tensor_quantization(input_detail), tensor_quantization(self.output_detail))
+
+    def set_batch_size(self, batch_size):
+        """Resize the input tensor to batch_size frames and re-plan the interpreter"""
+        input_detail = self.interpreter.get_input_details()[0]
+        if input_detail["shape"][0] == batch_size:
+            return
+        self.interpreter.resize_tensor_input(input_detail["index"], [batch_size, *input_detail["shape"][1:]])
+        self.interpreter.allocate_tensors()
+        self._bind_io()
+
+    def _preprocess(self, frame, index=0):
+        self.preprocessor.run(frame, self._input_tensor(), index)
+
+    def _infer(self):
+        self.interpreter.invoke()
+        return self.interpreter.get_tensor(self.output_detail["index"])
+
+    def describe(self):
+        return f"{super().describe()} {self.backend_options}"
+
+
+class OnnxDetector(ExportedDetector):
+    """ONNX model on the ONNX Runtime CPU execution provider"""
+    backend = "onnx"
+
+    def __init__(self, model_path, imgsz=320, conf=0.25, iou=0.7, num_threads=None):
+        super().__init__(model_path, imgsz, conf, iou, num_threads)
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        # Dynamic dimensions come back as names; fall back to imgsz for those
+        shape = [d if isinstance(d, int) else None for d in model_input.shape]
+        self._fixed_batch = shape[0]
+        self._input_dtype = np.float16 if model_input.type == "tensor(float16)" else np.float32
+        self._input_hw = (shape[2] or imgsz, shape[3] or imgsz)
+        self.can_resize = shape[2] is None and shape[3] is None
+        self.set_batch_size(shape[0] or 1)
+
+    def set_batch_size(self, batch_size):
+        """Reallocate the input for batch_size frames (models exported with a dynamic batch only)"""
+        if self._fixed_batch is not None and batch_size != self._fixed_batch:
+            raise ValueError(f"{os.path.basename(self.model_path)} has a fixed batch size of {self._fixed_batch}"
+                             f" (export with dynamic=True for batching)")
+        self._setup_io([batch_size, 3, *self._input_hw], self._input_dtype)
+        self._input = self.preprocessor.new_input()
+
+    def set_imgsz(self, imgsz):
+        """Reallocate the input for imgsz x imgsz frames (models exported with dynamic height/width only)"""
+        super().set_imgsz(imgsz)
+        self._input_hw = (imgsz, imgsz)
+        self.set_batch_size(self.batch_size)
+
+    def _preprocess(self, frame, index=0):
+        self.preprocessor.run(frame, self._input, index)
+
+    def _infer(self):
+        return self.session.run(None, {self.input_name: self._input})[0]
+
+
+BACKENDS = {
+    ".pt": UltralyticsDetector,
+    ".tflite": TFLiteDetector,
+    ".onnx": OnnxDetector,
+}
+
+
+def create_detector(model_path, **options):
+    """Create the detector matching the model file extension"""
+    ext = os.path.splitext(model_path)[1].lower()
+    if ext not in BACKENDS:
+        raise ValueError(f"Unsupported model format '{ext}' (expected one of {', '.join(BACKENDS)})")
+    return BACKENDS[ext](model_path, **options)
+
@@ -0,0 +1,145 @@
+"""
+Background frame grabber with latest-frame semantics.
+
+Wraps any camera object with read()/release()/isOpened() and keeps reading it
+on a daemon thread, so the inference loop never waits on the sensor and never
+works on a frame that sat in the driver's buffer.
+"""
+
+import threading
+import time
+import numpy as np
+
+NUM_BUFFERS = 3  # newest frame, frame held by the reader, frame being captured
+
+
+class LatestFrameGrabber:
+    """
+    Keeps only the newest frame of a camera, captured on a background thread.
+
+    Every frame gets a sequence number and a time.perf_counter_ns() capture
+    timestamp. Frames that are replaced before anyone read them are counted in
+    `dropped`.
+
+    A frame returned by read() stays valid until the next read(), so callers
+    can use it in place without copying. With reuse_buffers=True the source is
+    read into a pool of preallocated buffers (cv2.VideoCapture.read(image)),
+    so steady-state capture allocates nothing either. A frame returned by
+    read_packet() stays valid until release_buffer(seq) hands it back: its
+    buffer is never captured into before that, and the pool grows when every
+    buffer is in use. Callers that keep several frames in flight (e.g. in
+    pipeline queues) should size num_buffers = frames in flight + 2.
+    """
+    def __init__(self, source, reuse_buffers=False, num_buffers=NUM_BUFFERS):
+        self.source = source
+        self.reuse_buffers = reuse_buffers
+        self.num_buffers = max(num_buffers, NUM_BUFFERS)
+        self.seq = 0  # sequence number of the newest captured frame
+        self.dropped = 0  # frames overwritten before they were read
+        self.grown = 0  # buffers added to the pool because every buffer was in use
+        self.last_seq = 0  # sequence number of the frame returned by the last read()
+        self.last_timestamp_ns = 0  # capture time of the frame returned by the last read()
+        self.stopped = False
+        self.failed = False
+
+        self._frame = None
+        self._frame_buffer = None  # ring index of the newest frame (None if not pooled)
+        self._timestamp_ns = 0
+        self._held = {}  # seq -> pool index of frames handed out and not released yet
+        self._read_seq = None  # frame returned by the last read(), released by the next one
+        self._buffers = None
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="frame-grabber", daemon=True)
+        self._thread.start()
+
+    def _free_buffer(self):
+        """Pool index that is neither the newest frame nor held by a reader; grows the pool if there is none"""
+        held = set(self._held.values())
+        for i in range(len(self._buffers)):
+            if i != self._frame_buffer and i not in held:
+                return i
+        self._buffers.append(np.empty_like(self._buffers[0]))
+        self.grown += 1
+        return len(self._buffers) - 1
+
+    def _run(self):
+        while not self.stopped:
+            index = None
+            if self._buffers is not None:
+                with self._cond:
+                    index = self._free_buffer()
+                ret, frame = self.source.read(self._buffers[index])
+                if ret and frame is not self._buffers[index]:
+                    # The driver changed the frame size and allocated a new image
+                    index = None
+                    self._buffers = None
+            else:
+                ret, frame = self.source.read()
+            timestamp_ns = time.perf_counter_ns()
+
+            if not ret or frame is None:
+                with self._cond:
+                    self.failed = True
+                    self._cond.notify_all()
+                break
+
+            if self.reuse_buffers and self._buffers is None:
+                self._buffers = [np.empty_like(frame) for _ in range(self.num_buffers)]
+
+            with self._cond:
+                if self.seq > self.last_seq:
+                    self.dropped += 1
+                self.seq += 1
+                self._frame = frame
+                self._frame_buffer = index
+                self._timestamp_ns = timestamp_ns
+                self._cond.notify_all()
+
+    def read_packet(self, wait_new=True, timeout=1.0):
+        """
+        Return (ret, frame, seq, timestamp_ns) for the newest frame.
+
+        With wait_new=True this blocks until a frame newer than the last one
+        returned is available. With wait_new=False the newest frame is returned
+        immediately, even if it is the same frame object as last time.
+        """
+        with self._cond:
+            if wait_new:
+                self._cond.wait_for(
+                    lambda: self.seq > self.last_seq or self.failed or self.stopped, timeout)
+            if self._frame is None or (wait_new and self.seq == self.last_seq):
+                return False, None, self.last_seq, self.last_timestamp_ns
+            if self._frame_buffer is not None:
+                self._held[self.seq] = self._frame_buffer
+            self.last_seq = self.seq
+            self.last_timestamp_ns = self._timestamp_ns
+            return True, self._frame, self.last_seq, self.last_timestamp_ns
+
+    def release_buffer(self, seq):
+        """Hand the frame of a read_packet() back: its buffer may be captured into again"""
+        with self._cond:
+            self._held.pop(seq, None)
+
+    def read(self):
+        """Read the newest frame (same interface as cv2.VideoCapture.read)"""
+        if self._read_seq is not None:
+            self.release_buffer(self._read_seq)
+        ret, frame, seq, _ = self.read_packet()
+        self._read_seq = seq if ret else None
+        return ret, frame
+
+    def release(self):
+        """Stop the grabber thread and release the underlying camera"""
+        self.stopped = True
+        with self._cond:
+            self._cond.notify_all()
+        self._thread.join(timeout=2.0)
+        self.source.release()
+
+    def isOpened(self):
+        """Check if camera is opened"""
+        return not self.stopped and not self.failed and self.source.isOpened()
+
+    def set(self, prop, value):
+        """Forward property changes to the underlying camera"""
+        return self.source.set(prop, value)
@@ -0,0 +1,219 @@
+"""
+Buffered binary frame log.
+
+Per-frame records are copied into a preallocated NumPy structured array and
+handed to a background thread one chunk at a time. The thread stores each
+chunk as a .npy file (logs/<run>_frames/chunk_000000.npy, ...) or appends it
+as a row group to logs/<run>.parquet when pyarrow is installed and asked
+for. Nothing is formatted or written to disk in the hot loop.
+
+iter_log_chunks() streams a binary or CSV log column-wise in fixed-size
+chunks, read_log() loads it whole; export_csv() writes a binary log out as
+CSV on demand.
+"""
+
+import atexit
+import csv
+import glob
+import os
+import queue
+import threading
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None  # .npy chunks only
+
+CHUNK_SIZE = 1024  # records per chunk handed to the writer thread
+READ_CHUNK_ROWS = 65536  # rows per chunk yielded by iter_log_chunks()
+NUM_CHUNKS = 3  # buffers in rotation: filling, being written, spare
+NPY_SUFFIX = "_frames"
+LOG_FORMATS = ("auto", "npy", "parquet")
+
+
+def log_base(path):
+    """logs/<run>.csv, logs/<run>.parquet or logs/<run>_frames → logs/<run>"""
+    path = path.rstrip("/")
+    base, ext = os.path.splitext(path)
+    if ext in (".csv", ".parquet"):
+        return base
+    if path.endswith(NPY_SUFFIX):
+        return path[:-len(NPY_SUFFIX)]
+    return path
+
+
+def make_dtype(columns, int_columns=()):
+    """Structured dtype: int32 for int_columns, float32 for everything else"""
+    return np.dtype([(name, np.int32 if name in int_columns else np.float32) for name in columns])
+
+
+class FrameLogWriter:
+    """
+    Append-only per-frame log with chunked background flushing.
+
+    append() copies one record (a tuple in dtype field order) into the
+    current chunk; full chunks go to the writer thread and a spare buffer
+    takes over. close() writes the last partial chunk and waits for the
+    thread. It is registered with atexit and is safe to call more than once,
+    so an interrupted run doesn't lose its last chunk.
+
+    format: "npy", "parquet" or "auto" (Parquet if pyarrow is installed).
+    """
+    def __init__(self, path, dtype, chunk_size=CHUNK_SIZE, format="npy"):
+        if format not in LOG_FORMATS:
+            raise ValueError(f"Unknown log format '{format}' (expected one of {', '.join(LOG_FORMATS)})")
+        if format == "auto":
+            format = "parquet" if pa is not None else "npy"
+        elif format == "parquet" and pa is None:
+            raise ImportError("Parquet logs need pyarrow (pip install pyarrow)")
+        self.format = format
+        self.dtype = np.dtype(dtype)
+        base = log_base(path)
+        self.path = base + (NPY_SUFFIX if format == "npy" else ".parquet")
+        self.rows = 0
+        self.chunks = 0
+        self.error = None
+        self.closed = False
+
+        if format == "npy":
+            os.makedirs(self.path, exist_ok=True)
+            for old in glob.glob(os.path.join(self.path, "chunk_*.npy")):
+                os.remove(old)
+        self._parquet = None
+        self._free = queue.Queue()
+        for _ in range(NUM_CHUNKS):
+            self._free.put(np.empty(chunk_size, self.dtype))
+        self._full = queue.Queue()
+        self._buffer = self._free.get()
+        self._count = 0
+        self._thread = threading.Thread(target=self._run, name="frame-log", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def append(self, record):
+        """Add one record (tuple of values in dtype field order)"""
+        self._buffer[self._count] = record
+        self._count += 1
+        self.rows += 1
+        if self._count == len(self._buffer):
+            self._full.put((self._buffer, self._count))
+            # Blocks only if the disk is more than NUM_CHUNKS - 1 chunks behind
+            self._buffer = self._free.get()
+            self._count = 0
+
+    def close(self):
+        """Flush the partial chunk and stop the writer thread"""
+        if self.closed:
+            return
+        self.closed = True
+        if self._count:
+            self._full.put((self._buffer, self._count))
+        self._full.put(None)
+        self._thread.join()
+        atexit.unregister(self.close)
+        if self.error is not None:
+            print(f"⚠️  Frame log write failed: {self.error}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _run(self):
+        while True:
+            item = self._full.get()
+            if item is None:
+                break
+            buffer, count = item
+            if self.error is None:
+                try:
+                    self._write(buffer[:count])
+                except Exception as e:
+                    self.error = e
+            self._free.put(buffer)
+        if self._parquet is not None:
+            self._parquet.close()
+
+    def _write(self, chunk):
+        if self.format == "npy":
+            np.save(os.path.join(self.path, f"chunk_{self.chunks:06d}.npy"), chunk)
+        else:
+            table = pa.table({name: np.ascontiguousarray(chunk[name]) for name in chunk.dtype.names})
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        self.chunks += 1
+
+
+def _record_chunks(path, chunk_rows=READ_CHUNK_ROWS):
+    """Structured-array chunks of a binary frame log (.npy chunks memory-mapped)"""
+    if path.endswith(".parquet"):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            arrays = [column.to_numpy(zero_copy_only=False) for column in batch.columns]
+            records = np.empty(batch.num_rows, [(name, a.dtype) for name, a in zip(batch.schema.names, arrays)])
+            for name, a in zip(batch.schema.names, arrays):
+                records[name] = a
+            yield records
+        return
+    chunks = sorted(glob.glob(os.path.join(path, "chunk_*.npy")))
+    if not chunks:
+        raise FileNotFoundError(f"No frame log chunks in {path}")
+    for chunk in chunks:
+        yield np.load(chunk, mmap_mode="r")
+
+
+def load_frame_log(path):
+    """Load a binary frame log (chunk directory or .parquet) as one structured array"""
+    return np.concatenate(list(_record_chunks(path)))
+
+
+def iter_log_chunks(path, chunk_rows=READ_CHUNK_ROWS):
+    """
+    Yield a binary or CSV frame log as {name: float64 array} chunks of about
+    chunk_rows rows (empty CSV cells → NaN), so any log length is read in
+    fixed memory.
+    """
+    if path.endswith(".csv"):
+        with open(path, newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            while True:
+                rows = [[float(v) if v else np.nan for v in row] for _, row in zip(range(chunk_rows), reader)]
+                if not rows:
+                    return
+                data = np.array(rows, dtype=np.float64)
+                yield {name: data[:, i] for i, name in enumerate(header)}
+    # .npy chunks are small; group them up to chunk_rows
+    pending, rows = [], 0
+    for chunk in _record_chunks(path, chunk_rows):
+        pending.append(chunk)
+        rows += len(chunk)
+        if rows >= chunk_rows:
+            records = np.concatenate(pending)
+            yield {name: records[name].astype(np.float64) for name in records.dtype.names}
+            pending, rows = [], 0
+    if pending:
+        records = np.concatenate(pending)
+        yield {name: records[name].astype(np.float64) for name in records.dtype.names}
+
+
+def read_log(path):
+    """Whole binary or CSV frame log as {name: float64 array}"""
+    chunks = list(iter_log_chunks(path))
+    return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
+
+
+def export_csv(path, csv_path=None):
+    """Write a binary frame log out as CSV (default logs/<run>.csv), chunk by chunk; returns the CSV path"""
+    csv_path = csv_path or log_base(path) + ".csv"
+    with open(csv_path, "w", newline="") as f:
+        for i, records in enumerate(_record_chunks(path)):
+            if i == 0:
+                f.write(",".join(records.dtype.names) + "\n")
+                formats = ["%d" if records.dtype[name].kind in "iu" else "%.6g" for name in records.dtype.names]
+            if len(records):
+                np.savetxt(f, records, fmt=formats, delimiter=",")
+    return csv_path
@@ -0,0 +1,223 @@
+"""
+Replay and synthetic frame sources.
+
+Drop-in replacements for the camera (same read()/release()/isOpened()
+interface) so benchmarks can run headless on machines without a camera and
+replay exactly the same frames between runs.
+
+Source specs accepted by open_source():
+    "synthetic"              deterministic generated frames
+    "video:<file>"           video file replay (any format OpenCV can decode)
+    "images:<directory>"     image directory replay, sorted by file name
+    "npy:<file>"             memory-mapped (N, H, W, 3) frame stack
+A bare path is also accepted and its type is guessed from the extension.
+"""
+
+import os
+import time
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+class FrameSource:
+    """
+    Base class for replay sources.
+
+    paced=True delivers frames at `fps` like a real camera would, paced=False
+    returns them as fast as they can be produced. With loop=True the source
+    starts over at the end instead of ending the stream.
+    """
+    def __init__(self, fps=30.0, paced=True, loop=True):
+        self.fps = fps
+        self.paced = paced
+        self.loop = loop
+        self.seq = 0  # frames returned so far
+        self.dropped = 0  # replay never drops frames, kept for parity with LatestFrameGrabber
+        self.stopped = False
+        self._position = 0  # index of the next frame within the stream
+        self._next_time = None
+
+    def _frame_at(self, position):
+        """Return the frame at `position`, or None past the end of the stream"""
+        raise NotImplementedError
+
+    def _pace(self):
+        now = time.perf_counter()
+        if self._next_time is None or now - self._next_time > 1.0 / self.fps:
+            # First frame, or we fell behind: don't burst to catch up
+            self._next_time = now
+        elif self._next_time > now:
+            time.sleep(self._next_time - now)
+        self._next_time += 1.0 / self.fps
+
+    def read_packet(self):
+        """Return (ret, frame, seq, timestamp_ns) like LatestFrameGrabber.read_packet()"""
+        if self.stopped:
+            return False, None, self.seq, 0
+        frame = self._frame_at(self._position)
+        if frame is None and self.loop and self._position > 0:
+            self._position = 0
+            frame = self._frame_at(0)
+        if frame is None:
+            return False, None, self.seq, 0
+        self._position += 1
+        if self.paced:
+            self._pace()
+        self.seq += 1
+        return True, frame, self.seq, time.perf_counter_ns()
+
+    def release_buffer(self, seq):
+        """Replayed frames are never overwritten, kept for parity with LatestFrameGrabber"""
+        pass
+
+    def read(self):
+        """Read next frame (same interface as cv2.VideoCapture.read)"""
+        ret, frame, _, _ = self.read_packet()
+        return ret, frame
+
+    def release(self):
+        self.stopped = True
+
+    def isOpened(self):
+        return not self.stopped
+
+    def set(self, prop, value):
+        """Dummy set method for compatibility"""
+        pass
+
+
+class VideoFileSource(FrameSource):
+    """Replays a video file, paced to the file's own frame rate by default"""
+    def __init__(self, path, fps=None, paced=True, loop=True):
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise IOError(f"Could not open video file: {path}")
+        file_fps = self.cap.get(cv2.CAP_PROP_FPS)
+        super().__init__(fps or file_fps or 30.0, paced, loop)
+
+    def _frame_at(self, position):
+        if position == 0:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        ret, frame = self.cap.read()
+        return frame if ret else None
+
+    def release(self):
+        super().release()
+        self.cap.release()
+
+
+class ImageDirSource(FrameSource):
+    """Replays the images of a directory in file name order, decoding each once"""
+    def __init__(self, directory, fps=30.0, paced=True, loop=True, cache=True):
+        super().__init__(fps, paced, loop)
+        self.paths = sorted(
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.lower().endswith(IMAGE_EXTENSIONS))
+        if not self.paths:
+            raise IOError(f"No images found in {directory}")
+        self.cache = cache
+        self._frames = {}
+
+    def _frame_at(self, position):
+        if position >= len(self.paths):
+            return None
+        frame = self._frames.get(position)
+        if frame is None:
+            frame = cv2.imread(self.paths[position])
+            if frame is None:
+                raise IOError(f"Could not read image: {self.paths[position]}")
+            if self.cache:
+                self._frames[position] = frame
+        return frame
+
+
+class NpyStackSource(FrameSource):
+    """
+    Replays a memory-mapped (N, H, W, 3) .npy frame stack.
+
+    uint8 stacks are returned as read-only views into the mapped file without
+    any copy. Float stacks (like calibration_image_sample_data_*.npy, RGB in
+    the 0..1 range) are converted to uint8 BGR frames as they are read.
+    """
+    def __init__(self, path, fps=30.0, paced=True, loop=True, rgb=True):
+        super().__init__(fps, paced, loop)
+        self.frames = np.load(path, mmap_mode="r")
+        if self.frames.ndim == 3:
+            self.frames = self.frames[..., np.newaxis]
+        if self.frames.ndim != 4 or self.frames.shape[-1] not in (1, 3):
+            raise ValueError(f"Expected an (N, H, W, 3) frame stack, got shape {self.frames.shape}")
+        self.rgb = rgb and self.frames.shape[-1] == 3
+        self.scale = 1.0
+        if self.frames.dtype.kind == "f" and float(self.frames[0].max()) <= 1.0:
+            self.scale = 255.0
+
+    def _frame_at(self, position):
+        if position >= len(self.frames):
+            return None
+        frame = self.frames[position]
+        if self.rgb:
+            frame = frame[..., ::-1]
+        if frame.dtype == np.uint8:
+            return frame
+        out = np.empty(frame.shape, dtype=np.uint8)
+        np.multiply(frame, self.scale, out=out, casting="unsafe")
+        return out
+
+
+class SyntheticSource(FrameSource):
+    """
+    Deterministic generated frames: a fixed noise background with a few
+    coloured rectangles bouncing around. Frame n is identical across runs.
+    """
+    def __init__(self, width=320, height=240, fps=30.0, paced=True, loop=True,
+                 num_frames=None, num_objects=4, seed=0):
+        super().__init__(fps, paced, loop)
+        self.width = width
+        self.height = height
+        self.num_frames = num_frames
+        rng = np.random.RandomState(seed)
+        self.background = rng.randint(60, 100, size=(height, width, 3)).astype(np.uint8)
+        self.sizes = rng.randint(min(width, height) // 8, min(width, height) // 3, size=(num_objects, 2))
+        self.starts = rng.randint(0, max(width, height), size=(num_objects, 2))
+        self.speeds = rng.randint(1, 6, size=(num_objects, 2))
+        self.colors = rng.randint(0, 256, size=(num_objects, 3)).astype(np.uint8)
+
+    def _frame_at(self, position):
+        if self.num_frames is not None and position >= self.num_frames:
+            return None
+        frame = self.background.copy()
+        limits = np.array([self.width, self.height]) - self.sizes
+        # Bounce each object back and forth along x and y
+        travel = (self.starts + self.speeds * position) % (2 * limits)
+        corners = np.where(travel > limits, 2 * limits - travel, travel)
+        for (x, y), (w, h), color in zip(corners, self.sizes, self.colors):
+            frame[y:y + h, x:x + w] = color
+        return frame
+
+
+def open_source(spec, width=320, height=240, paced=True, fps=None, loop=True):
+    """Create a replay/synthetic frame source from a spec string (see module docstring)"""
+    kind, _, path = spec.partition(":")
+    if not path:
+        kind, path = "", spec
+    if kind == "" and path == "synthetic":
+        kind = "synthetic"
+    elif kind == "":
+        if os.path.isdir(path):
+            kind = "images"
+        elif path.lower().endswith(".npy"):
+            kind = "npy"
+        else:
+            kind = "video"
+
+    if kind == "synthetic":
+        return SyntheticSource(width, height, fps or 30.0, paced, loop)
+    if kind == "video":
+        return VideoFileSource(path, fps, paced, loop)
+    if kind == "images":
+        return ImageDirSource(path, fps or 30.0, paced, loop)
+    if kind == "npy":
+        return NpyStackSource(path, fps or 30.0, paced, loop)
+    raise ValueError(f"Unknown frame source: {spec}")
@@ -1,153 +1,298 @@
-import csv
+import json
+import math
 import os
 from datetime import datetime
+import numpy as np
+from frame_log import iter_log_chunks, log_base
+from stream_stats import BucketedSeries, QuantileSketch, RunningStats
+from system_monitor import describe_throttled
 
-def generate_markdown_report(model_name, csv_path):
+BACKEND_LABELS = {"pytorch": "PyTorch", "tflite": "TensorFlow Lite", "onnx": "ONNX Runtime"}
+PHASE_COLUMNS = [("capture_ms", "Capture"), ("preprocess_ms", "Preprocess"), ("inference_ms", "Inference"),
+                 ("postprocess_ms", "Postprocess"), ("render_ms", "Render"), ("log_ms", "Log"),
+                 ("latency_ms", "Glass-to-result latency")]
+# Columns that get percentiles; every column gets mean / std / min / max
+QUANTILE_COLUMNS = ["model_fps", "pipeline_fps", "detect_ms"] + [column for column, _ in PHASE_COLUMNS]
+GRAPH_COLUMNS = ["model_fps", "pipeline_fps", "cpu", "ram", "temp", "detections", "tracks"]
+GRAPH_WIDTH = 60
+
+
+class LogAggregate:
+    """
+    One-pass summary of the measured (non-warmup) frames of a frame log:
+    RunningStats for every column, a QuantileSketch for QUANTILE_COLUMNS and
+    a BucketedSeries for GRAPH_COLUMNS. Memory doesn't grow with the log.
+    """
+    def __init__(self, width=GRAPH_WIDTH):
+        self.width = width
+        self.frames = 0
+        self.warmup_frames = 0
+        self.throttled = None  # every firmware throttling flag seen, None if never available
+        self.stats = {}
+        self.sketches = {}
+        self.series = {}
+
+    def update(self, columns):
+        """Add one {name: float64 array} chunk of the log"""
+        if "warmup" in columns:
+            measured = columns["warmup"] == 0
+            self.warmup_frames += int((~measured).sum())
+            columns = {name: values[measured] for name, values in columns.items()}
+        if "model_fps" not in columns and "fps" in columns:
+            columns["model_fps"] = columns["fps"]  # logs from before the model/pipeline split
+        self.frames += len(columns["frame"])
+
+        for name, values in columns.items():
+            if name == "throttled":
+                flags = values[values >= 0].astype(np.int64)  # -1 / NaN = not available
+                if flags.size:
+                    self.throttled = (self.throttled or 0) | int(np.bitwise_or.reduce(flags))
+                continue
+            self.stats.setdefault(name, RunningStats()).update(values)
+            if name in QUANTILE_COLUMNS:
+                self.sketches.setdefault(name, QuantileSketch()).update(values)
+            if name in GRAPH_COLUMNS:
+                self.series.setdefault(name, BucketedSeries(self.width)).update(values)
+
+    def value(self, column, stat="mean"):
+        """mean / std / min / max of a column, NaN if it has no values"""
+        return self.stats[column].get(stat) if column in self.stats else math.nan
+
+    def quantile(self, column, q):
+        """Percentile (q in 0..1) of a QUANTILE_COLUMNS column, NaN if it has no values"""
+        return self.sketches[column].quantile(q) if column in self.sketches else math.nan
+
+    def total(self, column):
+        """Sum of a column's values"""
+        stats = self.stats.get(column)
+        return stats.mean * stats.count if stats is not None else 0.0
+
+
+def aggregate_log(path, width=GRAPH_WIDTH):
+    """Stream a CSV or binary frame log chunk by chunk into a LogAggregate"""
+    log = LogAggregate(width)
+    for chunk in iter_log_chunks(path):
+        log.update(chunk)
+    return log
+
+
+def _format_temp(temp):
+    return "n/a" if math.isnan(temp) else f"{temp:.1f}°C"
+
+
+def generate_markdown_report(model_name, csv_path, backend=None):
     """
     Generate a markdown report with ASCII graphs from benchmark data.
+    csv_path is a CSV or binary frame log (see frame_log.py). The report is
+    written next to it: logs/<run>.csv → logs/<run>_report.md.
+    The log is read once, chunk by chunk, into fixed-size aggregates
+    (see stream_stats.py), so soak-test logs of any length fit in memory.
+    Warmup rows (warmup=1) are left out of all statistics and graphs; cold
+    start and warmup details come from logs/<run>_meta.json if present.
+    Model FPS counts only the detector; pipeline FPS is the end-to-end
+    result rate over wall time. Logs from before the split only have `fps`.
+    Returns the report path.
     """
-    # Read CSV data
-    frames = []
-    fps_data = []
-    cpu_data = []
-    ram_data = []
-    temp_data = []
-    detections_data = []
-    
-    with open(csv_path, 'r') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            frames.append(int(row['frame']))
-            fps_data.append(float(row['fps']))
-            cpu_data.append(float(row['cpu']))
-            ram_data.append(float(row['ram']))
-            temp_data.append(float(row['temp']))
-            detections_data.append(int(row['detections']))
-    
-    # Calculate statistics
-    avg_fps = sum(fps_data) / len(fps_data)
-    min_fps = min(fps_data)
-    max_fps = max(fps_data)
-    
-    avg_cpu = sum(cpu_data) / len(cpu_data)
-    avg_ram = sum(ram_data) / len(ram_data)
-    avg_temp = sum(temp_data) / len(temp_data)
-    max_temp = max(temp_data)
-    
-    total_detections = sum(detections_data)
-    
+    # Read the frame log (CSV or binary), measured frames only
+    log = aggregate_log(csv_path)
+    if not log.frames:
+        raise ValueError(f"No measured frames in {csv_path}")
+
+    meta = None
+    meta_path = f"{log_base(csv_path)}_meta.json"
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+
+    # End-to-end throughput: frames over wall time if known, else the rolling column
+    if meta and "throughput" in meta:
+        pipeline_fps = meta["throughput"]["pipeline_fps"]
+    else:
+        pipeline_fps = log.value("pipeline_fps")
+    min_freq = log.value("cpu_freq_mhz", "min")
+
     # Generate markdown report
-    report_path = f"logs/{model_name}_report.md"
+    report_path = f"{log_base(csv_path)}_report.md"
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
+
     with open(report_path, 'w') as f:
         f.write(f"# 🚀 YOLO Benchmark Report: {model_name.upper()}\n\n")
+        if backend:
+            f.write(f"**Format:** {BACKEND_LABELS.get(backend, backend)}\n\n")
         f.write(f"**Test Date:** {timestamp}\n\n")
-        f.write(f"**Total Frames:** {len(frames)}\n\n")
+        f.write(f"**Total Frames:** {log.frames}\n\n")
         f.write(f"---\n\n")
-        
+
         # Summary Statistics
         f.write(f"## 📊 Summary Statistics\n\n")
         f.write(f"| Metric | Value |\n")
         f.write(f"|--------|-------|\n")
-        f.write(f"| **Average FPS** | {avg_fps:.2f} |\n")
-        f.write(f"| **Min FPS** | {min_fps:.2f} |\n")
-        f.write(f"| **Max FPS** | {max_fps:.2f} |\n")
-        f.write(f"| **Average CPU** | {avg_cpu:.1f}% |\n")
-        f.write(f"| **Average RAM** | {avg_ram:.1f}% |\n")
-        f.write(f"| **Average Temp** | {avg_temp:.1f}°C |\n")
-        f.write(f"| **Max Temp** | {max_temp:.1f}°C |\n")
-        f.write(f"| **Total Detections** | {total_detections} |\n\n")
-        
+        f.write(f"| **Average Model FPS** | {log.value('model_fps'):.2f} |\n")
+        f.write(f"| **Min Model FPS** | {log.value('model_fps', 'min'):.2f} |\n")
+        f.write(f"| **Max Model FPS** | {log.value('model_fps', 'max'):.2f} |\n")
+        f.write(f"| **Model FPS Std Dev** | {log.value('model_fps', 'std'):.2f} |\n")
+        if not math.isnan(pipeline_fps):
+            f.write(f"| **Pipeline FPS (end-to-end)** | {pipeline_fps:.2f} |\n")
+        f.write(f"| **Average CPU** | {log.value('cpu'):.1f}% |\n")
+        f.write(f"| **Average RAM** | {log.value('ram'):.1f}% |\n")
+        f.write(f"| **Average Temp** | {_format_temp(log.value('temp'))} |\n")
+        f.write(f"| **Max Temp** | {_format_temp(log.value('temp', 'max'))} |\n")
+        if not math.isnan(min_freq):
+            f.write(f"| **Min CPU Clock** | {min_freq:.0f} MHz |\n")
+        if log.throttled is not None:
+            f.write(f"| **Throttling** | {describe_throttled(log.throttled)} |\n")
+        if log.value("inferred") < 1:
+            f.write(f"| **Inferred Frames** | {log.value('inferred'):.0%} |\n")
+        if not math.isnan(log.value("tracks")):
+            f.write(f"| **Average Tracked Objects** | {log.value('tracks'):.2f} |\n")
+            if meta and meta.get("tracker"):
+                f.write(f"| **Unique Tracks** | {meta['tracker']['unique_tracks']} |\n")
+        f.write(f"| **Total Detections** | {log.total('detections'):.0f} |\n\n")
+
         f.write(f"---\n\n")
-        
+
+        # Per-phase timing
+        phases = [(column, label) for column, label in PHASE_COLUMNS if not math.isnan(log.value(column))]
+        if phases:
+            f.write(f"## ⏱️ Time Per Frame\n\n")
+            f.write(f"| Phase | Mean ms | Std ms | p50 ms | p95 ms | p99 ms | Max ms |\n")
+            f.write(f"|-------|---------|--------|--------|--------|--------|--------|\n")
+            for column, label in phases:
+                f.write(f"| {label} | {log.value(column):.1f} | {log.value(column, 'std'):.1f}"
+                        f" | {log.quantile(column, 0.50):.1f} | {log.quantile(column, 0.95):.1f}"
+                        f" | {log.quantile(column, 0.99):.1f} | {log.value(column, 'max'):.1f} |\n")
+            f.write(f"\nModel FPS counts preprocess + inference + postprocess only; pipeline FPS is the rate at which "
+                    f"results come out of the whole capture → detect → render/log chain. "
+                    f"Percentiles are accurate to within 1%.\n\n")
+            f.write(f"---\n\n")
+
+        # Cold start and warmup
+        if meta or log.warmup_frames:
+            f.write(f"## 🧊 Cold Start & Warmup\n\n")
+            f.write(f"| Metric | Value |\n")
+            f.write(f"|--------|-------|\n")
+            if meta:
+                cold = meta["cold_start"]
+                f.write(f"| **Model Load** | {cold['model_load_ms']:.0f} ms |\n")
+                f.write(f"| **First Frame (pre+inference+post)** | {cold['first_detect_ms']:.1f} ms |\n")
+                f.write(f"| **Time To First Result** | {cold['time_to_first_result_ms']:.0f} ms |\n")
+            f.write(f"| **Warmup Frames (excluded)** | {log.warmup_frames} |\n")
+            if meta:
+                warmup = meta["warmup"]
+                f.write(f"| **Warmup Time** | {warmup['warmup_seconds']:.1f} s |\n")
+                steady = (f"frame {warmup['steady_frame']} ({warmup['steady_seconds']:.1f} s)"
+                          if warmup["steady_frame"] is not None else "not reached")
+                f.write(f"| **Latency Steady After** | {steady} |\n")
+            f.write(f"\n---\n\n")
+
         # FPS Graph
-        f.write(f"## 📈 FPS Over Time\n\n")
+        f.write(f"## 📈 Model FPS Over Time\n\n")
         f.write(f"```\n")
-        f.write(generate_ascii_graph(fps_data, "FPS", height=10))
+        f.write(_column_graph(log, "model_fps", "FPS"))
         f.write(f"```\n\n")
-        
+
+        if not math.isnan(log.value("pipeline_fps")):
+            f.write(f"## 🔁 Pipeline FPS Over Time\n\n")
+            f.write(f"```\n")
+            f.write(_column_graph(log, "pipeline_fps", "FPS"))
+            f.write(f"```\n\n")
+
         # CPU Usage Graph
         f.write(f"## 🔥 CPU Usage Over Time\n\n")
         f.write(f"```\n")
-        f.write(generate_ascii_graph(cpu_data, "CPU %", height=10))
+        f.write(_column_graph(log, "cpu", "CPU %"))
         f.write(f"```\n\n")
-        
+
         # RAM Usage Graph
         f.write(f"## 💾 RAM Usage Over Time\n\n")
         f.write(f"```\n")
-        f.write(generate_ascii_graph(ram_data, "RAM %", height=10))
+        f.write(_column_graph(log, "ram", "RAM %"))
         f.write(f"```\n\n")
-        
+
         # Temperature Graph
         f.write(f"## 🌡️ Temperature Over Time\n\n")
         f.write(f"```\n")
-        f.write(generate_ascii_graph(temp_data, "Temp °C", height=10))
+        f.write(_column_graph(log, "temp", "Temp °C"))
         f.write(f"```\n\n")
-        
+
         # Detections Graph
         f.write(f"## 🎯 Detections Per Frame\n\n")
         f.write(f"```\n")
-        f.write(generate_ascii_graph(detections_data, "Objects", height=10, is_integer=True))
+        f.write(_column_graph(log, "detections", "Objects", is_integer=True))
         f.write(f"```\n\n")
-        
+
+        if "tracks" in log.series and not math.isnan(log.value("tracks")):
+            f.write(f"## 🧭 Tracked Objects Per Frame\n\n")
+            f.write(f"```\n")
+            f.write(_column_graph(log, "tracks", "Tracks", is_integer=True))
+            f.write(f"```\n\n")
+
         f.write(f"---\n\n")
         f.write(f"*Generated automatically by YOLO Benchmark Tool*\n")
-    
+
     print(f"✅ Report generated: {report_path}")
+    return report_path
+
+
+def _column_graph(log, column, label, is_integer=False):
+    """ASCII graph of a downsampled column, with min/max/avg over every frame in the header"""
+    if column not in log.series:
+        return "No data available\n"
+    stats = log.stats[column]
+    return generate_ascii_graph(log.series[column].values(), label, height=10, width=log.width,
+                                is_integer=is_integer, stats=(stats.get("min"), stats.get("max"), stats.get("mean")),
+                                frames=log.series[column].frames)
 
 
-def generate_ascii_graph(data, label, height=10, width=60, is_integer=False):
+def generate_ascii_graph(data, label, height=10, width=60, is_integer=False, stats=None, frames=None):
     """
-    Generate an ASCII graph from data.
+    Generate an ASCII graph from data (NaN values are skipped).
+    Data longer than `width` is averaged down to `width` columns. For data
+    that is already downsampled, stats=(min, max, avg) and frames (the
+    original length) set the header and axis.
     """
-    if not data:
+    data = np.asarray(data, dtype=np.float64)
+    data = data[~np.isnan(data)]
+    if not data.size:
         return "No data available\n"
-    
-    max_val = max(data)
-    min_val = min(data)
-    
-    if max_val == min_val:
-        max_val = min_val + 1
-    
+    if stats is None:
+        stats = (data.min(), data.max(), data.mean())
+    if frames is None:
+        frames = len(data)
+    min_val, max_val, avg_val = stats
+
     graph = []
-    
+
     # Header
-    graph.append(f"{label}: Min={min_val:.1f}, Max={max_val:.1f}, Avg={sum(data)/len(data):.1f}\n")
+    graph.append(f"{label}: Min={min_val:.1f}, Max={max_val:.1f}, Avg={avg_val:.1f}\n")
     graph.append("\n")
-    
-    # Scale data to fit height
-    scaled_data = []
-    for val in data:
-        scaled = int(((val - min_val) / (max_val - min_val)) * (height - 1))
-        scaled_data.append(scaled)
-    
-    # Sample data if too many points
-    if len(scaled_data) > width:
-        step = len(scaled_data) / width
-        sampled = [scaled_data[int(i * step)] for i in range(width)]
-        scaled_data = sampled
-    
-    # Draw graph from top to bottom
-    for row in range(height - 1, -1, -1):
-        line = ""
-        for val in scaled_data:
-            if val >= row:
-                line += "█"
-            else:
-                line += " "
-        
+
+    if max_val == min_val:
+        max_val = min_val + 1
+
+    # Average down to the graph width
+    if len(data) > width:
+        group = np.arange(len(data)) * width // len(data)
+        data = np.bincount(group, weights=data, minlength=width) / np.bincount(group, minlength=width)
+
+    # Scale data to fit height and draw every row at once, top to bottom
+    scaled = ((data - min_val) / (max_val - min_val) * (height - 1)).astype(int)
+    rows = np.arange(height - 1, -1, -1)
+    grid = np.where(scaled[None, :] >= rows[:, None], "█", " ")
+
+    for row, cells in zip(rows, grid):
+        line = "".join(cells)
         # Add axis label
         actual_val = min_val + (row / (height - 1)) * (max_val - min_val)
         if is_integer:
             graph.append(f"{int(actual_val):4d} |{line}\n")
         else:
             graph.append(f"{actual_val:5.1f}|{line}\n")
-    
+
     # Bottom axis
-    graph.append("     +" + "-" * len(scaled_data) + "\n")
-    graph.append(f"      Frame: 0 → {len(data)}\n")
-    
+    graph.append("     +" + "-" * len(scaled) + "\n")
+    graph.append(f"      Frame: 0 → {frames}\n")
+
     return "".join(graph)
 
 
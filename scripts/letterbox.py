@@ -0,0 +1,70 @@
+"""
+Letterbox resize with cached geometry.
+
+Fits a frame into the model input without distorting it: the frame is scaled
+to fit and centred on a grey (114) border, the same way Ultralytics prepares
+images. The scale and padding are computed once per input resolution, the
+padded buffer is filled once and only the image area is rewritten per frame.
+"""
+
+import cv2
+import numpy as np
+from yolo_postprocess import scale_boxes
+
+PAD_VALUE = 114  # Ultralytics letterbox border colour
+
+
+class LetterboxGeometry:
+    """Where a src_w x src_h frame lands inside the model input"""
+    __slots__ = ("src_w", "src_h", "scale", "new_w", "new_h", "pad_x", "pad_y")
+
+    def __init__(self, src_w, src_h, dst_w, dst_h):
+        self.src_w = src_w
+        self.src_h = src_h
+        self.scale = min(dst_w / src_w, dst_h / src_h)
+        self.new_w = int(round(src_w * self.scale))
+        self.new_h = int(round(src_h * self.scale))
+        self.pad_x = int(round((dst_w - self.new_w) / 2 - 0.1))
+        self.pad_y = int(round((dst_h - self.new_h) / 2 - 0.1))
+
+    def to_source(self, boxes):
+        """Map xyxy boxes from model input pixels back to frame pixels (in place)"""
+        return scale_boxes(boxes, (self.scale, self.scale), (self.pad_x, self.pad_y), (self.src_h, self.src_w))
+
+
+class Letterbox:
+    """
+    Letterboxes frames into a reused (height, width, 3) uint8 buffer.
+
+    apply() returns the buffer and the geometry of the frame, whose
+    to_source() is the inverse transform for the post-processor.
+    """
+    def __init__(self, width, height, pad_value=PAD_VALUE):
+        self.width = width
+        self.height = height
+        self.pad_value = pad_value
+        self.buffer = np.full((height, width, 3), pad_value, dtype=np.uint8)
+        self._geometries = {}
+        self._filled_for = None  # Geometry whose border is currently in the buffer
+
+    def geometry(self, src_w, src_h):
+        """Cached letterbox geometry for a source resolution"""
+        geometry = self._geometries.get((src_w, src_h))
+        if geometry is None:
+            geometry = LetterboxGeometry(src_w, src_h, self.width, self.height)
+            self._geometries[(src_w, src_h)] = geometry
+        return geometry
+
+    def apply(self, frame):
+        """Letterbox a frame into the buffer, returns (buffer, geometry)"""
+        g = self.geometry(frame.shape[1], frame.shape[0])
+        if self._filled_for is not g:
+            # Resolution changed: the old image area may overlap the new border
+            self.buffer.fill(self.pad_value)
+            self._filled_for = g
+        area = self.buffer[g.pad_y:g.pad_y + g.new_h, g.pad_x:g.pad_x + g.new_w]
+        if g.new_w == g.src_w and g.new_h == g.src_h:
+            np.copyto(area, frame)
+        else:
+            cv2.resize(frame, (g.new_w, g.new_h), dst=area, interpolation=cv2.INTER_LINEAR)
+        return self.buffer, g
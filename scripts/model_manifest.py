@@ -0,0 +1,90 @@
+"""
+Manifest of exported model variants.
+
+export_models_to_tflite.py exports every model at several input sizes and
+precisions and records each file in models/export_manifest.json: model,
+format, precision, input size, and the input/output shape, dtype and
+quantization read back from the exported file. select_model.py reads it to
+benchmark the variants and pick one.
+
+Paths in the manifest are relative to the project root.
+"""
+
+import json
+import os
+from datetime import datetime
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MANIFEST_PATH = os.path.join(project_root, "models", "export_manifest.json")
+DEFAULT_SIZES = [256, 320, 416, 640]
+# Export formats: TFLite precisions (Ultralytics file suffix) and ONNX
+TFLITE_PRECISIONS = {"fp32": "float32", "fp16": "float16", "int8": "int8"}
+FORMATS = list(TFLITE_PRECISIONS) + ["onnx"]
+
+
+def variant_path(stem, fmt, imgsz):
+    """Project-relative path of an exported variant, e.g. tensorlite/models/yolov8n_320_int8.tflite"""
+    if fmt == "onnx":
+        return os.path.join("models", f"{stem}_{imgsz}.onnx")
+    return os.path.join("tensorlite", "models", f"{stem}_{imgsz}_{fmt}.tflite")
+
+
+def _tensor(detail):
+    scale, zero_point = detail["quantization"]
+    return {"name": detail["name"], "shape": [int(d) for d in detail["shape"]], "dtype": detail["dtype"].__name__,
+            "quantization": [float(scale), int(zero_point)] if scale else None}
+
+
+def inspect_model(path):
+    """{"input": ..., "output": ...} with shape, dtype and quantization of an exported model, None if unreadable"""
+    try:
+        if path.endswith(".tflite"):
+            from tflite_backend import load_interpreter
+            interpreter = load_interpreter(path)
+            return {"input": _tensor(interpreter.get_input_details()[0]),
+                    "output": _tensor(interpreter.get_output_details()[0])}
+        import onnxruntime as ort
+        session = ort.InferenceSession(path, providers=["CPUExecutionProvider"])
+        tensors = {}
+        for key, value in (("input", session.get_inputs()[0]), ("output", session.get_outputs()[0])):
+            tensors[key] = {"name": value.name, "shape": [d if isinstance(d, int) else None for d in value.shape],
+                            "dtype": value.type[len("tensor("):-1], "quantization": None}
+        return tensors
+    except Exception as e:  # runtime missing or file unreadable: the manifest entry is still useful
+        print(f"⚠️  Could not inspect {os.path.basename(path)}: {e}")
+        return None
+
+
+def load_manifest(path=MANIFEST_PATH):
+    """Manifest dict, with an empty variant list if the file doesn't exist"""
+    if not os.path.exists(path):
+        return {"variants": []}
+    with open(path) as f:
+        return json.load(f)
+
+
+def add_variant(manifest, entry):
+    """Add or replace (same path) a variant entry"""
+    manifest["variants"] = [v for v in manifest["variants"] if v["path"] != entry["path"]] + [entry]
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    manifest["updated"] = datetime.now().isoformat(timespec="seconds")
+    manifest["variants"].sort(key=lambda v: (v["model"], v["imgsz"], v["format"]))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    return path
+
+
+def find_variants(manifest, model, formats=None, sizes=None):
+    """Variants of a model present on disk, smallest input first, optionally limited to formats / sizes"""
+    found = []
+    for variant in manifest["variants"]:
+        if variant["model"] != model or (formats and variant["format"] not in formats):
+            continue
+        if sizes and variant["imgsz"] not in sizes:
+            continue
+        if os.path.exists(os.path.join(project_root, variant["path"])):
+            found.append(variant)
+    return sorted(found, key=lambda v: (v["imgsz"], FORMATS.index(v["format"])))
@@ -0,0 +1,103 @@
+"""
+Scene-change gate: skip inference while the camera looks at a static scene.
+
+Each frame is reduced to a small grid of block sums (every second pixel of
+the green channel, summed over BLOCK x BLOCK pixel blocks with two NumPy
+reshape-sums; a fraction of a millisecond at 320x240) and compared with the grid of the last inferred frame. The change
+score is the fraction of blocks whose mean moved by more than PIXEL_DELTA
+grey levels. A frame is inferred when the score reaches the threshold or
+the last inference is older than max_stale seconds; the runner reuses the
+cached detections otherwise.
+
+Comparing against the last inferred frame (not the previous one) means slow
+changes add up until they trigger an inference.
+"""
+
+import math
+import time
+import numpy as np
+
+BLOCK = 8  # pixels per block side
+STEP = 2  # pixel subsampling inside a block
+PIXEL_DELTA = 12  # grey levels a block mean must move to count as changed
+THRESHOLD = 0.02  # fraction of changed blocks that triggers inference
+MAX_STALE = 2.0  # seconds after which a frame is inferred regardless
+
+
+def block_sums(frame, block=BLOCK, step=STEP):
+    """(H // block, W // block) grid of green-channel block sums (every step-th pixel), as int32"""
+    channel = frame[::step, ::step, 1] if frame.ndim == 3 else frame[::step, ::step]
+    n = block // step  # samples per block side
+    rows, cols = channel.shape[0] // n, channel.shape[1] // n
+    # Rows first (a contiguous copy of the strided view), then columns
+    row_sums = channel[:rows * n, :cols * n].reshape(rows, n, cols * n).sum(axis=1, dtype=np.int32)
+    return row_sums.reshape(rows, cols, n).sum(axis=2)
+
+
+class MotionGate:
+    """
+    update(frame) scores a frame against the last inferred one;
+    should_infer(now_ns) decides; inferred(now_ns) makes the frame just
+    scored the new reference. Also counts skips and its own cost.
+    """
+    def __init__(self, threshold=THRESHOLD, max_stale=MAX_STALE, block=BLOCK, pixel_delta=PIXEL_DELTA):
+        self.threshold = threshold
+        self.max_stale_ns = int(max_stale * 1e9) if max_stale else None
+        self.block = block
+        self._delta = pixel_delta * (block // STEP) ** 2  # on block sums
+        self._reference = None
+        self._current = None
+        self._last_inferred_ns = None
+        self.score = math.nan
+        self.scored = 0
+        self.checked = 0
+        self.skipped = 0
+        self.stale = 0  # frames inferred only because of max_stale
+        self.gate_ns = 0
+
+    def update(self, frame):
+        """Change score of a frame (1.0 without a reference); returns the score"""
+        t0 = time.perf_counter_ns()
+        self._current = block_sums(frame, self.block)
+        if self._reference is None or self._reference.shape != self._current.shape:
+            self.score = 1.0
+        else:
+            changed = np.abs(self._current - self._reference) > self._delta
+            self.score = float(np.count_nonzero(changed)) / changed.size
+        self.gate_ns += time.perf_counter_ns() - t0
+        self.scored += 1
+        return self.score
+
+    def should_infer(self, now_ns):
+        """True if the last scored frame changed enough or the cached detections are too old"""
+        self.checked += 1
+        if self.score >= self.threshold:
+            return True
+        if self.max_stale_ns is not None and now_ns - self._last_inferred_ns >= self.max_stale_ns:
+            self.stale += 1
+            return True
+        self.skipped += 1
+        return False
+
+    def inferred(self, now_ns):
+        """The last scored frame was inferred: compare the next frames with it"""
+        self._reference = self._current
+        self._last_inferred_ns = now_ns
+
+    def describe(self):
+        stale = f", max {self.max_stale_ns / 1e9:g} s stale" if self.max_stale_ns is not None else ""
+        return f"≥ {self.threshold:.1%} of {self.block}px blocks changed{stale}"
+
+    def to_dict(self, detect_ms=math.nan):
+        """Skip counts and the CPU time saved: skipped frames × detect_ms (mean inference cost) − gate cost"""
+        gate_s = self.gate_ns / 1e9
+        saved_s = self.skipped * detect_ms / 1000 - gate_s
+        return {
+            "motion_gate": self.describe(),
+            "motion_checked": self.checked,
+            "motion_skipped": self.skipped,
+            "motion_stale": self.stale,
+            "motion_skip_ratio": self.skipped / self.checked if self.checked else math.nan,
+            "motion_gate_ms_mean": self.gate_ns / 1e6 / self.scored if self.scored else math.nan,
+            "motion_cpu_saved_s": saved_s,
+        }
@@ -0,0 +1,390 @@
+"""
+Multi-stream inference: several cameras or replay sources on one host.
+
+Each stream is read on its own thread in the main process and its frames are
+copied into a ring of slots in a multiprocessing.shared_memory block. Only
+small (stream, slot, timestamp) tuples go through the task queue to a pool
+of worker processes; each worker holds its own detector (TFLite interpreter,
+ONNX session or Ultralytics model), is pinned to its own cores and reads the
+frame straight from shared memory. A frame that arrives while every slot of
+its stream is busy is dropped, like a camera that can't be read in time.
+
+Per-stream and aggregate FPS and latency (capture → result, perf_counter_ns
+is system-wide on Linux) are reported; with several --streams values each
+count is run in turn to find how many streams the host sustains at
+--target-fps.
+
+Examples:
+    python3 scripts/multi_stream.py --model yolo8n --backend tflite --streams 1 2 4 --source video:clip.mp4
+    python3 scripts/multi_stream.py --model models/yolov8n.onnx --sources video:a.mp4 video:b.mp4 --workers 2 --threads 2
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime
+from multiprocessing import shared_memory
+import numpy as np
+from run_benchmark import MODELS, get_camera_module, resolve_model
+from stream_stats import QuantileSketch, RunningStats
+
+SLOTS_PER_STREAM = 4  # frames of a stream that can be queued or in inference at once
+STATS_FLUSH = 256  # results buffered per stream before they are folded into the statistics
+
+
+def pin_to_cores(cores):
+    """Restrict the calling process to `cores` (Linux only); returns the cores actually used"""
+    if not hasattr(os, "sched_setaffinity"):
+        return None
+    os.sched_setaffinity(0, cores)
+    return sorted(os.sched_getaffinity(0))
+
+
+def worker_cores(worker, num_threads, num_cores):
+    """Cores of worker i: num_threads consecutive cores, wrapping around"""
+    return {(worker * num_threads + i) % num_cores for i in range(num_threads)}
+
+
+def worker_main(worker, model_path, detector_options, cores, streams, tasks, results):
+    """
+    Worker process: attach to every stream's shared memory, load the model and
+    detect frames from the task queue until it gets None.
+    streams is a list of (shm name, slots shape) per stream.
+    """
+    from detector import create_detector
+    pinned = pin_to_cores(cores)
+    blocks = [shared_memory.SharedMemory(name=name) for name, _ in streams]
+    slots = [np.ndarray(shape, np.uint8, buffer=block.buf) for block, (_, shape) in zip(blocks, streams)]
+    try:
+        detector = create_detector(model_path, **detector_options)
+        results.put(("ready", worker, pinned, detector.describe()))
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            stream, slot, seq, captured_ns = task
+            detections = detector.detect(slots[stream][slot])
+            done_ns = time.perf_counter_ns()
+            detect_ns = sum(detector.timings_ns.get(phase, 0) for phase in ("preprocess", "inference", "postprocess"))
+            results.put(("result", stream, slot, seq, captured_ns, done_ns, detect_ns, len(detections), worker))
+        detector.close()
+    except Exception as e:
+        results.put(("error", worker, repr(e)))
+    finally:
+        del slots
+        for block in blocks:
+            block.close()
+
+
+class StreamReader:
+    """
+    Reads one source on a thread into its shared-memory slot ring. If reading
+    fails the thread stores the exception in `error` and sets `ended`.
+    """
+    def __init__(self, index, cap, first_frame, num_slots, tasks):
+        if first_frame.dtype != np.uint8:
+            raise ValueError(f"Stream {index} returned {first_frame.dtype} frames, expected uint8")
+        self.index = index
+        self.cap = cap
+        self.shape = (num_slots,) + first_frame.shape
+        self.block = shared_memory.SharedMemory(create=True, size=int(np.prod(self.shape)))
+        self.slots = np.ndarray(self.shape, np.uint8, buffer=self.block.buf)
+        self.free = queue.SimpleQueue()  # slots are returned by the main process when a result comes back
+        for slot in range(num_slots):
+            self.free.put(slot)
+        self.tasks = tasks
+        self.read = 0
+        self.dropped = 0
+        self.ended = False
+        self.error = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"stream-{index}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.ident is not None:
+            self._thread.join(timeout=2.0)
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                ret, frame = self.cap.read()
+                if not ret:
+                    break
+                captured_ns = time.perf_counter_ns()
+                if frame.shape != self.shape[1:] or frame.dtype != np.uint8:
+                    # e.g. a camera that changed or ignored the requested resolution
+                    raise ValueError(f"Frame {frame.shape} {frame.dtype} doesn't match the slots"
+                                     f" {self.shape[1:]} uint8")
+                self.read += 1
+                try:
+                    slot = self.free.get_nowait()
+                except queue.Empty:
+                    self.dropped += 1  # every slot is waiting for a worker
+                    continue
+                np.copyto(self.slots[slot], frame)
+                self.tasks.put((self.index, slot, self.read, captured_ns))
+        except Exception as e:
+            self.error = e
+        finally:
+            self.ended = True
+
+    def close(self):
+        self.cap.release()
+        del self.slots
+        self.block.close()
+        self.block.unlink()
+
+
+class StreamStats:
+    """Result count, FPS and latency distribution of one stream, in fixed memory"""
+    def __init__(self):
+        self.results = 0
+        self.detections = 0
+        self.latency = RunningStats()
+        self.latency_sketch = QuantileSketch()
+        self.detect = RunningStats()
+        self._latency_ms = []
+        self._detect_ms = []
+
+    def add(self, latency_ms, detect_ms, detections):
+        self.results += 1
+        self.detections += detections
+        self._latency_ms.append(latency_ms)
+        self._detect_ms.append(detect_ms)
+        if len(self._latency_ms) >= STATS_FLUSH:
+            self.flush()
+
+    def flush(self):
+        if self._latency_ms:
+            latency = np.array(self._latency_ms)
+            self.latency.update(latency)
+            self.latency_sketch.update(latency)
+            self.detect.update(np.array(self._detect_ms))
+            self._latency_ms.clear()
+            self._detect_ms.clear()
+
+
+def raise_reader_error(readers, sources):
+    for reader in readers:
+        if reader.error is not None:
+            raise RuntimeError(f"Stream {reader.index} ({sources[reader.index]}) failed: {reader.error}")
+
+
+def run_streams(model_path, sources, get_camera, num_workers, num_threads, duration, detector_options,
+                camera_size=(320, 240), paced=True, num_slots=SLOTS_PER_STREAM, warmup=2.0):
+    """
+    Run len(sources) streams on num_workers pinned worker processes for
+    `duration` seconds (after `warmup` seconds that are not counted).
+    Returns a dict with per-stream and aggregate results.
+    """
+    ctx = mp.get_context("spawn")  # clean workers: no inherited camera, threads or torch state
+    num_cores = os.cpu_count() or 1
+    width, height = camera_size
+    tasks = ctx.Queue()
+    results = ctx.Queue()
+
+    readers = []
+    workers = []
+    try:
+        for i, source in enumerate(sources):
+            cap = get_camera(width=width, height=height, threaded=False, source=source, paced=paced)
+            if cap is None or not cap.isOpened():
+                raise IOError(f"Could not open stream {i}: {source}")
+            ret, frame = cap.read()
+            if not ret:
+                raise IOError(f"Stream {i} ({source}) returned no frames")
+            readers.append(StreamReader(i, cap, frame, num_slots, tasks))
+
+        streams = [(reader.block.name, reader.shape) for reader in readers]
+        options = dict(detector_options, num_threads=num_threads)
+        for w in range(num_workers):
+            cores = worker_cores(w, num_threads, num_cores)
+            process = ctx.Process(target=worker_main, name=f"detector-{w}", daemon=True,
+                                  args=(w, model_path, options, cores, streams, tasks, results))
+            process.start()
+            workers.append(process)
+
+        # Models load before any frame is read, so cold start isn't measured
+        described = None
+        for _ in range(num_workers):
+            message = results.get(timeout=300)
+            if message[0] == "error":
+                raise RuntimeError(f"Worker {message[1]} failed: {message[2]}")
+            _, w, pinned, described = message
+            print(f"   worker {w}: cores {pinned if pinned is not None else 'any'}")
+
+        stats = [StreamStats() for _ in readers]
+        for reader in readers:
+            reader.start()
+        start_ns = time.perf_counter_ns()
+        measure_ns = start_ns + int(warmup * 1e9)
+        end_ns = measure_ns + int(duration * 1e9)
+        read_at_start = None
+        busy = {w: 0 for w in range(num_workers)}
+        while True:
+            now = time.perf_counter_ns()
+            raise_reader_error(readers, sources)
+            if now >= end_ns or all(reader.ended for reader in readers):
+                break
+            if read_at_start is None and now >= measure_ns:
+                read_at_start = [(reader.read, reader.dropped) for reader in readers]
+            try:
+                message = results.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            if message[0] == "error":
+                raise RuntimeError(f"Worker {message[1]} failed: {message[2]}")
+            _, stream, slot, seq, captured_ns, done_ns, detect_ns, detections, w = message
+            readers[stream].free.put(slot)
+            if captured_ns >= measure_ns:
+                stats[stream].add((done_ns - captured_ns) / 1e6, detect_ns / 1e6, detections)
+                busy[w] += detect_ns
+        raise_reader_error(readers, sources)  # a reader may have failed just before the loop ended
+        elapsed = (min(time.perf_counter_ns(), end_ns) - measure_ns) / 1e9
+    finally:
+        for reader in readers:
+            reader.stop()
+        for _ in workers:
+            tasks.put(None)
+        for process in workers:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+        for reader in readers:
+            reader.close()
+
+    read_at_start = read_at_start or [(0, 0)] * len(readers)
+    per_stream = []
+    for reader, stream, (read0, dropped0) in zip(readers, stats, read_at_start):
+        stream.flush()
+        per_stream.append({
+            "source": sources[reader.index],
+            "frames": stream.results,
+            "fps": stream.results / elapsed if elapsed > 0 else 0.0,
+            "read": reader.read - read0,
+            "dropped": reader.dropped - dropped0,
+            "latency_ms_mean": stream.latency.get("mean"),
+            "latency_ms_p50": stream.latency_sketch.quantile(0.50),
+            "latency_ms_p95": stream.latency_sketch.quantile(0.95),
+            "latency_ms_p99": stream.latency_sketch.quantile(0.99),
+            "detect_ms_mean": stream.detect.get("mean"),
+            "detections": stream.detections,
+        })
+    total = sum(s["frames"] for s in per_stream)
+    sketch = QuantileSketch()
+    for stream in stats:
+        sketch.merge(stream.latency_sketch)
+    return {
+        "streams": len(sources),
+        "workers": num_workers,
+        "threads_per_worker": num_threads,
+        "detector": described,
+        "duration_s": elapsed,
+        "aggregate_fps": total / elapsed if elapsed > 0 else 0.0,
+        "min_stream_fps": min(s["fps"] for s in per_stream),
+        "latency_ms_p50": sketch.quantile(0.50),
+        "latency_ms_p95": sketch.quantile(0.95),
+        "latency_ms_p99": sketch.quantile(0.99),
+        "dropped": sum(s["dropped"] for s in per_stream),
+        "worker_busy": {w: ns / 1e9 / elapsed for w, ns in busy.items()} if elapsed > 0 else {},
+        "per_stream": per_stream,
+    }
+
+
+def print_run(run):
+    print(f"\n| Stream | Source | FPS | Frames | Dropped | Latency p50 ms | p95 ms | p99 ms | Detect ms |")
+    print(f"|--------|--------|-----|--------|---------|----------------|--------|--------|-----------|")
+    for i, s in enumerate(run["per_stream"]):
+        print(f"| {i} | {s['source']} | {s['fps']:.2f} | {s['frames']} | {s['dropped']} | {s['latency_ms_p50']:.1f}"
+              f" | {s['latency_ms_p95']:.1f} | {s['latency_ms_p99']:.1f} | {s['detect_ms_mean']:.1f} |")
+    print(f"\n📊 {run['streams']} stream(s) on {run['workers']} worker(s) × {run['threads_per_worker']} thread(s):"
+          f" {run['aggregate_fps']:.2f} FPS total | slowest stream {run['min_stream_fps']:.2f} FPS"
+          f" | latency p50/p95/p99 {run['latency_ms_p50']:.1f}/{run['latency_ms_p95']:.1f}/{run['latency_ms_p99']:.1f} ms"
+          f" | {run['dropped']} dropped")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run several camera/replay streams through a pool of detector processes")
+    parser.add_argument("--model", default="yolo8n", help=f"Model name ({', '.join(MODELS)}) or model file")
+    parser.add_argument("--backend", choices=["pytorch", "tflite", "onnx"], default="tflite",
+                        help="Format for model names (files use their extension)")
+    parser.add_argument("--sources", nargs="+", default=None,
+                        help="One source per stream (camera, synthetic, video:..., images:..., npy:...)")
+    parser.add_argument("--source", default="synthetic", help="Source of every stream when --sources isn't given")
+    parser.add_argument("--streams", type=int, nargs="+", default=[1],
+                        help="Stream counts to run in turn (with --source)")
+    parser.add_argument("--workers", type=int, default=None, help="Detector processes (default: one per stream, max one per core)")
+    parser.add_argument("--threads", type=int, default=None, help="Inference threads per worker (default: cores / workers)")
+    parser.add_argument("--duration", type=float, default=20, help="Measured seconds per stream count")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds before measuring")
+    parser.add_argument("--target-fps", type=float, default=15.0, help="FPS every stream must reach")
+    parser.add_argument("--unpaced", action="store_true", help="Replay sources as fast as possible")
+    parser.add_argument("--camera", choices=["picamera2", "v4l2"], default="v4l2")
+    parser.add_argument("--camera-size", type=int, nargs=2, default=[320, 240], metavar=("WIDTH", "HEIGHT"))
+    parser.add_argument("--imgsz", type=int, default=320)
+    parser.add_argument("--conf", type=float, default=0.25)
+    parser.add_argument("--iou", type=float, default=0.7)
+    parser.add_argument("--slots", type=int, default=SLOTS_PER_STREAM, help="Shared-memory frame slots per stream")
+    parser.add_argument("--output", default=None, help="Write the results as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        name, model_path, backend = resolve_model(args.model, args.backend)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    get_camera = get_camera_module(args.camera)
+    num_cores = os.cpu_count() or 1
+    configs = [args.sources] if args.sources else [[args.source] * n for n in args.streams]
+
+    runs = []
+    for sources in configs:
+        num_workers = args.workers or min(len(sources), num_cores)
+        num_threads = args.threads or max(1, num_cores // num_workers)
+        print(f"\n🎥 {len(sources)} stream(s), {num_workers} worker(s) × {num_threads} thread(s), {name} {backend}")
+        try:
+            run = run_streams(model_path, sources, get_camera, num_workers, num_threads, args.duration,
+                              {"imgsz": args.imgsz, "conf": args.conf, "iou": args.iou},
+                              tuple(args.camera_size), paced=not args.unpaced, num_slots=args.slots,
+                              warmup=args.warmup)
+        except Exception as e:
+            print(f"❌ {e}")
+            break
+        run["meets_target"] = run["min_stream_fps"] >= args.target_fps
+        print_run(run)
+        runs.append(run)
+
+    if len(runs) > 1 or args.sources is None:
+        print(f"\n| Streams | Workers | Total FPS | Slowest stream FPS | p95 ms | Dropped | ≥ {args.target_fps:g} FPS |")
+        print(f"|---------|---------|-----------|--------------------|--------|---------|----------|")
+        for run in runs:
+            print(f"| {run['streams']} | {run['workers']} | {run['aggregate_fps']:.2f} | {run['min_stream_fps']:.2f}"
+                  f" | {run['latency_ms_p95']:.1f} | {run['dropped']} | {'✅' if run['meets_target'] else '❌'} |")
+        sustained = [run["streams"] for run in runs if run["meets_target"]]
+        if sustained:
+            print(f"\n🏆 This host sustains {max(sustained)} stream(s) at {args.target_fps:g} FPS")
+        else:
+            print(f"\n⚠️  No stream count reached {args.target_fps:g} FPS per stream")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"created": datetime.now().isoformat(timespec="seconds"), "model": name, "backend": backend,
+                       "target_fps": args.target_fps, "cpu_cores": num_cores, "runs": runs}, f, indent=2)
+        print(f"📊 Results saved to {args.output}")
+    return 0 if runs else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Live-view overlay for every backend.
+
+OverlayRenderer copies the frame into one display buffer that is reused for
+the whole run and draws boxes and labels into it in place, with per-class
+colors and label sizes computed once. Tracks (see tracker.py) are labelled
+with their ID. Rendering is capped at a display rate
+(15 Hz by default) independent of the inference rate; frames in between are
+not drawn at all, so live view costs a small, bounded amount of time.
+"""
+
+import time
+import cv2
+import numpy as np
+from yolo_postprocess import COCO_CLASSES
+
+DISPLAY_FPS = 15.0
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+FONT_SCALE = 0.4
+BOX_THICKNESS = 2
+
+
+def class_colors(num_classes):
+    """Distinct BGR color per class: hues spread by the golden ratio, full saturation"""
+    hues = (np.arange(num_classes) * 0.618033988749895 % 1.0 * 180).astype(np.uint8)
+    hsv = np.stack([hues, np.full(num_classes, 200, np.uint8), np.full(num_classes, 255, np.uint8)], axis=1)
+    bgr = cv2.cvtColor(hsv[None], cv2.COLOR_HSV2BGR)[0]
+    return [tuple(int(c) for c in color) for color in bgr]
+
+
+class OverlayRenderer:
+    """
+    Draws detections into a reused display buffer at most max_fps times per
+    second (None = every frame).
+
+    render() returns the annotated buffer, or None if the frame falls between
+    two display refreshes. The buffer is overwritten by the next render().
+    """
+    def __init__(self, names=COCO_CLASSES, max_fps=DISPLAY_FPS):
+        self.names = names
+        self.min_interval_ns = int(1e9 / max_fps) if max_fps else 0
+        self.colors = class_colors(len(names))
+        # Label background size per class: "name 0.00" (the score digits have a fixed width)
+        self._label_sizes = {}
+        self._id_widths = {}  # "#<id> " prefix width by number of digits
+        self._buffer = None
+        self._last_ns = None
+        self.rendered = 0
+        self.skipped = 0
+
+    def due(self, now_ns=None):
+        """True if the display should be refreshed now"""
+        if self._last_ns is None:
+            return True
+        now_ns = time.perf_counter_ns() if now_ns is None else now_ns
+        return now_ns - self._last_ns >= self.min_interval_ns
+
+    def render(self, frame, detections):
+        """Annotated copy of the frame in the display buffer, or None if not due"""
+        now_ns = time.perf_counter_ns()
+        if not self.due(now_ns):
+            self.skipped += 1
+            return None
+        self._last_ns = now_ns
+        if self._buffer is None or self._buffer.shape != frame.shape:
+            self._buffer = np.empty_like(frame)
+        np.copyto(self._buffer, frame)
+        self.draw(self._buffer, detections)
+        self.rendered += 1
+        return self._buffer
+
+    def _label_size(self, class_id):
+        size = self._label_sizes.get(class_id)
+        if size is None:
+            (w, h), baseline = cv2.getTextSize(f"{self._name(class_id)} 0.00", FONT, FONT_SCALE, 1)
+            size = self._label_sizes[class_id] = (w, h + baseline, baseline)
+        return size
+
+    def _id_width(self, track_id):
+        digits = len(str(track_id))
+        width = self._id_widths.get(digits)
+        if width is None:
+            width = self._id_widths[digits] = cv2.getTextSize(f"#{'0' * digits} ", FONT, FONT_SCALE, 1)[0][0]
+        return width
+
+    def _name(self, class_id):
+        return self.names[class_id] if 0 <= class_id < len(self.names) else str(class_id)
+
+    def draw(self, image, detections):
+        """Draw boxes and labels into image in place"""
+        if not len(detections):
+            return image
+        height, width = image.shape[:2]
+        boxes = detections.boxes.astype(np.int32)
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, width - 1)
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, height - 1)
+        ids = getattr(detections, "ids", None)
+        ids = ids.tolist() if ids is not None else [None] * len(detections)
+        for (x1, y1, x2, y2), score, class_id, track_id in zip(boxes.tolist(), detections.scores.tolist(),
+                                                               detections.class_ids.tolist(), ids):
+            color = self.colors[class_id % len(self.colors)]
+            cv2.rectangle(image, (x1, y1), (x2, y2), color, BOX_THICKNESS)
+            label_w, label_h, baseline = self._label_size(class_id)
+            label = f"{self._name(class_id)} {score:.2f}"
+            if track_id is not None:
+                label_w += self._id_width(track_id)
+                label = f"#{track_id} {label}"
+            top = y1 - label_h if y1 >= label_h else y1  # inside the box at the top edge
+            cv2.rectangle(image, (x1, top), (x1 + label_w, top + label_h), color, cv2.FILLED)
+            cv2.putText(image, label, (x1, top + label_h - baseline), FONT, FONT_SCALE, (0, 0, 0), 1, cv2.LINE_AA)
+        return image
@@ -0,0 +1,331 @@
+"""
+Performance regression gate.
+
+Stores per-frame latencies of benchmark runs in a gate file, one JSON file per
+machine (CPU model, core count, governor) in the gate store, and checks later
+runs against it
+with a one-sided Mann-Whitney U test or a bootstrap of the median. A run
+regresses when it is significantly slower *and* its median is more than
+--min-effect percent above the recorded one; `check` then exits with status 1.
+
+Gate files are not compare_runs.py baselines (those hold run summaries, not
+per-frame samples); each tool rejects the other's files.
+
+Library, Python and kernel versions are recorded in the gate file and any
+change is printed, so a slowdown can be traced to an ultralytics upgrade, a
+re-exported model or an OS update. Use a replay source for stable numbers:
+
+    python3 scripts/run_benchmark.py --model yolo8n --backend pytorch tflite \\
+        --source video:clip.mp4 --unpaced --frames 500 --no-display --output-dir logs/nightly
+    python3 scripts/perf_gate.py record logs/nightly/results.json   # once, on a known-good setup
+    python3 scripts/perf_gate.py check logs/nightly/results.json    # every night
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import math
+import os
+import platform
+import re
+import sys
+from datetime import datetime
+from importlib import metadata
+import numpy as np
+from compare_runs import load_runs, run_key, run_label
+from frame_log import iter_log_chunks
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+
+DEFAULT_STORE = os.path.join(project_root, "perf_gates")
+GATE_FORMAT = "perf_gate-latency"  # "format" of gate files
+LATENCY_COLUMNS = ["detect_ms", "inference_ms", "latency_ms"]
+# Distributions whose version can change inference speed
+PACKAGES = ["numpy", "opencv-python", "opencv-python-headless", "ultralytics", "torch",
+            "tflite-runtime", "tensorflow", "onnxruntime", "picamera2"]
+MAX_SAMPLES = 5000  # per-frame values stored per run (evenly thinned)
+BOOTSTRAP_RESAMPLES = 2000
+BOOTSTRAP_BLOCK = 100  # resamples drawn at once
+GOVERNOR_PATH = "/sys/devices/system/cpu/cpu0/cpufreq/scaling_governor"
+
+
+def _cpu_model():
+    """Board model on a Raspberry Pi, else the CPU model name"""
+    info = {}
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                info.setdefault(key.strip(), value.strip())
+    except OSError:
+        pass
+    return info.get("Model") or info.get("model name") or platform.processor() or platform.machine()
+
+
+def _governor():
+    try:
+        with open(GOVERNOR_PATH) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def machine_fingerprint():
+    """Hardware identity plus the software versions that affect inference speed"""
+    versions = {}
+    for package in PACKAGES:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            pass
+    return {
+        "cpu_model": _cpu_model(),
+        "cpu_cores": os.cpu_count(),
+        "governor": _governor(),
+        "machine": platform.machine(),
+        "kernel": platform.release(),
+        "python": platform.python_version(),
+        "packages": versions,
+    }
+
+
+def fingerprint_id(fingerprint):
+    """
+    Gate file name of a machine: readable CPU model, cores and governor
+    plus a short hash of them. Software versions are left out on purpose, so
+    an upgrade is compared against the old gate file instead of starting a new one.
+    """
+    hardware = [fingerprint["cpu_model"], fingerprint["cpu_cores"], fingerprint["governor"]]
+    digest = hashlib.sha1(json.dumps(hardware).encode()).hexdigest()[:8]
+    name = re.sub(r"[^a-z0-9]+", "-", f"{fingerprint['cpu_model']} {fingerprint['cpu_cores']}c "
+                                      f"{fingerprint['governor'] or 'nogov'}".lower()).strip("-")
+    return f"{name}-{digest}"
+
+
+def fingerprint_changes(old, new):
+    """Printable differences between two fingerprints"""
+    changes = []
+    for key in ("machine", "kernel", "python"):
+        if old.get(key) != new.get(key):
+            changes.append(f"{key}: {old.get(key)} → {new.get(key)}")
+    old_packages, new_packages = old.get("packages", {}), new.get("packages", {})
+    for package in sorted(set(old_packages) | set(new_packages)):
+        if old_packages.get(package) != new_packages.get(package):
+            changes.append(f"{package}: {old_packages.get(package, '-')} → {new_packages.get(package, '-')}")
+    return changes
+
+
+def frame_samples(log_path, column, max_samples=MAX_SAMPLES):
+    """Per-frame values of a column over the measured frames, evenly thinned to max_samples"""
+    values = []
+    for chunk in iter_log_chunks(log_path):
+        if column not in chunk:
+            raise KeyError(f"{log_path} has no {column} column")
+        data = chunk[column]
+        if "warmup" in chunk:
+            data = data[chunk["warmup"] == 0]
+        values.append(data[~np.isnan(data)])
+    values = np.concatenate(values) if values else np.empty(0)
+    if len(values) > max_samples:
+        values = values[np.linspace(0, len(values) - 1, max_samples).astype(int)]
+    return values
+
+
+def mann_whitney_greater(current, baseline):
+    """
+    One-sided Mann-Whitney U test that `current` tends to be larger than
+    `baseline` (normal approximation with tie correction). Returns (U, p).
+    """
+    n1, n2 = len(current), len(baseline)
+    values = np.concatenate([current, baseline])
+    order = np.argsort(values, kind="mergesort")
+    sorted_values = values[order]
+    # Average ranks of ties
+    _, first, counts = np.unique(sorted_values, return_index=True, return_counts=True)
+    avg_ranks = first + (counts + 1) / 2
+    ranks = np.empty(len(values))
+    ranks[order] = np.repeat(avg_ranks, counts)
+
+    u = ranks[:n1].sum() - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    tie_term = (counts ** 3 - counts).sum() / (n * (n - 1))
+    sigma = math.sqrt(n1 * n2 / 12 * ((n + 1) - tie_term))
+    if sigma == 0:
+        return u, 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / sigma  # continuity correction
+    return u, 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def bootstrap_median_change(current, baseline, resamples=BOOTSTRAP_RESAMPLES, alpha=0.01, seed=0):
+    """
+    Bootstrap distribution of the relative change in median latency (%).
+    Returns (lower bound at `alpha`, upper bound at 1 - alpha); the seed
+    is fixed so the same logs always give the same answer.
+    """
+    rng = np.random.default_rng(seed)
+    changes = []
+    # Resampled in blocks to keep memory small on a Pi
+    for start in range(0, resamples, BOOTSTRAP_BLOCK):
+        block = min(BOOTSTRAP_BLOCK, resamples - start)
+        cur = np.median(rng.choice(current, (block, len(current))), axis=1)
+        base = np.median(rng.choice(baseline, (block, len(baseline))), axis=1)
+        changes.append((cur / base - 1) * 100)
+    changes = np.concatenate(changes)
+    return float(np.quantile(changes, alpha)), float(np.quantile(changes, 1 - alpha))
+
+
+def check_run(current, baseline, test="mannwhitney", alpha=0.01, min_effect=3.0):
+    """
+    Compare two latency samples. Returns a dict with the median change (%),
+    the test statistic (p-value or bootstrap interval) and whether the run
+    regressed: significantly slower and more than min_effect percent slower.
+    """
+    change = (np.median(current) / np.median(baseline) - 1) * 100
+    result = {"baseline_median": float(np.median(baseline)), "median": float(np.median(current)),
+              "change_pct": float(change)}
+    if test == "bootstrap":
+        low, high = bootstrap_median_change(current, baseline, alpha=alpha)
+        result.update(ci_low_pct=low, ci_high_pct=high)
+        significant = low > 0
+    else:
+        _, p = mann_whitney_greater(current, baseline)
+        result["p_value"] = p
+        significant = p < alpha
+    result["regressed"] = bool(significant and change > min_effect)
+    return result
+
+
+def gate_path(store, fingerprint):
+    return os.path.join(store, f"{fingerprint_id(fingerprint)}.json")
+
+
+def load_gate(path):
+    """Gate file contents; ValueError for any other JSON (e.g. a compare_runs.py baseline)"""
+    with open(path) as f:
+        gate = json.load(f)
+    # Files recorded before the format field was added have the fingerprint and a run dict
+    if (gate.get("format", GATE_FORMAT) != GATE_FORMAT or "fingerprint" not in gate
+            or not isinstance(gate.get("runs"), dict)):
+        raise ValueError(f"{path} is not a perf_gate.py gate file; compare_runs.py baselines are checked with"
+                         f" compare_runs.py --baseline or run_benchmark.py --baseline")
+    return gate
+
+
+def record(runs, path, fingerprint, column):
+    """Write (or extend) the gate file with the per-frame samples of runs"""
+    gate = {"format": GATE_FORMAT, "fingerprint": fingerprint, "column": column, "runs": {}}
+    if os.path.exists(path):
+        old = load_gate(path)
+        if old.get("column") == column:
+            gate["runs"] = old["runs"]
+    for run in runs:
+        samples = frame_samples(run["log_path"], column)
+        gate["runs"][run_key(run)] = {
+            "label": run_label(run),
+            "recorded": datetime.now().isoformat(timespec="seconds"),
+            "frames": len(samples),
+            "samples": np.round(samples, 3).tolist(),
+        }
+        print(f"💾 {run_label(run)}: {len(samples)} {column} samples, median {np.median(samples):.2f} ms")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(gate, f)
+    print(f"✅ Gate file saved: {path}")
+
+
+def check(runs, path, fingerprint, test="mannwhitney", alpha=0.01, min_effect=3.0):
+    """Check runs against the gate file; returns the number of regressed runs"""
+    gate = load_gate(path)
+    column = gate["column"]
+    changes = fingerprint_changes(gate["fingerprint"], fingerprint)
+    if changes:
+        print("🔧 Changed since the gate file was recorded:")
+        for line in changes:
+            print(f"   {line}")
+
+    regressed = 0
+    print(f"\n| Run | Frames | Recorded median ms | Median ms | Change | {'p-value' if test == 'mannwhitney' else f'{1 - 2 * alpha:.0%} CI'} | Result |")
+    print("|-----|--------|--------------------|-----------|--------|---------|--------|")
+    for run in runs:
+        entry = gate["runs"].get(run_key(run))
+        if entry is None:
+            print(f"| {run_label(run)} | - | - | - | - | - | not recorded |")
+            continue
+        samples = frame_samples(run["log_path"], column)
+        if not len(samples):
+            print(f"| {run_label(run)} | 0 | - | - | - | - | no frames |")
+            continue
+        result = check_run(samples, np.asarray(entry["samples"]), test, alpha, min_effect)
+        regressed += result["regressed"]
+        stat = (f"{result['p_value']:.2g}" if test == "mannwhitney"
+                else f"{result['ci_low_pct']:+.1f}..{result['ci_high_pct']:+.1f}%")
+        print(f"| {run_label(run)} | {len(samples)} | {result['baseline_median']:.2f} | {result['median']:.2f}"
+              f" | {result['change_pct']:+.1f}% | {stat} | {'❌ slower' if result['regressed'] else '✅ ok'} |")
+    return regressed
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Record per-frame latencies in a gate file and fail on regressions")
+    parser.add_argument("command", choices=["record", "check", "fingerprint"])
+    parser.add_argument("runs", nargs="*", help="results.json files or frame logs")
+    parser.add_argument("--gate-store", default=DEFAULT_STORE, help="Directory of per-machine gate files")
+    parser.add_argument("--gate-file", default=None, help="Gate file (default: <gate-store>/<machine>.json)")
+    parser.add_argument("--column", choices=LATENCY_COLUMNS, default="detect_ms",
+                        help="Per-frame latency to record (detect_ms = preprocess + inference + postprocess)")
+    parser.add_argument("--test", choices=["mannwhitney", "bootstrap"], default="mannwhitney")
+    parser.add_argument("--alpha", type=float, default=0.01, help="Significance level")
+    parser.add_argument("--min-effect", type=float, default=3.0,
+                        help="Smallest median slowdown in percent that counts as a regression")
+    args = parser.parse_args(argv)
+    if args.command != "fingerprint" and not args.runs:
+        parser.error(f"{args.command} needs at least one results.json or frame log")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    fingerprint = machine_fingerprint()
+    if args.command == "fingerprint":
+        print(json.dumps(dict(fingerprint, id=fingerprint_id(fingerprint)), indent=2))
+        return 0
+
+    path = args.gate_file or gate_path(args.gate_store, fingerprint)
+    runs = []
+    for run in load_runs(args.runs):
+        if run.get("log_path") and os.path.exists(run["log_path"]):
+            runs.append(run)
+        else:
+            print(f"⚠️  Skipping {run_label(run)}: per-frame latencies need its frame log")
+    try:
+        if args.command == "record":
+            record(runs, path, fingerprint, args.column)
+            return 0
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 2
+
+    if not os.path.exists(path):
+        others = glob.glob(os.path.join(args.gate_store, "*.json"))
+        print(f"❌ No gate file for this machine ({path})")
+        if others:
+            print(f"💡 Gate files of other machines: {', '.join(os.path.basename(p) for p in others)}")
+        print(f"💡 Record one with: python3 scripts/perf_gate.py record {' '.join(args.runs)}")
+        return 2
+    print(f"🧪 Checking {len(runs)} run(s) against {path} ({args.test}, alpha={args.alpha:g}, "
+          f"min effect {args.min_effect:g}%)")
+    try:
+        regressed = check(runs, path, fingerprint, args.test, args.alpha, args.min_effect)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 2
+    if regressed:
+        print(f"\n❌ {regressed} run(s) significantly slower than the gate file")
+        return 1
+    print(f"\n✅ No significant slowdown")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+"""
+Staged capture → inference → render pipeline.
+
+Each stage runs in its own thread and hands work to the next one through a
+bounded queue that drops the oldest item when full, so a slow stage never
+stalls the stages before it and never works on a backlog of stale frames.
+With lossless=True (unpaced replay) the queues block instead, so every frame
+is processed exactly once at the pace of the slowest stage.
+
+Items flowing through the pipeline are dicts ("packets"). The pipeline stores
+the time each stage spent on a packet in packet["timings_ns"][stage_name]
+(time.perf_counter_ns() nanoseconds). Packets that never reach the sink
+(dropped by a queue or by a stage) are passed to on_drop, e.g. to hand a
+pooled camera buffer back.
+"""
+
+import threading
+import time
+from collections import deque
+
+
+class DropOldestQueue:
+    """Bounded FIFO queue that discards its oldest item instead of blocking"""
+    def __init__(self, maxsize=2, on_drop=None):
+        self.maxsize = maxsize
+        self.on_drop = on_drop  # called with every discarded item
+        self.dropped = 0
+        self.closed = False
+        self._items = deque()
+        self._cond = threading.Condition()
+
+    def put(self, item):
+        """Add an item, dropping the oldest one if the queue is full"""
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                dropped = self._items.popleft()
+                self.dropped += 1
+                if self.on_drop is not None:
+                    self.on_drop(dropped)
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Return the next item, or None on timeout or once closed and drained"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._items or self.closed, timeout)
+            if self._items:
+                return self._items.popleft()
+            return None
+
+    def close(self):
+        """Mark end of stream and wake up any waiting consumer"""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def drained(self):
+        """True once the queue is closed and every item has been consumed"""
+        with self._cond:
+            return self.closed and not self._items
+
+    def __len__(self):
+        return len(self._items)
+
+
+class BlockingQueue(DropOldestQueue):
+    """Bounded FIFO queue whose put() waits for room instead of dropping; `dropped` stays 0"""
+    def put(self, item):
+        with self._cond:
+            self._cond.wait_for(lambda: len(self._items) < self.maxsize or self.closed)
+            if self.closed:
+                # Shutting down: the item is discarded, not dropped for lack of room
+                if self.on_drop is not None:
+                    self.on_drop(item)
+                return
+            self._items.append(item)
+            self._cond.notify_all()
+
+    def get(self, timeout=None):
+        with self._cond:
+            self._cond.wait_for(lambda: self._items or self.closed, timeout)
+            if self._items:
+                item = self._items.popleft()
+                self._cond.notify_all()  # wake a waiting put()
+                return item
+            return None
+
+
+class StageStats:
+    """Running timing statistics for one pipeline stage"""
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.last_ns = 0
+
+    def record(self, ns):
+        self.count += 1
+        self.total_ns += ns
+        self.last_ns = ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    @property
+    def avg_ms(self):
+        return self.total_ns / self.count / 1e6 if self.count else 0.0
+
+    @property
+    def max_ms(self):
+        return self.max_ns / 1e6
+
+
+class Pipeline:
+    """
+    Chain of worker threads joined by drop-oldest queues (blocking queues
+with lossless=True).
+
+    The source stage produces packets, every following stage transforms them
+    and the last queue is drained by the caller with get(). The final stage
+    (render/log) runs on the caller's thread because cv2.imshow() and
+    cv2.waitKey() must be called from the main thread.
+    """
+    def __init__(self, queue_size=2, sink="render", on_drop=None, lossless=False):
+        self.queue_size = queue_size
+        self.sink = sink
+        self.on_drop = on_drop
+        self._queue_type = BlockingQueue if lossless else DropOldestQueue
+        self.stats = {}
+        self.error = None
+        self._stop = threading.Event()
+        self._threads = []
+        self._queues = []  # (name of the consuming stage, queue)
+        self._tail = None
+
+    def add_source(self, name, func):
+        """Add the first stage: func() returns a packet, or None at end of stream"""
+        out_q = self._queue_type(self.queue_size, self.on_drop)
+        self.stats[name] = StageStats(name)
+        self._threads.append(threading.Thread(
+            target=self._run_source, args=(name, func, out_q), name=name, daemon=True))
+        self._tail = out_q
+
+    def add_stage(self, name, func):
+        """Add a stage: func(packet) returns the packet to pass on, or None to drop it"""
+        if self._tail is None:
+            raise RuntimeError("add_source() must be called before add_stage()")
+        in_q = self._tail
+        out_q = self._queue_type(self.queue_size, self.on_drop)
+        self.stats[name] = StageStats(name)
+        self._queues.append((name, in_q))
+        self._threads.append(threading.Thread(
+            target=self._run_stage, args=(name, func, in_q, out_q), name=name, daemon=True))
+        self._tail = out_q
+
+    def start(self):
+        self._queues.append((self.sink, self._tail))
+        self.stats.setdefault(self.sink, StageStats(self.sink))
+        for thread in self._threads:
+            thread.start()
+
+    def get(self, timeout=0.5):
+        """Return the next finished packet for the sink, or None if none is ready"""
+        return self._tail.get(timeout)
+
+    def record(self, name, ns, packet=None):
+        """Record time (nanoseconds) spent by a stage that runs on the caller's thread"""
+        self.stats.setdefault(name, StageStats(name)).record(ns)
+        if packet is not None:
+            packet.setdefault("timings_ns", {})[name] = ns
+
+    @property
+    def finished(self):
+        """True once the source has ended (or a stage failed) and all packets are consumed"""
+        return self.error is not None or self._tail.drained()
+
+    def stop(self):
+        """Stop every stage thread and wait for them to exit"""
+        self._stop.set()
+        for _, q in self._queues:
+            q.close()
+        for thread in self._threads:
+            if thread.ident is not None:  # started
+                thread.join(timeout=2.0)
+
+    def queue_depths(self):
+        """Current number of packets waiting in front of each stage"""
+        return {name: len(q) for name, q in self._queues}
+
+    def dropped(self):
+        """Number of packets dropped in front of each stage"""
+        return {name: q.dropped for name, q in self._queues}
+
+    def summary(self):
+        """Per-stage timing, queue depth and drop counts as printable lines"""
+        depths = self.queue_depths()
+        dropped = self.dropped()
+        lines = []
+        for name, stats in self.stats.items():
+            line = f"{name:>10}: {stats.count} frames | avg {stats.avg_ms:.1f} ms | max {stats.max_ms:.1f} ms"
+            if name in depths:
+                line += f" | queue {depths[name]} | dropped {dropped[name]}"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def _run_source(self, name, func, out_q):
+        stats = self.stats[name]
+        try:
+            while not self._stop.is_set():
+                t0 = time.perf_counter_ns()
+                packet = func()
+                if packet is None:
+                    break
+                elapsed = time.perf_counter_ns() - t0
+                stats.record(elapsed)
+                packet.setdefault("timings_ns", {})[name] = elapsed
+                out_q.put(packet)
+        except Exception as e:
+            self.error = e
+        finally:
+            out_q.close()
+
+    def _run_stage(self, name, func, in_q, out_q):
+        stats = self.stats[name]
+        try:
+            while not self._stop.is_set():
+                packet = in_q.get(timeout=0.1)
+                if packet is None:
+                    if in_q.drained():
+                        break
+                    continue
+                t0 = time.perf_counter_ns()
+                result = func(packet)
+                elapsed = time.perf_counter_ns() - t0
+                stats.record(elapsed)
+                if result is not None:
+                    result.setdefault("timings_ns", {})[name] = elapsed
+                    out_q.put(result)
+                elif self.on_drop is not None:
+                    self.on_drop(packet)
+        except Exception as e:
+            self.error = e
+        finally:
+            out_q.close()
@@ -0,0 +1,109 @@
+"""
+Preallocated preprocessing for exported YOLO models.
+
+Writes each camera frame straight into the model's input buffer: a letterbox
+resize into a reused padded image, a BGR → RGB swap, and a single
+lookup-table pass (cv2.LUT) that normalizes to 0..1, applies the input
+quantization (scale / zero-point) and converts to the input dtype at once.
+Nothing is allocated per frame.
+"""
+
+import cv2
+import numpy as np
+from letterbox import Letterbox
+
+# dtypes cv2.LUT can write directly
+LUT_DTYPES = (np.uint8, np.int8, np.uint16, np.int16, np.int32, np.float32, np.float64)
+
+
+def build_input_lut(dtype, quantization=None):
+    """
+    256-entry table mapping a uint8 pixel to its model input value.
+
+    Float inputs get pixel / 255. Quantized inputs get
+    round(pixel / 255 / scale) + zero_point, clipped to the dtype range.
+    Integer inputs without quantization parameters get the raw pixel.
+    """
+    dtype = np.dtype(dtype)
+    if quantization is not None:
+        scale, zero_point = quantization
+        values = np.round(np.arange(256) / 255.0 / scale) + zero_point
+    elif dtype.kind in "iu":
+        values = np.arange(256, dtype=np.float64)
+    else:
+        values = np.arange(256) / 255.0
+    if dtype.kind in "iu":
+        info = np.iinfo(dtype)
+        values = np.clip(values, info.min, info.max)
+    return values.astype(dtype)
+
+
+class InputPreprocessor:
+    """
+    Resize + colour swap + normalize/quantize into a preallocated input tensor.
+
+    shape is the model input shape, (1, H, W, 3) for NHWC models (TFLite) or
+    (1, 3, H, W) for NCHW models (ONNX). run(frame, out) writes into `out`,
+    which can be the interpreter's own input buffer (interpreter.tensor(index)());
+    with a batch dimension > 1, run(frame, out, i) fills batch slot i.
+
+    Frames are letterboxed (aspect ratio kept); after run(), `geometry` holds
+    the frame's placement and geometry.to_source() maps boxes back to it.
+    """
+    def __init__(self, shape, dtype, quantization=None, bgr_to_rgb=True):
+        self.shape = tuple(int(d) for d in shape)
+        self.nchw = self.shape[1] == 3 and self.shape[-1] != 3
+        if self.nchw:
+            self.height, self.width = self.shape[2], self.shape[3]
+        else:
+            self.height, self.width = self.shape[1], self.shape[2]
+        self.dtype = np.dtype(dtype)
+        self.bgr_to_rgb = bgr_to_rgb
+        self.lut = build_input_lut(self.dtype, quantization)
+        self.identity = self.dtype == np.uint8 and np.array_equal(self.lut, np.arange(256))
+
+        self.letterbox = Letterbox(self.width, self.height)
+        self.geometry = None
+        self._resized = self.letterbox.buffer
+        self._rgb = np.empty_like(self._resized) if bgr_to_rgb else self._resized
+        # LUT output needs a scratch image when it can't go straight into the input buffer
+        lut_dtype = self.dtype if self.dtype.type in LUT_DTYPES else np.dtype(np.float32)
+        if lut_dtype != self.dtype:
+            self.lut = self.lut.astype(lut_dtype)
+        self._lut_out = None
+        if self.nchw or lut_dtype != self.dtype:
+            self._lut_out = np.empty((self.height, self.width, 3), dtype=lut_dtype)
+
+    @property
+    def input_size(self):
+        return self.width, self.height
+
+    def resize(self, frame):
+        """Letterbox a frame into the reused padded image and return it"""
+        _, self.geometry = self.letterbox.apply(frame)
+        return self._resized
+
+    def run(self, frame, out, index=0):
+        """Preprocess a BGR uint8 frame into slot `index` of `out` (model input shape and dtype)"""
+        self.resize(frame)
+        target = out[index]
+        if self.identity and not self.nchw:
+            if self.bgr_to_rgb:
+                cv2.cvtColor(self._resized, cv2.COLOR_BGR2RGB, dst=target)
+            else:
+                np.copyto(target, self._resized)
+            return out
+
+        if self.bgr_to_rgb:
+            cv2.cvtColor(self._resized, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        if self._lut_out is None:
+            cv2.LUT(self._rgb, self.lut, dst=target)
+        else:
+            cv2.LUT(self._rgb, self.lut, dst=self._lut_out)
+            np.copyto(target, self._lut_out.transpose(2, 0, 1) if self.nchw else self._lut_out,
+                      casting="unsafe")
+        return out
+
+    def new_input(self):
+        """Allocate an input tensor for backends that don't expose their own buffer"""
+        return np.empty(self.shape, dtype=self.dtype)
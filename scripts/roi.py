@@ -0,0 +1,119 @@
+"""
+Region-of-interest detection: run the model on configured zones only.
+
+Each ROI is cut out of the frame as a NumPy view (no copy) and letterboxed
+into the model input on its own, so a zone gets the full input resolution
+instead of its share of a downscaled frame, and nothing is spent on the rest
+of the view. Several ROIs go through the model as one batch (detect_batch);
+their boxes are shifted back to frame coordinates and merged with one
+class-aware NMS across ROIs, so an object on the border of two overlapping
+zones is reported once.
+
+ROIs are "x,y,w,h" in frame pixels, or as fractions of the frame size when
+every value is at most 1 ("0.5,0,0.5,1" is the right half).
+"""
+
+import time
+import numpy as np
+from yolo_postprocess import Detections, non_max_suppression
+
+
+def parse_roi(spec):
+    """(x, y, w, h) from an "x,y,w,h" string"""
+    try:
+        x, y, w, h = (float(v) for v in spec.split(","))
+    except ValueError:
+        raise ValueError(f"Invalid ROI '{spec}' (expected x,y,w,h)") from None
+    if w <= 0 or h <= 0 or x < 0 or y < 0:
+        raise ValueError(f"Invalid ROI '{spec}': position must be >= 0 and size > 0")
+    return x, y, w, h
+
+
+def roi_slices(rois, width, height):
+    """(x0, y0, x1, y1) pixel bounds of every ROI, clipped to the frame; fractional ROIs are scaled"""
+    bounds = []
+    for roi in rois:
+        x, y, w, h = roi
+        if max(roi) <= 1:
+            x, y, w, h = x * width, y * height, w * width, h * height
+        x0, y0 = min(int(round(x)), width - 1), min(int(round(y)), height - 1)
+        bounds.append((x0, y0, min(int(round(x + w)), width), min(int(round(y + h)), height)))
+    return bounds
+
+
+class RoiDetector:
+    """
+    Wraps a detector so detect(frame) only looks at the ROIs. Everything
+    else (names, backend, imgsz, set_imgsz, ...) is the wrapped detector's.
+
+    If the model can't take a batch of len(rois) (ONNX models exported with
+    a fixed batch size) the ROIs are inferred one after the other.
+    """
+    def __init__(self, detector, rois, iou=None):
+        self.detector = detector
+        self.rois = [parse_roi(roi) if isinstance(roi, str) else tuple(roi) for roi in rois]
+        self.merge_iou = detector.iou if iou is None else iou
+        self.timings_ns = {}
+        self.batched = True
+        try:
+            detector.set_batch_size(len(self.rois))
+        except ValueError as e:
+            print(f"⚠️  {e}; inferring the {len(self.rois)} ROIs one by one")
+            self.batched = False
+        self._bounds = None
+        self._frame_size = None
+
+    def __getattr__(self, name):
+        return getattr(self.detector, name)
+
+    def bounds(self, width, height):
+        """Pixel bounds of the ROIs for a frame size (cached)"""
+        if self._frame_size != (width, height):
+            self._bounds = roi_slices(self.rois, width, height)
+            self._frame_size = (width, height)
+        return self._bounds
+
+    def detect(self, frame):
+        bounds = self.bounds(frame.shape[1], frame.shape[0])
+        crops = [frame[y0:y1, x0:x1] for x0, y0, x1, y1 in bounds]
+        if self.batched:
+            results = self.detector.detect_batch(crops)
+            timings_ns = dict(self.detector.timings_ns)
+        else:
+            results, timings_ns = [], {}
+            for crop in crops:
+                results.append(self.detector.detect(crop))
+                for phase, ns in self.detector.timings_ns.items():
+                    timings_ns[phase] = timings_ns.get(phase, 0) + ns
+
+        t0 = time.perf_counter_ns()
+        detections = self._merge(results, bounds)
+        merge_ns = time.perf_counter_ns() - t0
+        timings_ns["postprocess"] = timings_ns.get("postprocess", 0) + merge_ns
+        if "nms" in timings_ns:
+            timings_ns["nms"] += merge_ns
+        self.timings_ns = timings_ns
+        return detections
+
+    def _merge(self, results, bounds):
+        """Shift every ROI's boxes to frame coordinates and suppress duplicates across ROIs"""
+        results = [(r, b) for r, b in zip(results, bounds) if len(r)]
+        if not results:
+            return Detections.empty()
+        boxes = np.concatenate([r.boxes + np.array([x0, y0, x0, y0], np.float32) for r, (x0, y0, _, _) in results])
+        scores = np.concatenate([r.scores for r, _ in results])
+        class_ids = np.concatenate([r.class_ids for r, _ in results])
+        if len(results) == 1:
+            return Detections(boxes, scores, class_ids)
+        keep = non_max_suppression(boxes, scores, class_ids, self.merge_iou)
+        return Detections(boxes[keep], scores[keep], class_ids[keep])
+
+    def describe_rois(self):
+        return "; ".join(",".join(f"{v:g}" for v in roi) for roi in self.rois)
+
+    def describe(self):
+        mode = "batched" if self.batched else "sequential"
+        return f"{self.detector.describe()} on {len(self.rois)} ROI(s) ({mode})"
+
+    def close(self):
+        self.detector.close()
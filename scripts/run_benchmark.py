@@ -1,101 +1,236 @@
-from ultralytics import YOLO
-import time, csv, cv2, os, sys
-from system_monitor import get_system_stats
-from camera_stream import get_camera_stream
+"""
+Benchmark CLI: runs every combination of models, backends, input sizes and
+thread counts in one process and writes a machine-readable results file.
+
+Examples:
+    python3 scripts/run_benchmark.py                                   # both .pt models, 30 s each
+    python3 scripts/run_benchmark.py --model yolo8n --backend pytorch tflite onnx --source synthetic
+    python3 scripts/run_benchmark.py --model models/custom.onnx --imgsz 256 320 --threads 2 4 --frames 300
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+from datetime import datetime
+import benchmark_runner
+from benchmark_runner import run_test
+from roi import parse_roi
+from compare_runs import generate_comparison_report, load_baseline, load_runs
 
-# Change to project root directory
 script_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(script_dir)
-os.chdir(project_root)
-
-TEST_DURATION = 30  # seconds
-IMG_SIZE = 320
-SHOW_DISPLAY = True  # Set to False if running headless (no display)
 
+# Model files per backend, relative to the project root
 MODELS = {
-    "yolo8n": os.path.join(project_root, "models/yolov8n.pt"),
-    "yolo11n": os.path.join(project_root, "models/yolo11n.pt")
+    "yolo8n": {
+        "pytorch": "models/yolov8n.pt",
+        "tflite": "tensorlite/models/yolov8n_int8.tflite",
+        "onnx": "models/yolov8n.onnx",
+    },
+    "yolo11n": {
+        "pytorch": "models/yolo11n.pt",
+        "tflite": "tensorlite/models/yolo11n_int8.tflite",
+        "onnx": "models/yolo11n.onnx",
+    },
 }
+EXTENSION_BACKENDS = {".pt": "pytorch", ".tflite": "tflite", ".onnx": "onnx"}
+
+
+def get_camera_module(camera):
+    """picamera2 (libcamera) or the V4L2 MJPG capture used by the TFLite runners"""
+    if camera == "v4l2":
+        sys.path.append(os.path.join(project_root, "tensorlite", "scripts"))
+        import camera_stream_tflite
+        return camera_stream_tflite.get_camera_stream
+    import camera_stream
+    return camera_stream.get_camera_stream
+
+
+def resolve_model(model, backend):
+    """
+    Return (name, path, backend) for a model name from MODELS or a model
+    file path; a file's backend always follows its extension.
+    """
+    if model in MODELS:
+        return model, os.path.join(project_root, MODELS[model][backend]), backend
+    name, ext = os.path.splitext(os.path.basename(model))
+    if ext.lower() not in EXTENSION_BACKENDS:
+        raise ValueError(f"Unknown model '{model}' (expected one of {', '.join(MODELS)} or a .pt/.tflite/.onnx file)")
+    return name, os.path.abspath(model), EXTENSION_BACKENDS[ext.lower()]
+
+
+def build_matrix(args):
+    """Every configuration to run, in order, without duplicates"""
+    runs = []
+    for model, backend, imgsz, threads in itertools.product(args.model, args.backend, args.imgsz, args.threads):
+        name, path, backend = resolve_model(model, backend)
+        config = {"model": name, "model_path": path, "backend": backend, "imgsz": imgsz, "num_threads": threads}
+        if config not in runs:
+            runs.append(config)
+    return runs
+
+
+def log_path_for(args, config):
+    """logs/<model>[_<backend>][_<imgsz>px][_<threads>t].csv; swept settings are part of the name"""
+    name = config["model"]
+    if config["backend"] != "pytorch":
+        name += f"_{config['backend']}"
+    if len(args.imgsz) > 1:
+        name += f"_{config['imgsz']}px"
+    if len(args.threads) > 1:
+        name += f"_{config['num_threads'] or 'default'}t"
+    return os.path.join(args.output_dir, f"{name}.csv")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark YOLO models on Raspberry Pi")
+    parser.add_argument("--model", nargs="+", default=["yolo8n", "yolo11n"],
+                        help=f"Model names ({', '.join(MODELS)}) or .pt/.tflite/.onnx files")
+    parser.add_argument("--backend", nargs="+", choices=["pytorch", "tflite", "onnx"], default=["pytorch"],
+                        help="Formats to run for model names (files use their extension)")
+    parser.add_argument("--imgsz", type=int, nargs="+", default=[320],
+                        help="Input sizes (.pt and dynamic .onnx models; fixed exports use their own)")
+    parser.add_argument("--threads", type=int, nargs="+", default=[None],
+                        help="Inference CPU threads (default: backend default)")
+    parser.add_argument("--duration", type=float, default=None, help="Seconds per configuration (default 30)")
+    parser.add_argument("--frames", type=int, default=None, help="Measured frames per configuration (after warmup)")
+    parser.add_argument("--warmup", type=int, default=10, help="Warmup frames excluded from stats")
+    parser.add_argument("--warmup-seconds", type=float, default=0.0, help="Minimum warmup time")
+    parser.add_argument("--warmup-steady", action="store_true",
+                        help="Extend warmup until frame latency is steady (max 300 frames)")
+    parser.add_argument("--source", default="camera",
+                        help='"camera", "synthetic", "video:clip.mp4", "images:dir" or "npy:frames.npy"')
+    parser.add_argument("--unpaced", action="store_true",
+                        help="Replay sources as fast as the pipeline consumes them (every frame inferred once)")
+    parser.add_argument("--camera", choices=["picamera2", "v4l2"], default="picamera2")
+    parser.add_argument("--camera-size", type=int, nargs=2, default=[320, 240], metavar=("WIDTH", "HEIGHT"))
+    parser.add_argument("--no-threaded-camera", dest="threaded", action="store_false",
+                        help="Read the camera on the detection loop instead of a background grabber")
+    parser.add_argument("--queue-size", type=int, default=2, help="Max frames waiting between pipeline stages")
+    parser.add_argument("--conf", type=float, default=0.25)
+    parser.add_argument("--iou", type=float, default=0.7)
+    parser.add_argument("--xnnpack", choices=["on", "off"], default="on", help="TFLite only")
+    parser.add_argument("--delegate", action="append", default=[],
+                        help='TFLite external delegate, "lib.so" or "lib.so:key=value,..." (repeatable)')
+    parser.add_argument("--output-dir", default=os.path.join(project_root, "logs"))
+    parser.add_argument("--log-format", choices=["auto", "npy", "parquet"], default="auto",
+                        help="Binary frame log format (auto = Parquet if pyarrow is installed)")
+    parser.add_argument("--no-csv", dest="csv", action="store_false",
+                        help="Don't export the frame log to CSV after each run (long soak tests)")
+    parser.add_argument("--results", default=None, help="Results JSON (default: <output-dir>/results.json)")
+    parser.add_argument("--baseline", default=None,
+                        help="Baseline JSON from compare_runs.py --save-baseline to check the runs against"
+                             " (perf_gate.py gate files are rejected)")
+    parser.add_argument("--no-display", dest="display", action="store_false",
+                        help="Run headless: nothing is drawn")
+    parser.add_argument("--display-fps", type=float, default=benchmark_runner.DISPLAY_FPS,
+                        help="Max live view refresh rate (0 = every frame)")
+    parser.add_argument("--console-interval", type=float, default=benchmark_runner.CONSOLE_INTERVAL,
+                        help="Seconds between console summary lines (0 = a line per frame with object labels)")
+    parser.add_argument("--schedule", default="every",
+                        help='Frames to infer: "every", "stride:N", "fps:F" or "thermal:F" (others reuse the last detections)')
+    parser.add_argument("--motion-gate", type=float, default=None, metavar="FRACTION",
+                        help="Skip inference until this fraction of the frame changed (e.g. 0.02; default off)")
+    parser.add_argument("--max-stale", type=float, default=benchmark_runner.MAX_STALE,
+                        help="Seconds after which the motion gate infers a frame anyway (0 = never)")
+    parser.add_argument("--roi", type=parse_roi, action="append", default=None, metavar="X,Y,W,H",
+                        help="Detect only in this zone, pixels or fractions of the frame (repeatable; zones run as a batch)")
+    parser.add_argument("--track", action="store_true",
+                        help="Track detections across frames (stable IDs, boxes on frames that aren't inferred)")
+    args = parser.parse_args(argv)
+    if args.duration is None and args.frames is None:
+        args.duration = 30
+    if args.results is None:
+        args.results = os.path.join(args.output_dir, "results.json")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        matrix = build_matrix(args)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    try:
+        # Checked before the sweep, not after it
+        baseline = load_baseline(args.baseline) if args.baseline else None
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    get_camera = get_camera_module(args.camera)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    results = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "settings": {key: value for key, value in vars(args).items() if key not in ("model", "backend")},
+        "runs": [],
+    }
+    print(f"🧪 {len(matrix)} configuration(s), results → {args.results}")
+    for i, config in enumerate(matrix, 1):
+        print(f"\n[{i}/{len(matrix)}] {config['model']} {config['backend']} imgsz={config['imgsz']}"
+              f" threads={config['num_threads'] or 'default'}")
+        detector_options = {"conf": args.conf, "iou": args.iou, "num_threads": config["num_threads"]}
+        if config["backend"] == "tflite":
+            detector_options.update(use_xnnpack=args.xnnpack == "on", delegates=args.delegate)
+        try:
+            summary = run_test(config["model"], config["model_path"], get_camera,
+                               log_path=log_path_for(args, config), test_duration=args.duration,
+                               img_size=config["imgsz"], show_display=args.display,
+                               camera_size=tuple(args.camera_size), threaded=args.threaded, source=args.source,
+                               paced=not args.unpaced, queue_size=args.queue_size,
+                               detector_options=detector_options, max_frames=args.frames,
+                               warmup_frames=args.warmup, warmup_seconds=args.warmup_seconds,
+                               warmup_until_steady=args.warmup_steady, log_format=args.log_format,
+                               csv_export=args.csv, console_interval=args.console_interval,
+                               display_fps=args.display_fps, schedule=args.schedule,
+                               motion_gate=args.motion_gate, max_stale=args.max_stale, track=args.track, rois=args.roi)
+        except Exception as e:
+            print(f"\n❌ Error during test: {e}")
+            import traceback
+            traceback.print_exc()
+            summary = None
+        if summary is None:
+            summary = dict(config, error="no frames measured")
+        results["runs"].append(summary)
+
+        # Rewritten after every run so an interrupted sweep keeps its results
+        with open(args.results, "w") as f:
+            json.dump(results, f, indent=2)
+        if benchmark_runner.interrupted:
+            print("\n⏹️  Sweep interrupted, skipping remaining configurations")
+            break
+
+    print(f"\n📊 {args.results}\n")
+    print("| Model | Backend | imgsz | Threads | Frames | Model FPS | Pipeline FPS | Latency p50 ms | Inference ms | CPU % | Max temp | Load ms | First frame ms |")
+    print("|-------|---------|-------|---------|--------|-----------|--------------|----------------|--------------|-------|----------|---------|----------------|")
+    for r in results["runs"]:
+        if "error" in r:
+            print(f"| {r['model']} | {r['backend']} | {r['imgsz']} | {r['num_threads'] or 'default'} | - | {r['error']} |")
+            continue
+        print(f"| {r['model']} | {r['backend']} | {r['imgsz']} | {r['num_threads'] or 'default'} | {r['frames']}"
+              f" | {r['model_fps_mean']:.2f} | {r['throughput_fps']:.2f} | {r['latency_ms_p50']:.1f}"
+              f" | {r.get('inference_ms_mean', float('nan')):.1f}"
+              f" | {r['cpu_mean']:.1f} | {r['temp_max']:.1f} | {r['model_load_ms']:.0f} | {r['first_detect_ms']:.0f} |")
 
-def run_single_test(model_name, model_path):
-    global SHOW_DISPLAY
-    print(f"\n=== Running test for {model_name} ===\n")
-    
-    # Check if model exists
-    if not os.path.exists(model_path):
-        print(f"❌ Model not found: {model_path}")
-        print(f"Downloading {model_name}...")
-    
-    model = YOLO(model_path)
-    cap = get_camera_stream()
-    
-    # Check if camera opened successfully
-    if cap is None or not cap.isOpened():
-        print("❌ Error: Could not open camera!")
-        print("💡 Try enabling camera: sudo raspi-config → Interface Options → Camera")
-        print("💡 Or install required packages: sudo apt-get install libcamera-apps python3-libcamera")
-        return
-
-    log_path = f"logs/{model_name}.csv"
-    start_time = time.time()
-    frame_count = 0
-
-    with open(log_path, "w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(["frame", "fps", "cpu", "ram", "temp", "detections"])
-
-        while time.time() - start_time < TEST_DURATION:
-            ret, frame = cap.read()
-            if not ret:
-                print("❌ Failed to grab frame from camera")
-                break
-            
-            frame_count += 1
-            t0 = time.time()
-            results = model(frame, imgsz=IMG_SIZE, verbose=False)
-            inference_time = time.time() - t0
-            fps = 1 / inference_time
-
-            # Draw bounding boxes and labels on frame
-            annotated_frame = results[0].plot()
-            
-            # Count detections
-            detections = len(results[0].boxes)
-            
-            # Get detected class names
-            detected_objects = []
-            for box in results[0].boxes:
-                class_id = int(box.cls[0])
-                class_name = results[0].names[class_id]
-                conf = float(box.conf[0])
-                detected_objects.append(f"{class_name}({conf:.2f})")
-            
-            cpu, ram, temp = get_system_stats()
-            writer.writerow([frame_count, fps, cpu, ram, temp, detections])
-
-            detection_str = ", ".join(detected_objects) if detected_objects else "None"
-            print(f"{model_name} | Frame: {frame_count} | FPS: {fps:.2f} | CPU: {cpu}% | RAM: {ram}% | Temp: {temp}°C | Detections: {detections} | Objects: [{detection_str}]")
-            
-            # Display live view if display is available
-            if SHOW_DISPLAY:
-                try:
-                    cv2.imshow(f'{model_name} - YOLO Live Detection', annotated_frame)
-                    # Press 'q' to quit early
-                    if cv2.waitKey(1) & 0xFF == ord('q'):
-                        print("\n⏹️  Stopped by user")
-                        break
-                except:
-                    # If display fails, disable it
-                    SHOW_DISPLAY = False
-                    print("⚠️  Display not available, running in headless mode")
-
-    cap.release()
-    if SHOW_DISPLAY:
-        cv2.destroyAllWindows()
-    
-    print(f"\n✅ Test complete for {model_name}! Results saved to {log_path}")
+    # Side-by-side report when there is something to compare
+    measured = [r for r in results["runs"] if "error" not in r]
+    status = 0 if len(measured) == len(results["runs"]) else 1
+    if len(measured) > 1 or (measured and baseline is not None):
+        try:
+            regressed_runs = generate_comparison_report(load_runs([args.results]),
+                                                        os.path.join(args.output_dir, "comparison_report.md"),
+                                                        baseline)
+        except Exception as e:
+            print(f"❌ Failed to generate comparison report: {e}")
+            return 1
+        if regressed_runs and baseline is not None:
+            status = 1
+    # Non-zero when a configuration failed or regressed against the baseline, so CI can gate on it
+    return status
 
 
 if __name__ == "__main__":
-    for name, path in MODELS.items():
-        run_single_test(name, path)
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""
+Inference-rate schedulers for the live runners.
+
+A scheduler sits between the frame source and the detector and decides, for
+each captured frame, whether it is inferred; frames that aren't reuse the
+last detections for display and logging. Once inference is slower than the
+camera this keeps latency bounded (frames are skipped instead of queueing),
+and the thermal mode trades rate and input size for temperature before the
+firmware starts throttling.
+
+Schedules are given as specs, like frame sources:
+    every          infer every frame (default)
+    stride:N       infer every Nth frame
+    fps:F          infer at most F times a second
+    thermal:F      F a second while cool; steps the rate (then the input size,
+                   where the model allows it) down while the CPU is hot or
+                   throttled, and back up once it has cooled down
+"""
+
+import math
+
+# Throttling bits that mean the CPU is being held back right now (see system_monitor.THROTTLE_FLAGS)
+THROTTLE_NOW = 0x2 | 0x4 | 0x8
+HOT_TEMP = 75.0  # °C: step down at or above (the Pi firmware soft limit is 80 °C)
+COOL_TEMP = 65.0  # °C: step back up at or below
+HOLD_SECONDS = 5.0  # minimum time between two steps, so the temperature can follow
+RATE_STEP = 0.75  # each thermal step down multiplies the inference rate by this
+MIN_FPS = 2.0
+SMALLER_SIZES = (256, 224, 192, 160)  # input sizes tried below the run's imgsz
+
+
+class EveryFrame:
+    """Infers every frame (the scheduler of runs without --schedule)"""
+    mode = "every"
+
+    def __init__(self):
+        self.inferred = 0
+        self.skipped = 0  # skipped by the schedule
+        self.gated = 0  # allowed by the schedule, skipped by the motion gate
+        self.changes = []  # (seconds since start, description) of adaptive changes
+
+    def should_infer(self, now_ns, sample=None):
+        """
+        True if the frame captured now may be inferred; sample is the latest
+        TelemetrySample. Call it for every measured frame so the cadence follows
+        the camera, and record() the outcome of the frames it allowed.
+        """
+        return self._count(True)
+
+    def _count(self, infer):
+        if not infer:
+            self.skipped += 1
+        return infer
+
+    def record(self, inferred):
+        """Outcome of a frame should_infer() allowed: inferred, or skipped by the motion gate"""
+        if inferred:
+            self.inferred += 1
+        else:
+            self.gated += 1
+
+    def describe(self):
+        return "every frame"
+
+    def to_dict(self):
+        total = self.inferred + self.skipped + self.gated
+        return {"schedule": self.describe(), "inferred_frames": self.inferred, "skipped_frames": self.skipped,
+                "gated_frames": self.gated, "inferred_ratio": self.inferred / total if total else math.nan,
+                "schedule_changes": self.changes}
+
+
+class StrideScheduler(EveryFrame):
+    """Infers every Nth frame"""
+    mode = "stride"
+
+    def __init__(self, stride):
+        super().__init__()
+        if stride < 1:
+            raise ValueError(f"Stride must be at least 1, got {stride}")
+        self.stride = stride
+        self._frame = 0
+
+    def should_infer(self, now_ns, sample=None):
+        infer = self._frame % self.stride == 0
+        self._frame += 1
+        return self._count(infer)
+
+    def describe(self):
+        return f"every {self.stride} frames"
+
+
+class RateScheduler(EveryFrame):
+    """Infers at most target_fps times a second: a frame is inferred once the interval has passed"""
+    mode = "fps"
+
+    def __init__(self, target_fps):
+        super().__init__()
+        if target_fps <= 0:
+            raise ValueError(f"Target FPS must be positive, got {target_fps}")
+        self.target_fps = target_fps
+        self._next_ns = None
+
+    def set_rate(self, fps):
+        self.target_fps = fps
+
+    def should_infer(self, now_ns, sample=None):
+        if self._next_ns is not None and now_ns < self._next_ns:
+            return self._count(False)
+        interval_ns = int(1e9 / self.target_fps)
+        # Keep the cadence, but don't build up credit after a slow frame
+        self._next_ns = now_ns + interval_ns if self._next_ns is None else max(self._next_ns + interval_ns, now_ns)
+        return self._count(True)
+
+    def describe(self):
+        return f"≤ {self.target_fps:g} FPS"
+
+
+class ThermalScheduler(RateScheduler):
+    """
+    Rate pacing that backs off under thermal load.
+
+    The levels go from (target_fps, imgsz) down by RATE_STEP to about min_fps, then
+    through `sizes` (smaller input sizes, only if the detector can change its
+    input size). One level down when the temperature reaches hot_temp or the
+    firmware reports throttling, one level up once it is at or below
+    cool_temp again, at most one step every hold_seconds. Without a
+    temperature reading (no sensor) only the throttling flags count; without
+    either it goes back to level 0 and stays there until a reading comes back.
+    """
+    mode = "thermal"
+
+    def __init__(self, target_fps, detector=None, hot_temp=HOT_TEMP, cool_temp=COOL_TEMP,
+                 min_fps=MIN_FPS, hold_seconds=HOLD_SECONDS, sizes=SMALLER_SIZES):
+        super().__init__(target_fps)
+        self.detector = detector
+        self.hot_temp = hot_temp
+        self.cool_temp = cool_temp
+        self.hold_ns = int(hold_seconds * 1e9)
+        imgsz = detector.imgsz if detector is not None else None
+        self.levels = []
+        fps = target_fps
+        while True:
+            self.levels.append((fps, imgsz))
+            if fps * RATE_STEP < min_fps:
+                break
+            fps *= RATE_STEP
+        if detector is not None and detector.can_resize:
+            self.levels += [(self.levels[-1][0], size) for size in sizes if size < imgsz]
+        self.level = 0
+        self.no_sensor = False  # warned that there is no temperature reading
+        self._start_ns = None
+        self._last_step_ns = None
+
+    def should_infer(self, now_ns, sample=None):
+        if self._start_ns is None:
+            self._start_ns = self._last_step_ns = now_ns
+        if sample is not None and math.isnan(sample.temp) and not self.no_sensor:
+            if sample.throttled is None:
+                print("⚠️  No CPU temperature reading or throttling flags: thermal adaptation disabled until"
+                      f" there is one, inferring at ≤ {self.levels[0][0]:g} FPS")
+            else:
+                print("⚠️  No CPU temperature reading: adapting to the firmware throttling flags only")
+            self.no_sensor = True
+        if sample is not None and math.isnan(sample.temp) and sample.throttled is None:
+            # Nothing to adapt to: back to the full rate
+            if self.level:
+                self._set_level(0, now_ns, sample)
+        elif sample is not None and now_ns - self._last_step_ns >= self.hold_ns:
+            step = self._step(sample)
+            if step:
+                self._set_level(self.level + step, now_ns, sample)
+        return super().should_infer(now_ns, sample)
+
+    def _step(self, sample):
+        """+1 (slower/smaller), -1 (back up) or 0 for the current telemetry"""
+        throttled = sample.throttled is not None and sample.throttled & THROTTLE_NOW
+        # Without a temperature reading only the throttling flags count
+        hot = sample.temp >= self.hot_temp
+        cool = math.isnan(sample.temp) or sample.temp <= self.cool_temp
+        if (hot or throttled) and self.level < len(self.levels) - 1:
+            return 1
+        if not hot and not throttled and cool and self.level > 0:
+            return -1
+        return 0
+
+    def _set_level(self, level, now_ns, sample):
+        self.level = level
+        self._last_step_ns = now_ns
+        fps, imgsz = self.levels[level]
+        self.set_rate(fps)
+        if imgsz is not None and imgsz != self.detector.imgsz:
+            self.detector.set_imgsz(imgsz)
+        temp = "no temperature" if math.isnan(sample.temp) else f"{sample.temp:.1f}°C"
+        self.changes.append(((now_ns - self._start_ns) / 1e9, f"{temp} → {self.describe()}"))
+
+    @property
+    def imgsz(self):
+        return self.levels[self.level][1]
+
+    def describe(self):
+        size = f" @ {self.imgsz}px" if self.imgsz is not None else ""
+        return f"thermal, level {self.level}/{len(self.levels) - 1}: ≤ {self.target_fps:.1f} FPS{size}"
+
+
+def create_scheduler(spec, detector=None):
+    """Scheduler for a spec ("every", "stride:N", "fps:F" or "thermal:F")"""
+    mode, _, value = (spec or "every").partition(":")
+    try:
+        if mode == "every":
+            return EveryFrame()
+        if mode == "stride":
+            return StrideScheduler(int(value))
+        if mode == "fps":
+            return RateScheduler(float(value))
+        if mode == "thermal":
+            return ThermalScheduler(float(value), detector)
+    except ValueError as e:
+        raise ValueError(f"Invalid schedule '{spec}': {e}") from None
+    raise ValueError(f"Unknown schedule '{spec}' (expected every, stride:N, fps:F or thermal:F)")
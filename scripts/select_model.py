@@ -0,0 +1,126 @@
+"""
+Pick the exported model variant for this machine.
+
+Every variant of a model in the export manifest (input size × TFLite
+fp32/fp16/int8 and ONNX, see export_models_to_tflite.py) is benchmarked on
+the same replay frames, smallest input first, and the largest input size
+that still reaches the target FPS is selected (the fastest format at that
+size). Once no format of a size reaches the target, larger sizes are
+skipped.
+
+Examples:
+    python3 scripts/select_model.py --model yolo8n --target-fps 10 --source video:clip.mp4
+    python3 scripts/select_model.py --model yolo11n --formats int8 onnx --target-fps 15 --threads 4
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+from batch_benchmark import run_batch
+from detector import create_detector
+from model_manifest import FORMATS, MANIFEST_PATH, find_variants, load_manifest, project_root
+from run_benchmark import MODELS
+
+
+def benchmark_variant(variant, source, num_frames, num_threads=None, conf=0.25, iou=0.7):
+    """Frames per second of one variant, single-frame inference on an unpaced replay source"""
+    detector = create_detector(os.path.join(project_root, variant["path"]), imgsz=variant["imgsz"], conf=conf,
+                               iou=iou, num_threads=num_threads)
+    try:
+        result = run_batch(detector, source, 1, num_frames, warmup_batches=5)
+    finally:
+        detector.close()
+    return dict(variant_key(variant), fps=result["fps"], ms_per_frame=result["batch_ms"],
+                fps_per_core=result["fps_per_core"], detections_per_frame=result["detections"] / max(result["frames"], 1))
+
+
+def variant_key(variant):
+    return {key: variant[key] for key in ("model", "format", "imgsz", "path")}
+
+
+def select(results, target_fps):
+    """Largest input size reaching target_fps (fastest format at that size), None if none does"""
+    passing = [r for r in results if r["fps"] >= target_fps]
+    if not passing:
+        return None
+    return max(passing, key=lambda r: (r["imgsz"], r["fps"]))
+
+
+def sweep(variants, source, num_frames, target_fps, num_threads=None):
+    """Benchmark variants (smallest size first), stopping after a size where nothing reached target_fps"""
+    results = []
+    for imgsz in sorted({v["imgsz"] for v in variants}):
+        size_results = []
+        for variant in (v for v in variants if v["imgsz"] == imgsz):
+            print(f"⏱️  {variant['format']} {imgsz}px ({variant['path']})...")
+            try:
+                result = benchmark_variant(variant, source, num_frames, num_threads)
+            except Exception as e:
+                print(f"⚠️  {variant['path']} failed: {e}")
+                continue
+            print(f"   {result['fps']:.2f} FPS | {result['ms_per_frame']:.1f} ms/frame")
+            size_results.append(result)
+        results += size_results
+        if size_results and not any(r["fps"] >= target_fps for r in size_results):
+            print(f"⏭️  Nothing reached {target_fps:g} FPS at {imgsz}px, skipping larger sizes")
+            break
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark exported model variants and pick the largest input size"
+                                                 " that reaches a target FPS")
+    parser.add_argument("--model", default="yolo8n", choices=list(MODELS))
+    parser.add_argument("--target-fps", type=float, default=10.0)
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=None, help="Variants to try (default: all)")
+    parser.add_argument("--imgsz", type=int, nargs="+", default=None, help="Input sizes to try (default: all)")
+    parser.add_argument("--source", default="synthetic", help='Replay source, e.g. "video:clip.mp4" or "images:dir"')
+    parser.add_argument("--frames", type=int, default=100, help="Measured frames per variant")
+    parser.add_argument("--threads", type=int, default=None, help="Inference CPU threads")
+    parser.add_argument("--manifest", default=MANIFEST_PATH)
+    parser.add_argument("--output", default=None, help="Write the results and selection as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    variants = find_variants(load_manifest(args.manifest), args.model, args.formats, args.imgsz)
+    if not variants:
+        print(f"❌ No exported {args.model} variants in {args.manifest}")
+        print(f"💡 Export them on your PC first: python export_models_to_tflite.py")
+        return 1
+
+    print(f"🧪 {len(variants)} variant(s) of {args.model} | source: {args.source} | target {args.target_fps:g} FPS")
+    results = sweep(variants, args.source, args.frames, args.target_fps, args.threads)
+    if not results:
+        print("❌ No variant could be run")
+        return 1
+
+    selected = select(results, args.target_fps)
+    print(f"\n| imgsz | Format | FPS | ms/frame | FPS/core | ≥ {args.target_fps:g} FPS |")
+    print(f"|-------|--------|-----|----------|----------|----------|")
+    for r in results:
+        mark = "🏆" if r is selected else ("✅" if r["fps"] >= args.target_fps else "❌")
+        print(f"| {r['imgsz']} | {r['format']} | {r['fps']:.2f} | {r['ms_per_frame']:.1f} | {r['fps_per_core']:.2f} | {mark} |")
+
+    if selected is None:
+        fastest = max(results, key=lambda r: r["fps"])
+        print(f"\n⚠️  No variant reached {args.target_fps:g} FPS; fastest: {fastest['format']} {fastest['imgsz']}px"
+              f" at {fastest['fps']:.2f} FPS")
+    else:
+        print(f"\n🏆 {selected['format']} {selected['imgsz']}px: {selected['fps']:.2f} FPS")
+        print(f"   python3 scripts/run_benchmark.py --model {selected['path']} --imgsz {selected['imgsz']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"created": datetime.now().isoformat(timespec="seconds"), "model": args.model,
+                       "source": args.source, "target_fps": args.target_fps, "cpu_cores": os.cpu_count(),
+                       "selected": selected, "results": results}, f, indent=2)
+        print(f"📊 Results saved to {args.output}")
+    return 0 if selected is not None else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
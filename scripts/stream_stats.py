@@ -0,0 +1,142 @@
+"""
+Single-pass, fixed-memory statistics for long benchmark logs.
+
+Every aggregator is fed NumPy chunks of a column (NaN values are skipped) and
+keeps constant state, so summarizing a 10M-frame soak test needs no more
+memory than a 1K-frame run:
+
+    RunningStats    count, mean, variance, min, max (Welford / Chan merge)
+    QuantileSketch  percentiles with bounded relative error (log-spaced histogram, mergeable)
+    BucketedSeries  the column downsampled to a fixed number of buckets, for graphs
+"""
+
+import math
+import numpy as np
+
+
+class RunningStats:
+    """Streaming count / mean / variance / min / max"""
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # sum of squared deviations from the mean
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values):
+        """Merge a chunk of values (Chan et al. parallel update)"""
+        values = values[~np.isnan(values)]
+        n = values.size
+        if not n:
+            return
+        chunk_mean = float(values.mean())
+        chunk_m2 = float(np.square(values - chunk_mean).sum())
+        total = self.count + n
+        delta = chunk_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += chunk_m2 + delta * delta * self.count * n / total
+        self.count = total
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    def get(self, name):
+        """mean / std / min / max, NaN if no values were seen"""
+        return getattr(self, name) if self.count else math.nan
+
+
+class QuantileSketch:
+    """
+    Percentiles from a histogram with log-spaced bins.
+
+    Any quantile is returned within `relative_accuracy` of a value that was
+    actually at that rank, for values between min_value and max_value (values
+    at or below min_value count as min_value). Memory is fixed by the range
+    and accuracy: about 1,000 bins for 1e-3 .. 1e6 at 1%.
+    """
+    def __init__(self, relative_accuracy=0.01, min_value=1e-3, max_value=1e6):
+        self.min_value = min_value
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        num_bins = int(math.ceil(math.log(max_value / min_value) / self._log_gamma)) + 1
+        self.counts = np.zeros(num_bins, np.int64)
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values):
+        values = values[~np.isnan(values)]
+        if not values.size:
+            return
+        self.count += values.size
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        index = np.log(np.maximum(values, self.min_value) / self.min_value) / self._log_gamma
+        index = np.minimum(index.astype(np.int64), len(self.counts) - 1)
+        self.counts += np.bincount(index, minlength=len(self.counts))
+
+    def merge(self, other):
+        """Add the values of another sketch with the same accuracy and range"""
+        self.counts += other.counts
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q):
+        """Value at quantile q (0..1), NaN if empty"""
+        if not self.count:
+            return math.nan
+        rank = q * (self.count - 1)
+        i = int(np.searchsorted(np.cumsum(self.counts), rank, side="right"))
+        # Geometric middle of the bin, clamped to the exact observed range
+        value = self.min_value * self.gamma ** (i + 0.5)
+        return min(max(value, self.min), self.max)
+
+
+class BucketedSeries:
+    """
+    A column downsampled to at most 2 * width bucket means.
+
+    Frames are assigned to buckets of `span` consecutive frames; when the
+    buckets run out, neighbouring pairs are merged and the span doubles, so
+    memory stays fixed however long the run is.
+    """
+    def __init__(self, width=60):
+        self.width = width
+        self.capacity = 2 * width
+        self.sums = np.zeros(self.capacity)
+        self.counts = np.zeros(self.capacity, np.int64)
+        self.span = 1
+        self.frames = 0
+
+    def update(self, values):
+        n = values.size
+        if not n:
+            return
+        while (self.frames + n - 1) // self.span >= self.capacity:
+            self.sums = np.concatenate([self.sums.reshape(-1, 2).sum(1), np.zeros(self.width)])
+            self.counts = np.concatenate([self.counts.reshape(-1, 2).sum(1), np.zeros(self.width, np.int64)])
+            self.span *= 2
+        index = (self.frames + np.arange(n)) // self.span
+        valid = ~np.isnan(values)
+        self.sums += np.bincount(index[valid], weights=values[valid], minlength=self.capacity)
+        self.counts += np.bincount(index[valid], minlength=self.capacity)
+        self.frames += n
+
+    def values(self):
+        """Bucket means resampled to at most `width` points (NaN for empty buckets)"""
+        used = -(-self.frames // self.span)  # buckets that received frames
+        sums, counts = self.sums[:used], self.counts[:used]
+        if used > self.width:
+            group = np.arange(used) * self.width // used
+            sums = np.bincount(group, weights=sums, minlength=self.width)
+            counts = np.bincount(group, weights=counts, minlength=self.width)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
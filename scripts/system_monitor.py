@@ -1,9 +1,187 @@
+"""
+System telemetry for the benchmark loop.
+
+TelemetrySampler reads /proc and /sys directly on a background thread at a
+fixed rate, so the inference loop only picks up the latest sample instead of
+forking vcgencmd or calling psutil every frame.
+"""
+
+import glob
+import math
+import os
+import threading
+import time
 import psutil
-import subprocess
 
-def get_temp():
-    temp = subprocess.check_output(["vcgencmd", "measure_temp"]).decode()
-    return float(temp.replace("temp=", "").replace("'C\n", ""))
+THERMAL_ZONES = "/sys/class/thermal/thermal_zone*"
+CPUFREQ = "/sys/devices/system/cpu/cpu{}/cpufreq/scaling_cur_freq"
+# Raspberry Pi firmware throttling flags (same bits as `vcgencmd get_throttled`)
+THROTTLED_PATH = "/sys/devices/platform/soc/soc:firmware/get_throttled"
+THROTTLE_FLAGS = {
+    0x1: "under-voltage",
+    0x2: "frequency capped",
+    0x4: "throttled",
+    0x8: "soft temperature limit",
+}
+THROTTLE_OCCURRED_SHIFT = 16  # bits 16-19: the same conditions happened since boot
+
+
+def _read(path):
+    with open(path) as f:
+        return f.read()
+
+
+def find_cpu_thermal_zone():
+    """Path of the CPU thermal zone's temp file (first zone if none is named cpu), or None"""
+    zones = sorted(glob.glob(THERMAL_ZONES))
+    for zone in zones:
+        try:
+            if "cpu" in _read(os.path.join(zone, "type")).lower():
+                return os.path.join(zone, "temp")
+        except OSError:
+            pass
+    return os.path.join(zones[0], "temp") if zones else None
+
+
+_cpu_zone = None
+
+def read_temp(zone=None):
+    """CPU temperature in °C from sysfs, NaN if not available"""
+    global _cpu_zone
+    if zone is None:
+        if _cpu_zone is None:
+            _cpu_zone = find_cpu_thermal_zone() or ""
+        zone = _cpu_zone
+    try:
+        return int(_read(zone)) / 1000
+    except (OSError, ValueError):
+        return math.nan
+
+
+def read_cpu_times():
+    """(busy, total) jiffies for all CPUs and per core from /proc/stat"""
+    times = []
+    for line in _read("/proc/stat").splitlines():
+        if not line.startswith("cpu"):
+            break
+        values = [int(v) for v in line.split()[1:]]
+        idle = values[3] + (values[4] if len(values) > 4 else 0)  # idle + iowait
+        total = sum(values[:8])  # guest time is already counted in user/nice
+        times.append((total - idle, total))
+    return times
+
+
+def read_ram_percent():
+    """Used RAM in percent (MemTotal - MemAvailable), like psutil"""
+    info = {}
+    for line in _read("/proc/meminfo").splitlines():
+        key, _, value = line.partition(":")
+        info[key] = int(value.split()[0])
+    return (info["MemTotal"] - info["MemAvailable"]) / info["MemTotal"] * 100
+
+
+def read_cpu_freq(num_cores):
+    """Current frequency of each core in MHz (NaN where cpufreq is not available)"""
+    freqs = []
+    for core in range(num_cores):
+        try:
+            freqs.append(int(_read(CPUFREQ.format(core))) / 1000)
+        except (OSError, ValueError):
+            freqs.append(math.nan)
+    return freqs
+
+
+def read_throttled():
+    """Raspberry Pi throttling bitmask, None if the firmware doesn't expose it"""
+    try:
+        return int(_read(THROTTLED_PATH), 16)
+    except (OSError, ValueError):
+        return None
+
+
+def describe_throttled(flags):
+    """Human readable throttling state, e.g. "throttled (now), under-voltage (since boot)" """
+    if flags is None:
+        return "n/a"
+    now = [name for bit, name in THROTTLE_FLAGS.items() if flags & bit]
+    past = [name for bit, name in THROTTLE_FLAGS.items()
+            if flags & (bit << THROTTLE_OCCURRED_SHIFT) and not flags & bit]
+    text = [f"{name} (now)" for name in now] + [f"{name} (since boot)" for name in past]
+    return ", ".join(text) or "none"
+
+
+class TelemetrySample:
+    """One telemetry reading; cpu and per-core values are % busy since the previous sample"""
+    __slots__ = ("timestamp_ns", "cpu", "cpu_per_core", "ram", "temp", "freq_mhz", "throttled")
+
+    def __init__(self, timestamp_ns, cpu, cpu_per_core, ram, temp, freq_mhz, throttled):
+        self.timestamp_ns = timestamp_ns
+        self.cpu = cpu
+        self.cpu_per_core = cpu_per_core
+        self.ram = ram
+        self.temp = temp
+        self.freq_mhz = freq_mhz  # per core
+        self.throttled = throttled  # firmware bitmask or None
+
+
+class TelemetrySampler:
+    """
+    Samples CPU load (total and per core), RAM, temperature, CPU frequency and
+    throttling flags every `interval` seconds on a daemon thread.
+
+    `latest` is always the most recent TelemetrySample; reading it never
+    blocks. Falls back to psutil where /proc is not available.
+    """
+    def __init__(self, interval=0.5):
+        self.interval = interval
+        self.num_cores = os.cpu_count() or 1
+        self.latest = None
+        self.samples = 0
+        self._use_proc = os.path.exists("/proc/stat")
+        self._prev_times = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+
+    def start(self):
+        """Take a baseline and a first sample, then keep sampling in the background"""
+        self._sample_cpu()
+        time.sleep(min(self.interval, 0.1))
+        self.sample()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=2.0)
+
+    def _sample_cpu(self):
+        """(total %, per-core %) since the previous call"""
+        if not self._use_proc:
+            per_core = psutil.cpu_percent(percpu=True)
+            return sum(per_core) / len(per_core), per_core
+        times = read_cpu_times()
+        prev, self._prev_times = self._prev_times, times
+        if prev is None:
+            return math.nan, [math.nan] * (len(times) - 1)
+        loads = []
+        for (busy, total), (prev_busy, prev_total) in zip(times, prev):
+            loads.append((busy - prev_busy) / (total - prev_total) * 100 if total > prev_total else 0.0)
+        return loads[0], loads[1:]
+
+    def sample(self):
+        """Take one sample now and publish it as `latest`"""
+        cpu, per_core = self._sample_cpu()
+        ram = read_ram_percent() if self._use_proc else psutil.virtual_memory().percent
+        self.latest = TelemetrySample(time.perf_counter_ns(), cpu, per_core, ram, read_temp(),
+                                      read_cpu_freq(self.num_cores), read_throttled())
+        self.samples += 1
+        return self.latest
 
-def get_system_stats():
-    return psutil.cpu_percent(), psutil.virtual_memory().percent, get_temp()
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"⚠️  Telemetry sampling failed: {e}")
+                break
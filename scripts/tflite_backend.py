@@ -0,0 +1,66 @@
+"""
+TFLite interpreter creation with explicit threading and delegate control.
+
+Works with tflite_runtime (Raspberry Pi) and full TensorFlow.
+"""
+
+try:
+    import tflite_runtime.interpreter as tflite
+    _load_delegate = tflite.load_delegate
+    _OpResolverType = getattr(tflite, "OpResolverType", None)
+except ImportError:
+    import tensorflow.lite as tflite
+    _load_delegate = tflite.experimental.load_delegate
+    _OpResolverType = getattr(tflite.experimental, "OpResolverType", None)
+
+
+def parse_delegate(spec):
+    """
+    Parse an external delegate spec: "path/to/lib.so" or
+    "path/to/lib.so:key=value,key=value" → (path, options dict).
+    """
+    if isinstance(spec, (tuple, list)):
+        return spec[0], dict(spec[1]) if len(spec) > 1 else {}
+    path, _, option_str = spec.partition(":")
+    options = {}
+    for item in filter(None, option_str.split(",")):
+        key, _, value = item.partition("=")
+        options[key.strip()] = value.strip()
+    return path, options
+
+
+def load_interpreter(model_path, num_threads=None, use_xnnpack=True, delegates=()):
+    """
+    Create and allocate a TFLite interpreter.
+
+    num_threads: CPU threads for inference (None = runtime default).
+    use_xnnpack: False builds the interpreter without the default XNNPACK
+        delegate (plain builtin kernels).
+    delegates: external delegate libraries to load, as specs accepted by
+        parse_delegate(), e.g. ["/usr/lib/libedgetpu.so.1"].
+    """
+    kwargs = {"model_path": model_path}
+    if num_threads:
+        kwargs["num_threads"] = num_threads
+    if not use_xnnpack:
+        if _OpResolverType is None:
+            print("⚠️  This TFLite runtime can't disable XNNPACK, using defaults")
+        else:
+            kwargs["experimental_op_resolver_type"] = _OpResolverType.BUILTIN_WITHOUT_DEFAULT_DELEGATES
+    loaded = []
+    for spec in delegates:
+        path, options = parse_delegate(spec)
+        loaded.append(_load_delegate(path, options))
+    if loaded:
+        kwargs["experimental_delegates"] = loaded
+
+    interpreter = tflite.Interpreter(**kwargs)
+    interpreter.allocate_tensors()
+    return interpreter
+
+
+def describe_backend(num_threads=None, use_xnnpack=True, delegates=()):
+    """Short description of an interpreter configuration for logs and tables"""
+    names = [parse_delegate(spec)[0].rsplit("/", 1)[-1] for spec in delegates]
+    return (f"threads={num_threads or 'default'} xnnpack={'on' if use_xnnpack else 'off'}"
+            f" delegates={','.join(names) or 'none'}")
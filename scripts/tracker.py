@@ -0,0 +1,188 @@
+"""
+Lightweight multi-object tracker for the live runners.
+
+Carries detections across frames that aren't inferred (see scheduler.py and
+motion_gate.py) and gives every object a stable ID. Works on the Detections
+of any backend.
+
+Every track is a constant-velocity Kalman filter over the box centre and
+size, (cx, cy, w, h, vx, vy, vw, vh) with velocities in pixels per second so
+frames can be any time apart. All tracks live in a few NumPy arrays (state
+(N, 8), covariance (N, 8, 8), ids, classes, counters); predict and update
+are batched over every track, and association is a greedy best-IoU matching
+of same-class boxes.
+"""
+
+import numpy as np
+from yolo_postprocess import COCO_CLASSES, Detections
+
+IOU_THRESHOLD = 0.3  # minimum IoU between a predicted track and a detection to match them
+MIN_HITS = 2  # matched inferences before a track is reported
+MAX_MISSES = 3  # inferences a track may go unmatched before it is dropped
+MAX_COAST = 1  # inferences a confirmed track is still reported without a match
+MAX_AGE = 2.0  # seconds without a match before a track is dropped
+# Noise, as a fraction of the box size (mean of width and height)
+MEASUREMENT_STD = 0.05
+POSITION_STD = 0.05  # per √second
+VELOCITY_STD = 0.5  # per √second: velocity may change by half a box per second
+INITIAL_VELOCITY_STD = 1.0
+
+
+class Tracks(Detections):
+    """Detections with a track ID per box"""
+    __slots__ = ("ids",)
+
+    def __init__(self, boxes, scores, class_ids, ids):
+        super().__init__(boxes, scores, class_ids)
+        self.ids = ids
+
+    def labels(self, names=COCO_CLASSES):
+        labels = super().labels(names)
+        return [f"#{i} {label}" for i, label in zip(self.ids.tolist(), labels)]
+
+
+def box_iou(a, b):
+    """(len(a), len(b)) IoU matrix of two xyxy box arrays"""
+    tl = np.maximum(a[:, None, :2], b[None, :, :2])
+    br = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.prod(np.clip(br - tl, 0, None), axis=2)
+    area_a = np.prod(a[:, 2:] - a[:, :2], axis=1)
+    area_b = np.prod(b[:, 2:] - b[:, :2], axis=1)
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
+
+
+def xyxy_to_cxcywh(boxes):
+    return np.concatenate([(boxes[:, :2] + boxes[:, 2:]) / 2, boxes[:, 2:] - boxes[:, :2]], axis=1)
+
+
+def cxcywh_to_xyxy(boxes):
+    half = boxes[:, 2:4] / 2
+    return np.concatenate([boxes[:, :2] - half, boxes[:, :2] + half], axis=1)
+
+
+def greedy_match(iou, threshold):
+    """(track, detection) index pairs, best IoU first, each used once"""
+    rows, cols = np.nonzero(iou >= threshold)
+    order = np.argsort(-iou[rows, cols], kind="stable")
+    used_rows, used_cols, pairs = set(), set(), []
+    for r, c in zip(rows[order].tolist(), cols[order].tolist()):
+        if r not in used_rows and c not in used_cols:
+            used_rows.add(r)
+            used_cols.add(c)
+            pairs.append((r, c))
+    return pairs
+
+
+class Tracker:
+    """
+    update(detections, now_ns) on inferred frames, predict(now_ns) on the
+    others; both return the confirmed Tracks at that time.
+    """
+    def __init__(self, iou_threshold=IOU_THRESHOLD, min_hits=MIN_HITS, max_misses=MAX_MISSES, max_age=MAX_AGE,
+                 max_coast=MAX_COAST):
+        self.iou_threshold = iou_threshold
+        self.min_hits = min_hits
+        self.max_misses = max_misses
+        self.max_coast = max_coast
+        self.max_age_ns = int(max_age * 1e9)
+        self.state = np.empty((0, 8))
+        self.cov = np.empty((0, 8, 8))
+        self.ids = np.empty(0, np.int64)
+        self.class_ids = np.empty(0, np.int64)
+        self.scores = np.empty(0, np.float32)
+        self.hits = np.empty(0, np.int64)
+        self.misses = np.empty(0, np.int64)
+        self.last_seen_ns = np.empty(0, np.int64)
+        self.next_id = 1
+        self.confirmed_ids = set()  # every ID that was ever reported
+        self._now_ns = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def predict(self, now_ns):
+        """Advance every track to now_ns; returns the confirmed tracks"""
+        dt = 0.0 if self._now_ns is None else (now_ns - self._now_ns) / 1e9
+        self._now_ns = now_ns
+        if len(self) and dt > 0:
+            F = np.eye(8)
+            F[:4, 4:] = np.eye(4) * dt
+            self.state = self.state @ F.T
+            self.state[:, 2:4] = np.maximum(self.state[:, 2:4], 1.0)
+            size = self.state[:, 2:4].mean(axis=1)
+            q = np.concatenate([np.repeat((POSITION_STD * size)[:, None] ** 2, 4, 1),
+                                np.repeat((VELOCITY_STD * size)[:, None] ** 2, 4, 1)], axis=1) * dt
+            self.cov = F @ self.cov @ F.T
+            self.cov[:, np.arange(8), np.arange(8)] += q
+        return self.current()
+
+    def update(self, detections, now_ns):
+        """Predict to now_ns, match the detections and correct, start and drop tracks"""
+        self.predict(now_ns)
+        boxes = np.asarray(detections.boxes, dtype=np.float64)
+        matched_tracks = np.zeros(len(self), bool)
+        matched_dets = np.zeros(len(detections), bool)
+        if len(self) and len(detections):
+            iou = box_iou(cxcywh_to_xyxy(self.state[:, :4]), boxes)
+            iou[self.class_ids[:, None] != detections.class_ids[None, :]] = 0.0
+            pairs = greedy_match(iou, self.iou_threshold)
+            if pairs:
+                t, d = (np.array(index) for index in zip(*pairs))
+                self._correct(t, xyxy_to_cxcywh(boxes[d]))
+                self.scores[t] = detections.scores[d]
+                self.hits[t] += 1
+                self.misses[t] = 0
+                self.last_seen_ns[t] = now_ns
+                matched_tracks[t] = True
+                matched_dets[d] = True
+        self.misses[~matched_tracks] += 1
+
+        keep = (self.misses <= self.max_misses) & (now_ns - self.last_seen_ns <= self.max_age_ns)
+        if not keep.all():
+            self._select(keep)
+        new = ~matched_dets
+        if new.any():
+            self._start(xyxy_to_cxcywh(boxes[new]), detections.scores[new], detections.class_ids[new], now_ns)
+        return self.current()
+
+    def _correct(self, t, z):
+        """Kalman update of tracks t with measurements z (cx, cy, w, h), batched"""
+        x, P = self.state[t], self.cov[t]
+        size = z[:, 2:4].mean(axis=1)
+        S = P[:, :4, :4] + np.eye(4) * ((MEASUREMENT_STD * size) ** 2)[:, None, None]
+        PHt = P[:, :, :4]  # P @ H.T, H selects the box
+        K = np.linalg.solve(S, PHt.transpose(0, 2, 1)).transpose(0, 2, 1)  # S is symmetric
+        self.state[t] = x + (K @ (z - x[:, :4])[:, :, None])[:, :, 0]
+        self.cov[t] = P - K @ P[:, :4, :]
+
+    def _start(self, z, scores, class_ids, now_ns):
+        n = len(z)
+        size = z[:, 2:4].mean(axis=1)
+        cov = np.zeros((n, 8, 8))
+        std = np.concatenate([np.repeat((2 * MEASUREMENT_STD * size)[:, None], 4, 1),
+                              np.repeat((INITIAL_VELOCITY_STD * size)[:, None], 4, 1)], axis=1)
+        cov[:, np.arange(8), np.arange(8)] = std ** 2
+        self.state = np.concatenate([self.state, np.concatenate([z, np.zeros((n, 4))], axis=1)])
+        self.cov = np.concatenate([self.cov, cov])
+        self.ids = np.concatenate([self.ids, np.arange(self.next_id, self.next_id + n)])
+        self.next_id += n
+        self.class_ids = np.concatenate([self.class_ids, class_ids.astype(np.int64)])
+        self.scores = np.concatenate([self.scores, scores.astype(np.float32)])
+        self.hits = np.concatenate([self.hits, np.ones(n, np.int64)])
+        self.misses = np.concatenate([self.misses, np.zeros(n, np.int64)])
+        self.last_seen_ns = np.concatenate([self.last_seen_ns, np.full(n, now_ns, np.int64)])
+
+    def _select(self, keep):
+        for name in ("state", "cov", "ids", "class_ids", "scores", "hits", "misses", "last_seen_ns"):
+            setattr(self, name, getattr(self, name)[keep])
+
+    def current(self):
+        """Confirmed tracks matched at one of the last max_coast + 1 inferences, at their predicted position"""
+        show = (self.hits >= self.min_hits) & (self.misses <= self.max_coast)
+        ids = self.ids[show]
+        self.confirmed_ids.update(ids.tolist())
+        return Tracks(cxcywh_to_xyxy(self.state[show, :4]).astype(np.float32), self.scores[show],
+                      self.class_ids[show], ids)
+
+    def to_dict(self):
+        return {"unique_tracks": len(self.confirmed_ids), "tracks_started": self.next_id - 1}
@@ -0,0 +1,101 @@
+"""
+Warmup and steady-state detection for the benchmark loop.
+
+The first frames of a run are slow for reasons that have nothing to do with
+sustained throughput: lazy initialization in Ultralytics, memory planning on
+the first TFLite invoke(), allocator and cache warmup, the display window
+being created. Those frames are logged but flagged and left out of stats.
+"""
+
+import math
+import time
+from collections import deque
+
+
+class WarmupTracker:
+    """
+    Decides per frame whether the run is still warming up.
+
+    Warmup lasts at least `frames` frames and `seconds` seconds. With
+    until_steady=True it then continues until the frame latency is steady
+    (coefficient of variation over the last `window` frames below max_cv),
+    but never longer than max_frames frames.
+
+    Steady state is detected even when it doesn't gate the warmup, so runs
+    can report when latency settled (`steady_frame`, `steady_seconds`).
+    """
+    def __init__(self, frames=0, seconds=0.0, until_steady=False, window=30, max_cv=0.1, max_frames=300):
+        self.min_frames = frames
+        self.min_seconds = seconds
+        self.until_steady = until_steady
+        self.window = window
+        self.max_cv = max_cv
+        self.max_frames = max(max_frames, frames)
+        self.active = bool(frames or seconds or until_steady)
+
+        self.frames = 0  # frames seen so far
+        self.warmup_frames = 0  # frames flagged as warmup
+        self.warmup_seconds = 0.0
+        self.steady_frame = None  # frame number at which latency became steady
+        self.steady_seconds = None
+        self._start = None
+        self._latencies = deque(maxlen=window)
+        self._sum = 0.0
+        self._sum_sq = 0.0
+
+    def _update_steady(self, latency):
+        if len(self._latencies) == self.window:
+            oldest = self._latencies[0]
+            self._sum -= oldest
+            self._sum_sq -= oldest * oldest
+        self._latencies.append(latency)
+        self._sum += latency
+        self._sum_sq += latency * latency
+        if self.steady_frame is None and len(self._latencies) == self.window:
+            mean = self._sum / self.window
+            variance = max(self._sum_sq / self.window - mean * mean, 0.0)
+            if mean > 0 and math.sqrt(variance) / mean <= self.max_cv:
+                self.steady_frame = self.frames
+                self.steady_seconds = time.perf_counter() - self._start
+
+    def update(self, latency):
+        """Record one frame's latency (seconds); True if that frame is a warmup frame"""
+        now = time.perf_counter()
+        if self._start is None:
+            self._start = now
+        self.frames += 1
+        if self.steady_frame is None:
+            self._update_steady(latency)
+        if not self.active:
+            return False
+
+        elapsed = now - self._start
+        done = self.frames > self.min_frames and elapsed >= self.min_seconds
+        if done and self.until_steady:
+            done = self.steady_frame is not None or self.frames > self.max_frames
+        if done:
+            self.active = False
+            return False
+        self.warmup_frames += 1
+        self.warmup_seconds = elapsed
+        return True
+
+    def describe(self):
+        """One-line summary for the console and reports"""
+        text = f"{self.warmup_frames} warmup frames ({self.warmup_seconds:.1f} s) excluded"
+        if self.steady_frame is None:
+            return f"{text}, latency never became steady (CV > {self.max_cv:.0%} over {self.window} frames)"
+        return f"{text}, latency steady after frame {self.steady_frame} ({self.steady_seconds:.1f} s)"
+
+    def to_dict(self):
+        return {
+            "warmup_frames": self.warmup_frames,
+            "warmup_seconds": self.warmup_seconds,
+            "min_frames": self.min_frames,
+            "min_seconds": self.min_seconds,
+            "until_steady": self.until_steady,
+            "steady_window": self.window,
+            "steady_max_cv": self.max_cv,
+            "steady_frame": self.steady_frame,
+            "steady_seconds": self.steady_seconds,
+        }
@@ -0,0 +1,147 @@
+"""
+Vectorized post-processing for raw YOLOv8 / YOLO11 detection outputs.
+
+Turns the (1, 4 + num_classes, num_anchors) head output of exported models
+(TFLite, ONNX) into compact detection arrays in frame coordinates, doing in
+NumPy what Ultralytics does internally for .pt models.
+"""
+
+import numpy as np
+
+COCO_CLASSES = [
+    "person", "bicycle", "car", "motorcycle", "airplane", "bus", "train", "truck", "boat",
+    "traffic light", "fire hydrant", "stop sign", "parking meter", "bench", "bird", "cat", "dog",
+    "horse", "sheep", "cow", "elephant", "bear", "zebra", "giraffe", "backpack", "umbrella",
+    "handbag", "tie", "suitcase", "frisbee", "skis", "snowboard", "sports ball", "kite",
+    "baseball bat", "baseball glove", "skateboard", "surfboard", "tennis racket", "bottle",
+    "wine glass", "cup", "fork", "knife", "spoon", "bowl", "banana", "apple", "sandwich",
+    "orange", "broccoli", "carrot", "hot dog", "pizza", "donut", "cake", "chair", "couch",
+    "potted plant", "bed", "dining table", "toilet", "tv", "laptop", "mouse", "remote",
+    "keyboard", "cell phone", "microwave", "oven", "toaster", "sink", "refrigerator", "book",
+    "clock", "vase", "scissors", "teddy bear", "hair drier", "toothbrush",
+]
+
+MAX_NMS_CANDIDATES = 3000  # Highest scoring boxes considered by NMS
+
+
+class Detections:
+    """Detections of one frame: boxes (N, 4) xyxy pixels, scores (N,), class_ids (N,)"""
+    __slots__ = ("boxes", "scores", "class_ids")
+
+    def __init__(self, boxes, scores, class_ids):
+        self.boxes = boxes
+        self.scores = scores
+        self.class_ids = class_ids
+
+    @classmethod
+    def empty(cls):
+        return cls(np.empty((0, 4), np.float32), np.empty(0, np.float32), np.empty(0, np.int64))
+
+    def __len__(self):
+        return len(self.scores)
+
+    def labels(self, names=COCO_CLASSES):
+        """Human readable "name(conf)" labels"""
+        return [f"{names[c]}({s:.2f})" for c, s in zip(self.class_ids.tolist(), self.scores.tolist())]
+
+
+def tensor_quantization(detail):
+    """(scale, zero_point) of a quantized TFLite tensor detail, or None for float tensors"""
+    scale, zero_point = detail["quantization"]
+    return (scale, zero_point) if scale else None
+
+
+def decode_predictions(output, conf_threshold=0.25, quantization=None, normalized=False, input_size=None):
+    """
+    Decode a raw YOLO head output into candidate boxes.
+
+    Anchors are filtered on their best class score before any per-box work.
+    For quantized outputs the filter runs on the raw int8/uint8 values against
+    a quantized threshold (dequantization is monotonic), and only the
+    surviving anchors are dequantized.
+
+    normalized=True means boxes are in 0..1 (Ultralytics TFLite exports) and
+    are scaled by input_size=(width, height).
+
+    Returns (boxes xyxy in input pixels, scores, class_ids).
+    """
+    pred = output[0] if output.ndim == 3 else output
+    if pred.shape[0] > pred.shape[1]:
+        pred = pred.T  # Work on (4 + num_classes, num_anchors)
+
+    threshold = conf_threshold
+    if quantization is not None:
+        scale, zero_point = quantization
+        threshold = conf_threshold / scale + zero_point
+
+    best = pred[4:].max(axis=0)
+    keep = np.flatnonzero(best > threshold)
+    if keep.size == 0:
+        empty = Detections.empty()
+        return empty.boxes, empty.scores, empty.class_ids
+
+    candidates = pred[:, keep].T.astype(np.float32)
+    if quantization is not None:
+        candidates -= zero_point
+        candidates *= scale
+
+    class_ids = candidates[:, 4:].argmax(axis=1)
+    scores = candidates[np.arange(len(candidates)), 4 + class_ids]
+
+    xywh = candidates[:, :4]
+    if normalized:
+        w, h = input_size
+        xywh *= np.array([w, h, w, h], dtype=np.float32)
+    boxes = np.empty_like(xywh)
+    half_wh = xywh[:, 2:] / 2
+    boxes[:, :2] = xywh[:, :2] - half_wh
+    boxes[:, 2:] = xywh[:, :2] + half_wh
+    return boxes, scores, class_ids
+
+
+def non_max_suppression(boxes, scores, class_ids, iou_threshold=0.7, max_det=300, agnostic=False):
+    """
+    Greedy NMS returning the indices of the boxes to keep, best first.
+
+    Class-aware by default: each class's boxes are shifted by a class
+    dependent offset so boxes of different classes never overlap.
+    """
+    if len(scores) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    order = np.argsort(-scores, kind="stable")[:MAX_NMS_CANDIDATES]
+    b = boxes[order]
+    if not agnostic:
+        b = b + (class_ids[order] * (b.max() + 1))[:, None]
+    x1, y1, x2, y2 = b[:, 0], b[:, 1], b[:, 2], b[:, 3]
+    areas = (x2 - x1) * (y2 - y1)
+
+    keep = []
+    remaining = np.arange(len(order))
+    while remaining.size and len(keep) < max_det:
+        i = remaining[0]
+        keep.append(i)
+        rest = remaining[1:]
+        inter_w = np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0, None)
+        inter_h = np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0, None)
+        inter = inter_w * inter_h
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-9)
+        remaining = rest[iou <= iou_threshold]
+    return order[keep]
+
+
+def scale_boxes(boxes, gain, pad, frame_shape):
+    """
+    Map boxes from model input pixels back to frame pixels (in place).
+
+    gain=(gx, gy) is input size / frame size, pad=(px, py) the offset of the
+    image inside the input. Boxes are clipped to the frame.
+    """
+    gx, gy = gain
+    px, py = pad
+    boxes -= np.array([px, py, px, py], dtype=boxes.dtype)
+    boxes /= np.array([gx, gy, gx, gy], dtype=boxes.dtype)
+    h, w = frame_shape[:2]
+    np.clip(boxes[:, 0::2], 0, w, out=boxes[:, 0::2])
+    np.clip(boxes[:, 1::2], 0, h, out=boxes[:, 1::2])
+    return boxes
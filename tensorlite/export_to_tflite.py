@@ -24,7 +24,8 @@ def export_models():
         
         try:
             model = YOLO(f"../models/{pt_model}")
-            model.export(format="tflite", int8=True)
+            # imgsz must match IMG_SIZE = 320 of the runners (Ultralytics exports 640 by default)
+            model.export(format="tflite", int8=True, imgsz=320)
             
             print(f"✅ Exported successfully!")
             print(f"📦 Output: {tflite_name}")
@@ -0,0 +1,108 @@
+"""
+Micro-benchmark: TFLite input preprocessing before and after preallocation.
+
+Compares the original per-frame path (cv2.resize → astype → expand_dims →
+set_tensor copy, which skips the RGB swap and input quantization), the same
+path doing that work with plain NumPy, and InputPreprocessor writing straight
+into the input buffer. Prints time and bytes allocated per frame for each.
+Uses the real model's input details when the .tflite file is available,
+otherwise an INT8 320x320 input.
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+import cv2
+
+# Shared modules (frame grabber, post-processing, ...) live in the repo's top-level scripts/ folder
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "scripts"))
+
+from preprocess import InputPreprocessor
+from yolo_postprocess import tensor_quantization
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+
+MODEL_PATH = os.path.join(project_root, "models/yolov8n_int8.tflite")
+FRAME_SIZE = (320, 240)  # Camera frame (width, height)
+NUM_FRAMES = 500
+
+
+def load_input_detail():
+    """Input tensor detail of the model, or a stand-in INT8 input"""
+    if os.path.exists(MODEL_PATH):
+        try:
+            try:
+                import tflite_runtime.interpreter as tflite
+            except ImportError:
+                import tensorflow.lite as tflite
+            interpreter = tflite.Interpreter(model_path=MODEL_PATH)
+            interpreter.allocate_tensors()
+            return interpreter.get_input_details()[0]
+        except Exception as e:
+            print(f"⚠️  Could not load {MODEL_PATH}: {e}")
+    return {"shape": np.array([1, 320, 320, 3]), "dtype": np.int8, "quantization": (1 / 255, -128)}
+
+
+def legacy_preprocess(frame, size, input_buffer):
+    img = cv2.resize(frame, (size, size))
+    img = img.astype(np.uint8)
+    img = np.expand_dims(img, axis=0)
+    np.copyto(input_buffer, img, casting="unsafe")  # What interpreter.set_tensor() does
+
+
+def naive_preprocess(frame, size, input_buffer, quantization):
+    """Same work as InputPreprocessor (RGB, normalize, quantize) with plain NumPy"""
+    img = cv2.cvtColor(cv2.resize(frame, (size, size)), cv2.COLOR_BGR2RGB)
+    img = img.astype(np.float32) / 255.0
+    if quantization is not None:
+        scale, zero_point = quantization
+        img = np.round(img / scale) + zero_point
+    img = np.expand_dims(img.astype(input_buffer.dtype), axis=0)
+    np.copyto(input_buffer, img)
+
+
+def measure(func):
+    """Return (ms per frame, bytes allocated per frame) for func()"""
+    for _ in range(20):
+        func()
+
+    t0 = time.perf_counter()
+    for _ in range(NUM_FRAMES):
+        func()
+    ms_per_frame = (time.perf_counter() - t0) / NUM_FRAMES * 1000
+
+    # Peak traced memory above the baseline = temporary allocations of one frame
+    tracemalloc.start()
+    allocated = 0
+    for _ in range(20):
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        func()
+        allocated += tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return ms_per_frame, allocated / 20
+
+
+if __name__ == "__main__":
+    detail = load_input_detail()
+    shape = tuple(int(d) for d in detail["shape"])
+    dtype = np.dtype(detail["dtype"])
+    size = shape[1]
+    frame = np.random.RandomState(0).randint(0, 256, size=(FRAME_SIZE[1], FRAME_SIZE[0], 3)).astype(np.uint8)
+    input_buffer = np.empty(shape, dtype=dtype)  # Stands in for the interpreter's input tensor
+
+    quantization = tensor_quantization(detail)
+    preprocessor = InputPreprocessor(shape, dtype, quantization)
+
+    print(f"Input: {shape} {dtype.name}, quantization={detail['quantization']}, frame {FRAME_SIZE[0]}x{FRAME_SIZE[1]}\n")
+    print(f"{'Path':<28}{'ms/frame':>10}{'bytes allocated/frame':>24}")
+    for name, func in [
+        ("resize+astype+set_tensor", lambda: legacy_preprocess(frame, size, input_buffer)),
+        ("naive RGB+quantize", lambda: naive_preprocess(frame, size, input_buffer, quantization)),
+        ("InputPreprocessor", lambda: preprocessor.run(frame, input_buffer)),
+    ]:
+        ms, allocated = measure(func)
+        print(f"{name:<28}{ms:>10.3f}{allocated:>24,.0f}")
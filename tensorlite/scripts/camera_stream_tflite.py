@@ -1,16 +1,32 @@
 import cv2
 import numpy as np
 import time
-try:
-    import tflite_runtime.interpreter as tflite
-except ImportError:
-    import tensorflow.lite as tflite
+from frame_grabber import LatestFrameGrabber
+from camera_stream import get_replay_stream
 
-def get_camera_stream(width=320, height=240):
+def get_camera_stream(width=320, height=240, threaded=False, source="camera", paced=True, frames_in_flight=1):
     """
     Get camera stream optimized for TFLite on Raspberry Pi.
     Uses MJPG format for better performance.
+    With threaded=True frames are read on a background thread into reused
+    buffers and read() returns only the newest one (see LatestFrameGrabber);
+    the pool starts with room for `frames_in_flight` frames handed out by
+    read_packet() (valid until release_buffer()) and grows if needed.
+
+    Any other `source` ("synthetic", "video:clip.mp4", "images:dir",
+    "npy:frames.npy", see frame_sources.py) replays frames instead of using the
+    camera; paced=False replays them as fast as the pipeline consumes them.
     """
+    if source and source != "camera":
+        return get_replay_stream(source, width, height, threaded, paced)
+    cap = _open_camera(width, height)
+    if cap is not None and threaded:
+        print("🧵 Capturing on background thread (latest frame only)")
+        return LatestFrameGrabber(cap, reuse_buffers=True, num_buffers=frames_in_flight + 2)
+    return cap
+
+
+def _open_camera(width, height):
     try:
         print("🎥 Initializing camera for TFLite...")
         cap = cv2.VideoCapture(0, cv2.CAP_V4L2)
@@ -18,6 +34,7 @@ def get_camera_stream(width=320, height=240):
         cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
         cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
         cap.set(cv2.CAP_PROP_FPS, 30)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Don't queue stale frames in the driver
         
         # Test camera
         ret, frame = cap.read()
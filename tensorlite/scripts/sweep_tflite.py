@@ -0,0 +1,111 @@
+"""
+TFLite backend sweep.
+
+Benchmarks every combination of thread count, XNNPACK on/off and external
+delegate on a replay source and prints a throughput/latency table, to pick
+the best interpreter settings for a board and its thermal envelope.
+
+Example:
+    python3 scripts/sweep_tflite.py --model models/yolov8n_int8.tflite --threads 1 2 3 4
+"""
+
+import argparse
+import itertools
+import os
+import sys
+import time
+import numpy as np
+
+# Shared modules (frame grabber, post-processing, ...) live in the repo's top-level scripts/ folder
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "scripts"))
+
+from detector import create_detector
+from frame_sources import open_source
+from tflite_backend import describe_backend
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+
+
+def benchmark(model_path, source, num_frames, warmup, num_threads, use_xnnpack, delegates):
+    """
+    Run one configuration through the same TFLiteDetector as the live runners,
+    returns a dict of timings. Frame time is detector.detect() (preprocess,
+    invoke, decode and NMS); invoke time is its "inference" phase.
+    """
+    t0 = time.perf_counter_ns()
+    detector = create_detector(model_path, num_threads=num_threads, use_xnnpack=use_xnnpack, delegates=delegates)
+    load_ms = (time.perf_counter_ns() - t0) / 1e6
+
+    # Same deterministic frames for every configuration, as fast as possible
+    cap = open_source(source, paced=False)
+    invoke_ms = []
+    total_ms = []
+    try:
+        for i in range(warmup + num_frames):
+            ret, frame = cap.read()
+            if not ret:
+                break
+            t0 = time.perf_counter_ns()
+            detector.detect(frame)
+            elapsed_ns = time.perf_counter_ns() - t0
+            if i >= warmup:
+                invoke_ms.append(detector.timings_ns["inference"] / 1e6)
+                total_ms.append(elapsed_ns / 1e6)
+    finally:
+        cap.release()
+        detector.close()
+
+    invoke_ms = np.array(invoke_ms)
+    total_ms = np.array(total_ms)
+    return {
+        "load_ms": load_ms,
+        "fps": 1000 / total_ms.mean(),
+        "invoke_mean": invoke_ms.mean(),
+        "invoke_p50": np.percentile(invoke_ms, 50),
+        "invoke_p95": np.percentile(invoke_ms, 95),
+        "total_mean": total_ms.mean(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep TFLite interpreter settings")
+    parser.add_argument("--model", default=os.path.join(project_root, "models/yolov8n_int8.tflite"))
+    parser.add_argument("--source", default="synthetic",
+                        help='Replay source: "synthetic", "video:clip.mp4", "images:dir", "npy:frames.npy"')
+    parser.add_argument("--frames", type=int, default=100, help="Measured frames per configuration")
+    parser.add_argument("--warmup", type=int, default=10, help="Unmeasured frames per configuration")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 3, 4])
+    parser.add_argument("--xnnpack", choices=["on", "off"], nargs="+", default=["on", "off"])
+    parser.add_argument("--delegate", action="append", default=[],
+                        help='External delegate library, "lib.so" or "lib.so:key=value,..." (repeatable)')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.model):
+        print(f"❌ Model not found: {args.model}")
+        sys.exit(1)
+
+    # No external delegate is always one of the options
+    delegate_options = [()] + [(spec,) for spec in args.delegate]
+    rows = []
+    for threads, xnnpack, delegates in itertools.product(args.threads, args.xnnpack, delegate_options):
+        use_xnnpack = xnnpack == "on"
+        name = describe_backend(threads, use_xnnpack, delegates)
+        print(f"🔄 {name} ...")
+        try:
+            rows.append((threads, xnnpack, delegates,
+                         benchmark(args.model, args.source, args.frames, args.warmup, threads, use_xnnpack, delegates)))
+        except Exception as e:
+            print(f"   ⚠️  Failed: {e}")
+
+    print(f"\n📊 {os.path.basename(args.model)} on {args.source} ({args.frames} frames each)\n")
+    print(f"| Threads | XNNPACK | Delegate | FPS | Invoke mean ms | Invoke p50 ms | Invoke p95 ms | Frame ms | Load ms |")
+    print(f"|---------|---------|----------|-----|----------------|---------------|---------------|----------|---------|")
+    for threads, xnnpack, delegates, r in sorted(rows, key=lambda row: -row[3]["fps"]):
+        delegate = os.path.basename(delegates[0].split(":")[0]) if delegates else "-"
+        print(f"| {threads} | {xnnpack} | {delegate} | {r['fps']:.2f} | {r['invoke_mean']:.1f} | {r['invoke_p50']:.1f}"
+              f" | {r['invoke_p95']:.1f} | {r['total_mean']:.1f} | {r['load_ms']:.0f} |")
+
+
+if __name__ == "__main__":
+    main()
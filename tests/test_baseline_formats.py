@@ -0,0 +1,33 @@
+"""compare_runs.py baselines and perf_gate.py gate files are not interchangeable"""
+
+import json
+import pytest
+import compare_runs
+import perf_gate
+
+
+def write(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f)
+    return str(path)
+
+
+def test_compare_runs_rejects_a_gate_file(tmp_path):
+    path = write(tmp_path / "gate.json", {"format": perf_gate.GATE_FORMAT, "fingerprint": {}, "column": "detect_ms",
+                                          "runs": {}})
+    with pytest.raises(ValueError, match="perf_gate.py gate file"):
+        compare_runs.load_baseline(path)
+
+
+def test_perf_gate_rejects_a_compare_runs_baseline(tmp_path):
+    path = write(tmp_path / "baseline.json", {"format": compare_runs.BASELINE_FORMAT, "runs": []})
+    with pytest.raises(ValueError, match="not a perf_gate.py gate file"):
+        perf_gate.load_gate(path)
+
+
+def test_run_benchmark_rejects_a_gate_file_before_the_sweep(tmp_path, monkeypatch):
+    import run_benchmark
+    path = write(tmp_path / "gate.json", {"format": perf_gate.GATE_FORMAT, "fingerprint": {}, "column": "detect_ms",
+                                          "runs": {}})
+    monkeypatch.setattr(run_benchmark, "run_test", lambda *args, **kwargs: pytest.fail("sweep started"))
+    assert run_benchmark.main(["--model", "yolo8n", "--output-dir", str(tmp_path), "--baseline", path]) == 1
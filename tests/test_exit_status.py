@@ -0,0 +1,53 @@
+"""A run that regressed against a stored baseline makes the CLIs exit with status 1"""
+
+import json
+import os
+import subprocess
+import sys
+import compare_runs
+import run_benchmark
+
+SCRIPTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts")
+
+
+def summary(throughput_fps):
+    """results.json run without a frame log, so the comparison uses these values"""
+    return {"model": "yolo8n", "backend": "onnx", "imgsz": 320, "num_threads": None, "frames": 100,
+            "throughput_fps": throughput_fps, "model_fps_mean": throughput_fps, "latency_ms_p50": 50.0,
+            "inference_ms_mean": 40.0, "cpu_mean": 50.0, "temp_max": 60.0, "model_load_ms": 100.0,
+            "first_detect_ms": 80.0}
+
+
+def write_runs(path, *runs):
+    with open(path, "w") as f:
+        json.dump({"runs": list(runs)}, f)
+    return str(path)
+
+
+def test_compare_runs_exits_1_on_regression(tmp_path):
+    baseline = write_runs(tmp_path / "baseline.json", summary(20.0))
+    results = write_runs(tmp_path / "results.json", summary(10.0))
+    proc = subprocess.run([sys.executable, os.path.join(SCRIPTS, "compare_runs.py"), results, "--baseline", baseline],
+                          cwd=tmp_path, capture_output=True, text=True)
+    assert proc.returncode == 1, proc.stdout + proc.stderr
+
+
+def test_compare_runs_exits_0_without_regression(tmp_path):
+    baseline = write_runs(tmp_path / "baseline.json", summary(20.0))
+    results = write_runs(tmp_path / "results.json", summary(20.0))
+    assert compare_runs.main([results, "--baseline", baseline]) == 0
+
+
+def test_run_benchmark_returns_1_on_regression(tmp_path, monkeypatch):
+    baseline = write_runs(tmp_path / "baseline.json", summary(20.0))
+    monkeypatch.setattr(run_benchmark, "run_test", lambda *args, **kwargs: summary(10.0))
+    status = run_benchmark.main(["--model", "yolo8n", "--backend", "onnx", "--source", "synthetic", "--no-display",
+                                 "--output-dir", str(tmp_path), "--baseline", baseline])
+    assert status == 1
+
+
+def test_run_benchmark_returns_1_when_a_run_fails(tmp_path, monkeypatch):
+    monkeypatch.setattr(run_benchmark, "run_test", lambda *args, **kwargs: None)
+    status = run_benchmark.main(["--model", "yolo8n", "--backend", "onnx", "--source", "synthetic", "--no-display",
+                                 "--output-dir", str(tmp_path)])
+    assert status == 1
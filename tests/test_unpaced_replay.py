@@ -0,0 +1,48 @@
+"""An unpaced replay infers every captured frame exactly once"""
+
+import time
+import numpy as np
+import benchmark_runner
+import camera_stream
+from detector import Detector
+from pipeline import Pipeline
+from yolo_postprocess import Detections
+
+
+class SlowDetector(Detector):
+    """Stands in for a model that is much slower than the replay"""
+    backend = "pytorch"
+
+    def __init__(self, model_path, imgsz=320, **kwargs):
+        super().__init__(model_path, imgsz=imgsz)
+
+    def detect(self, frame):
+        time.sleep(0.005)
+        self.timings_ns = {"preprocess": 0, "inference": 5_000_000, "postprocess": 0}
+        return Detections.empty()
+
+
+def test_lossless_pipeline_keeps_every_packet():
+    frames = iter(range(200))
+    pipeline = Pipeline(queue_size=2, lossless=True)
+    pipeline.add_source("capture", lambda: {"seq": next(frames)})
+    pipeline.add_stage("detect", lambda packet: time.sleep(0.001) or packet)
+    pipeline.start()
+    seen = []
+    while len(seen) < 100:
+        packet = pipeline.get(timeout=1.0)
+        assert packet is not None
+        seen.append(packet["seq"])
+    pipeline.stop()
+    assert seen == list(range(100))
+    assert sum(pipeline.dropped().values()) == 0
+
+
+def test_unpaced_replay_drops_no_frames(tmp_path, monkeypatch):
+    monkeypatch.setattr(benchmark_runner, "create_detector", lambda path, **kwargs: SlowDetector(path, **kwargs))
+    summary = benchmark_runner.run_test("fake", str(tmp_path / "fake.pt"), camera_stream.get_camera_stream,
+                                        log_path=str(tmp_path / "fake.csv"), test_duration=None, show_display=False,
+                                        source="synthetic", paced=False, max_frames=60, warmup_frames=2,
+                                        console_interval=10.0)
+    assert summary["frames"] == 60
+    assert summary["pipeline_dropped"] == 0